@@ -0,0 +1,18 @@
+"""Performance benchmarks for flake8-spellcheck.
+
+``python -m benchmarks`` times every stage of the checking pipeline, see ``benchmarks.pipeline``.
+The other modules compare a single optimization with the code it replaced and are run with
+``python -m benchmarks.<name>``.
+"""
+from argparse import Namespace
+from typing import Any
+
+from flake8_spellcheck import default_options
+
+
+def make_options(**overrides: Any) -> Namespace:
+    """Build the options flake8 would pass to ``parse_options`` with the default configuration.
+
+    Benchmarks always run without reading or writing the user's cache unless they ask for it.
+    """
+    return default_options(**{"spellcheck_no_cache": True, **overrides})
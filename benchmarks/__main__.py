@@ -0,0 +1,86 @@
+"""Command line interface for the pipeline benchmarks.
+
+``python -m benchmarks run --output results.json`` times every stage and stores the results,
+``python -m benchmarks compare baseline.json results.json`` exits with status 1 if a stage got
+slower than the threshold allows. ``run --baseline`` does both in one go.
+"""
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+from benchmarks.pipeline import STAGES, STYLES, Results, compare, run_benchmarks
+
+
+def _load(path: str) -> Results:
+    with open(path) as fp:
+        return json.load(fp)  # type: ignore
+
+
+def _report(results: Results) -> None:
+    for stage, result in results["stages"].items():
+        print(
+            f"{stage:>17}: {result['seconds'] * 1e3:9.2f} ms "
+            f"(median {result['median_seconds'] * 1e3:9.2f} ms), "
+            f"{result['ns_per_item']:10.0f} ns/item"
+        )
+
+
+def _check(baseline: Results, current: Results, threshold: float) -> int:
+    regressions = compare(baseline, current, threshold)
+    for regression in regressions:
+        print(
+            f"{regression.stage} regressed: {regression.baseline * 1e3:.2f} ms -> "
+            f"{regression.current * 1e3:.2f} ms ({regression.ratio:.2f}x)",
+            file=sys.stderr,
+        )
+    return 1 if regressions else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="time the pipeline stages")
+    run.add_argument("--size", type=int, default=2000, help="number of identifiers to generate")
+    run.add_argument("--style", choices=STYLES, default="mixed", help="identifier style")
+    run.add_argument("--repeat", type=int, default=5, help="timed calls per stage")
+    run.add_argument(
+        "--stage", action="append", choices=list(STAGES), help="stage to time (default: all)"
+    )
+    run.add_argument("--word-splitter", default="loop", help="--spellcheck-word-splitter")
+    run.add_argument("--memo-size", type=int, default=65536, help="--spellcheck-memo-size")
+    run.add_argument("--output", help="write the results as JSON to this file")
+    run.add_argument("--baseline", help="compare the results with a previous run")
+    run.add_argument("--threshold", type=float, default=0.1, help="allowed slowdown (0.1 = 10%%)")
+
+    check = commands.add_parser("compare", help="compare two stored runs")
+    check.add_argument("baseline")
+    check.add_argument("current")
+    check.add_argument(
+        "--threshold", type=float, default=0.1, help="allowed slowdown (0.1 = 10%%)"
+    )
+
+    args = parser.parse_args(argv)
+    if args.command == "compare":
+        return _check(_load(args.baseline), _load(args.current), args.threshold)
+
+    results = run_benchmarks(
+        size=args.size,
+        style=args.style,
+        repeat=args.repeat,
+        stages=args.stage or STAGES,
+        spellcheck_word_splitter=args.word_splitter,
+        spellcheck_memo_size=args.memo_size,
+    )
+    _report(results)
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(results, fp, indent=2)
+    if args.baseline:
+        return _check(_load(args.baseline), results, args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
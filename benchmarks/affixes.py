@@ -0,0 +1,105 @@
+"""Compare the en_US dictionary as root words with suffix rules with the flat list it replaced.
+
+The flat list is the expansion of ``en_US.dic``, the word list that used to be shipped. Each
+format is loaded in a fresh process, from the shipped files and from a pickle like the
+dictionary cache, reporting the time and how much the resident set size grew, read from
+``/proc`` so this only runs on Linux. Then the unique words of the largest standard library
+modules are looked up in either.
+
+Run with ``python -m benchmarks.affixes [number of files]``.
+"""
+import json
+import pickle
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Set, Tuple
+
+from benchmarks.scanner import load_corpus
+from flake8_spellcheck import CompiledWords, _affixes, load_dictionary, missing_words
+
+LOAD = """
+import gc, json, os, pickle, sys, time
+from pathlib import Path
+from flake8_spellcheck import load_dictionary
+
+def rss():
+    with open("/proc/self/statm") as fp:
+        return int(fp.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+kind, path = sys.argv[1:]
+before = rss()
+start = time.perf_counter()
+if kind == "flat list":
+    words = frozenset(Path(path).read_text().lower().split("\\n"))
+elif kind == "affixes":
+    words = load_dictionary("en_US")
+else:
+    words = pickle.loads(Path(path).read_bytes())
+elapsed = time.perf_counter() - start
+gc.collect()
+print(json.dumps({"elapsed": elapsed, "rss": rss() - before}))
+"""
+
+
+def load(kind: str, path: Path) -> None:
+    runs = [
+        json.loads(
+            subprocess.run(
+                [sys.executable, "-c", LOAD, kind, str(path)],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+        )
+        for _ in range(5)
+    ]
+    elapsed = min(run["elapsed"] for run in runs)
+    rss = min(run["rss"] for run in runs)
+    print(f"{kind:>22}: {elapsed * 1e3:6.1f} ms, RSS +{rss / 2 ** 20:5.1f} MiB")
+
+
+def unique_words(count: int) -> List[Set[str]]:
+    return [
+        {word.lower() for word in re.findall(r"[A-Za-z']+", "".join(lines))}
+        for lines in load_corpus(count).values()
+    ]
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    affixes = load_dictionary("en_US")
+    assert isinstance(affixes, _affixes.AffixWordSet)
+    flat = frozenset(affixes)
+    print(
+        f"{len(flat)} words, {len(affixes.words)} of them in en_US.dic, "
+        f"{len(affixes.flags)} with suffix rules"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        flat_path = Path(directory) / "en_US.txt"
+        flat_path.write_text("\n".join(sorted(flat)))
+        load("flat list", flat_path)
+        load("affixes", flat_path)
+        for name, words in [("flat list", flat), ("affixes", affixes)]:
+            pickle_path = Path(directory) / f"{name}.pickle"
+            pickle_path.write_bytes(pickle.dumps(words))
+            load(f"{name} (pickled)", pickle_path)
+
+    corpus = unique_words(count)
+    dictionaries: List[Tuple[str, CompiledWords]] = [("flat list", flat), ("affixes", affixes)]
+    for name, words in dictionaries:
+        timings = []
+        for _ in range(5):
+            start = time.perf_counter()
+            for unique in corpus:
+                missing_words(words, unique)
+            timings.append(time.perf_counter() - start)
+        lookups = sum(map(len, corpus))
+        print(f"{name:>22}: {lookups / min(timings):9.0f} lookups/s over {len(corpus)} files")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Measure matching unknown words against thousands of allowlist patterns.
+
+The patterns mix globs of vendor prefixes like ``aws*`` with regexes of versions and ticket
+numbers like ``/jira\\d+/``. The words are unknown words that mostly match none of them, as
+only the words missing from the dictionaries are matched. The combined regex, with patterns
+sharing their literal prefixes, is compared with a plain alternation of the patterns and with
+matching every pattern on its own.
+
+Run with ``python -m benchmarks.allowlist_patterns [number of patterns] [number of words]``.
+"""
+import random
+import re
+import sys
+import time
+from typing import Callable, List, Pattern
+
+from flake8_spellcheck import _patterns
+
+LETTERS = "bcdfghjklmnpqrstvwxz"
+
+
+def make_patterns(rng: random.Random, count: int) -> List[str]:
+    patterns = []
+    for number in range(count):
+        prefix = "".join(rng.choices(LETTERS, k=rng.randint(3, 6)))
+        kind = number % 4
+        if kind == 0:
+            patterns.append(f"{prefix}*")
+        elif kind == 1:
+            patterns.append(f"{prefix}?[0-9]")
+        elif kind == 2:
+            patterns.append(f"/{prefix}\\d+/")
+        else:
+            patterns.append(f"/{prefix}v\\d+(alpha|beta)\\d*/")
+    return patterns
+
+
+def make_words(rng: random.Random, patterns: List[str], count: int) -> List[str]:
+    words = ["".join(rng.choices(LETTERS + "aeiou", k=rng.randint(4, 12))) for _ in range(count)]
+    # One in ten words is allowed by a glob
+    for index in range(0, count, 10):
+        glob = rng.choice([pattern for pattern in patterns if pattern.endswith("*")])
+        words[index] = glob[:-1] + "suffix"
+    return words
+
+
+def time_matches(name: str, match: Callable[[str], bool], words: List[str]) -> int:
+    start = time.perf_counter()
+    matched = sum(map(match, words))
+    elapsed = time.perf_counter() - start
+    print(f"{name:>22}: {len(words) / elapsed:10.0f} words/s, {matched} matched")
+    return matched
+
+
+def compile_timed(name: str, compile_: Callable[[], Pattern[str]]) -> Pattern[str]:
+    start = time.perf_counter()
+    pattern = compile_()
+    print(f"{name:>22}: compiled in {(time.perf_counter() - start) * 1e3:.1f} ms")
+    return pattern
+
+
+def compile_patterns(patterns: List[str]) -> Pattern[str]:
+    regex = _patterns.compile_patterns(patterns)
+    # Only no patterns at all compile to None
+    assert regex is not None
+    return regex
+
+
+def as_regex(pattern: str) -> str:
+    if pattern.startswith("/"):
+        return pattern[1:-1]
+    return _patterns.translate_glob(pattern)
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    word_count = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    rng = random.Random(0)
+    patterns = make_patterns(rng, count)
+    words = make_words(rng, patterns, word_count)
+    print(f"{count} patterns, {word_count} words")
+
+    regexes = [as_regex(pattern) for pattern in patterns]
+    combined = compile_timed("prefix tree", lambda: compile_patterns(patterns))
+    alternation = compile_timed(
+        "alternation",
+        lambda: re.compile("|".join(f"(?:{regex})" for regex in regexes), re.IGNORECASE),
+    )
+    start = time.perf_counter()
+    separate = [re.compile(regex, re.IGNORECASE) for regex in regexes]
+    print(f"{'one per pattern':>22}: compiled in {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    expected = time_matches("prefix tree", lambda word: bool(combined.fullmatch(word)), words)
+    assert time_matches("alternation", lambda w: bool(alternation.fullmatch(w)), words) == expected
+    # Far slower, so only a sample of the words is matched against every pattern
+    sample = words[: max(1, word_count // 20)]
+    time_matches(
+        "one per pattern", lambda word: any(regex.fullmatch(word) for regex in separate), sample
+    )
+
+
+if __name__ == "__main__":
+    main()
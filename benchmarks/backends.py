@@ -0,0 +1,64 @@
+"""Compare load time, memory and lookup speed of the dictionary backends.
+
+Each backend is loaded in a fresh interpreter so the memory figures are not skewed by
+the others. Private memory is what every flake8 process allocates for the dictionaries,
+the cache file is memory mapped and shared between processes. Run with
+``python -m benchmarks.backends``.
+"""
+import json
+import subprocess
+import sys
+import tempfile
+
+MEASURE = """
+import json, random, sys, time, tracemalloc
+from pathlib import Path
+from benchmarks import make_options
+from flake8_spellcheck import SpellCheckPlugin
+
+options = make_options(
+    spellcheck_cache_dir=sys.argv[1], spellcheck_no_cache=False, spellcheck_backend=sys.argv[2]
+)
+SpellCheckPlugin.load_dictionaries(options)  # make sure the cache is warm
+
+start = time.perf_counter()
+SpellCheckPlugin.load_dictionaries(options)
+load = time.perf_counter() - start
+
+tracemalloc.start()
+words, no_symbols = SpellCheckPlugin.load_dictionaries(options)
+memory = tracemalloc.get_traced_memory()[0]
+tracemalloc.stop()
+
+rng = random.Random(0)
+sample = rng.sample(sorted(words), 5000) + ["".join(rng.choices("abcdefgh", k=7)) for _ in range(5000)]
+start = time.perf_counter()
+for word in sample:
+    word in words
+lookup = (time.perf_counter() - start) / len(sample)
+cache = sorted(Path(sys.argv[1]).glob(f"dictionaries-*.{sys.argv[2]}"))
+size = cache[0].stat().st_size if cache else 0
+print(json.dumps({"load": load, "memory": memory, "lookup": lookup, "size": size}))
+"""
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for backend in ["frozenset", "mmap", "dawg"]:
+            output = subprocess.run(
+                [sys.executable, "-c", MEASURE, cache_dir, backend],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            result = json.loads(output)
+            print(
+                f"{backend:>9}: load {result['load'] * 1e3:6.1f} ms, "
+                f"private memory {result['memory'] / 2 ** 20:5.1f} MiB, "
+                f"lookup {result['lookup'] * 1e9:6.0f} ns, "
+                f"cache file {result['size'] / 2 ** 20:5.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
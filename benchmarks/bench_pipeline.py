@@ -0,0 +1,74 @@
+"""Pipeline benchmarks for pytest.
+
+The file is not collected by a plain ``pytest`` run, pass it explicitly::
+
+    pytest benchmarks/bench_pipeline.py
+
+``SPELLCHECK_BENCHMARK_SIZE`` and ``SPELLCHECK_BENCHMARK_STYLE`` control the generated corpus,
+``SPELLCHECK_BENCHMARK_OUTPUT`` writes the results as JSON and ``SPELLCHECK_BENCHMARK_BASELINE``
+fails every stage that is slower than that run by more than ``SPELLCHECK_BENCHMARK_THRESHOLD``.
+"""
+import json
+import os
+import tempfile
+from argparse import Namespace
+from typing import Iterator
+
+import pytest
+
+from benchmarks import make_options
+from benchmarks.pipeline import STAGES, Corpus, Results, compare, measure
+from flake8_spellcheck import SpellCheckPlugin
+
+SIZE = int(os.environ.get("SPELLCHECK_BENCHMARK_SIZE", "2000"))
+STYLE = os.environ.get("SPELLCHECK_BENCHMARK_STYLE", "mixed")
+THRESHOLD = float(os.environ.get("SPELLCHECK_BENCHMARK_THRESHOLD", "0.1"))
+
+
+@pytest.fixture(scope="module")
+def corpus() -> Corpus:
+    return Corpus.generate(SIZE, STYLE)
+
+
+@pytest.fixture(scope="module")
+def results() -> Iterator[Results]:
+    results: Results = {"parameters": {"size": SIZE, "style": STYLE}, "stages": {}}
+    yield results
+    if os.environ.get("SPELLCHECK_BENCHMARK_OUTPUT"):
+        with open(os.environ["SPELLCHECK_BENCHMARK_OUTPUT"], "w") as fp:
+            json.dump(results, fp, indent=2)
+
+
+@pytest.fixture(scope="module")
+def options() -> Iterator[Namespace]:
+    with tempfile.TemporaryDirectory() as cache_dir:
+        options = make_options(spellcheck_cache_dir=cache_dir, spellcheck_no_cache=False)
+        SpellCheckPlugin.parse_options(options)
+        yield options
+
+
+@pytest.mark.parametrize("stage", STAGES)
+def test_stage(stage: str, corpus: Corpus, options: Namespace, results: Results) -> None:
+    results["stages"][stage] = measure(stage, corpus, options)
+    assert results["stages"][stage]["seconds"] > 0
+
+    if os.environ.get("SPELLCHECK_BENCHMARK_BASELINE"):
+        with open(os.environ["SPELLCHECK_BENCHMARK_BASELINE"]) as fp:
+            baseline = json.load(fp)
+        current = {"stages": {stage: results["stages"][stage]}}
+        assert compare(baseline, current, THRESHOLD) == []
+
+
+def test_compare() -> None:
+    baseline: Results = {"stages": {"run": {"seconds": 1.0}, "parse_token": {"seconds": 1.0}}}
+    current: Results = {
+        "stages": {
+            "run": {"seconds": 1.05},
+            "parse_token": {"seconds": 1.5},
+            "load_dictionaries": {"seconds": 9.0},
+        }
+    }
+
+    assert [regression.stage for regression in compare(baseline, current, 0.1)] == ["parse_token"]
+    assert compare(baseline, current, 0.6) == []
+    assert compare(baseline, current, 0.01)[0].ratio == pytest.approx(1.05)
@@ -0,0 +1,104 @@
+"""Compare the per-token cost of the old string based character tables with CharClassTable.
+
+Run with ``python -m benchmarks.char_classes``.
+"""
+import time
+import timeit
+import unicodedata
+from string import digits
+from typing import Iterator, List, Tuple
+
+from flake8_spellcheck import Position, parse_camel_case, parse_snake_case
+
+TOKENS = [
+    "get_queryset",
+    "HttpResponseRedirect",
+    "user_id",
+    "árvíztűrő_tükörfúrógép",
+    "ÁrvíztűrőTükörfúrógép",
+    "SOME_CONSTANT_VALUE",
+    "parse_camel_case",
+    "self",
+]
+NUMBER = 2000
+
+
+def build_legacy_tables() -> Tuple[str, str]:
+    all_unicode = "".join(chr(i) for i in range(65536))
+    lowercase = "".join(c for c in all_unicode if unicodedata.category(c) == "Ll")
+    uppercase = "".join(c for c in all_unicode if unicodedata.category(c) == "Lu")
+    return lowercase, uppercase
+
+
+LEGACY_BUILD_SECONDS = -time.perf_counter()
+LOWERCASE, UPPERCASE = build_legacy_tables()
+LEGACY_BUILD_SECONDS += time.perf_counter()
+
+
+def legacy_camel_case(name: str, position: Position) -> Iterator[Tuple[Position, str]]:
+    index = position[1]
+    start = index
+    buffer = ""
+    for c in name:
+        index += 1
+        if c in LOWERCASE or c in digits or c in "'":
+            buffer += c
+        else:
+            if buffer:
+                yield (position[0], start), buffer
+            if c in UPPERCASE:
+                buffer = c
+                start = index - 1
+            else:
+                buffer = ""
+                start = index
+
+    if buffer:
+        yield (position[0], start), buffer
+
+
+def legacy_snake_case(name: str, position: Position) -> Iterator[Tuple[Position, str]]:
+    index = position[1]
+    start = index
+    buffer = ""
+    for c in name:
+        index += 1
+        if c in LOWERCASE or c in digits or c in UPPERCASE:
+            buffer += c
+        else:
+            if buffer:
+                yield (position[0], start), buffer
+
+            buffer = ""
+            start = index
+
+    if buffer:
+        yield (position[0], start), buffer
+
+
+def run_all(camel_case, snake_case) -> List[Tuple[Position, str]]:  # type: ignore
+    result: List[Tuple[Position, str]] = []
+    for token in TOKENS:
+        result.extend(camel_case(token, (1, 0)))
+        result.extend(snake_case(token, (1, 0)))
+    return result
+
+
+def main() -> None:
+    assert run_all(legacy_camel_case, legacy_snake_case) == run_all(
+        parse_camel_case, parse_snake_case
+    )
+    print(f"legacy table build (paid at import): {LEGACY_BUILD_SECONDS * 1e3:.1f} ms")
+    tokens = NUMBER * len(TOKENS)
+    for label, camel_case, snake_case in [
+        ("legacy tables", legacy_camel_case, legacy_snake_case),
+        ("CharClassTable", parse_camel_case, parse_snake_case),
+    ]:
+        elapsed = min(
+            timeit.repeat(lambda: run_all(camel_case, snake_case), number=NUMBER, repeat=5)
+        )
+        print(f"{label:>16}: {elapsed / tokens * 1e6:8.2f} µs/token")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Compare ``python -m flake8_spellcheck`` with ``flake8 --select=SC`` over the standard library.
+
+Both commands check the same files with the same number of jobs, in a fresh process with the
+dictionary cache already compiled, and report the same errors.
+
+Run with ``python -m benchmarks.cli [number of jobs]``.
+"""
+import subprocess
+import sys
+import sysconfig
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+COMMANDS = {
+    "flake8 --select=SC": [sys.executable, "-m", "flake8", "--isolated", "--select=SC"],
+    "python -m flake8_spellcheck": [sys.executable, "-m", "flake8_spellcheck", "--isolated"],
+}
+
+
+def measure(command: List[str], paths: List[str]) -> Tuple[float, List[str]]:
+    start = time.perf_counter()
+    output = subprocess.run(
+        [*command, "--exit-zero", *paths], check=True, capture_output=True, text=True
+    ).stdout
+    return time.perf_counter() - start, sorted(output.splitlines())
+
+
+def main() -> None:
+    jobs = sys.argv[1] if len(sys.argv) > 1 else "auto"
+    paths = sorted(str(path) for path in Path(sysconfig.get_paths()["stdlib"]).glob("*.py"))
+    with tempfile.TemporaryDirectory() as directory:
+        cache = [f"--spellcheck-cache-dir={directory}", f"--jobs={jobs}"]
+        results = {}
+        for label, command in COMMANDS.items():
+            measure([*command, *cache], paths[:1])
+            elapsed, errors = measure([*command, *cache], paths)
+            results[label] = errors
+            print(
+                f"{label:>28}: {elapsed:6.2f} s for {len(paths)} files, "
+                f"{len(paths) / elapsed:6.1f} files/s, {len(errors)} errors"
+            )
+        assert len({tuple(errors) for errors in results.values()}) == 1
+
+
+if __name__ == "__main__":
+    main()
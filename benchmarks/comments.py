@@ -0,0 +1,52 @@
+"""Compare comment checking throughput of the streaming scanner with the old split based path.
+
+Run with ``python -m benchmarks.comments [number of comment lines]``.
+"""
+import random
+import sys
+import time
+import tokenize
+from io import StringIO
+from typing import Iterator, List
+
+from benchmarks import make_options
+from flake8_spellcheck import NOQA_REGEX, Candidate, SpellCheckPlugin
+
+WORDS = "the request handler returns a respnose for every user and logs misspeled values".split()
+
+
+class LegacyCommentPlugin(SpellCheckPlugin):
+    """The comment handling this package used before comments were scanned in one pass."""
+
+    def _parse_token(self, token_info: tokenize.TokenInfo) -> Iterator[Candidate]:
+        if not self._is_valid_comment(token_info):
+            yield from super()._parse_token(token_info)
+            return
+        value = NOQA_REGEX.sub("", token_info.string.lstrip("#"))
+        for value_word in value.split(" "):
+            yield token_info.start, value_word, True, token_info.type
+
+
+def generate_tokens(count: int) -> List[tokenize.TokenInfo]:
+    rng = random.Random(0)
+    source = "".join(f"# {' '.join(rng.choices(WORDS, k=12))}\nx = 1\n" for _ in range(count))
+    return list(tokenize.generate_tokens(StringIO(source).readline))
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    tokens = generate_tokens(count)
+    SpellCheckPlugin.parse_options(make_options(spellcheck_targets=["comments"]))
+    for plugin in [LegacyCommentPlugin, SpellCheckPlugin]:
+        list(plugin(None, file_tokens=tokens).run())  # type: ignore  # warm up the memo
+        start = time.perf_counter()
+        errors = list(plugin(None, file_tokens=tokens).run())  # type: ignore
+        elapsed = time.perf_counter() - start
+        print(
+            f"{plugin.__name__:>20}: {elapsed * 1e3:7.1f} ms, "
+            f"{count / elapsed:8.0f} comments/s, {len(errors)} errors"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Measure the throughput of splitting unknown words into dictionary words.
+
+Three kinds of unknown words are split: compounds of two or three dictionary words, one edit
+misspellings of dictionary words, which should stay misspelt, and long random tokens, which
+show that the search is cut off. Every word is split once, without memoization. The share of
+misspellings that are accepted as compounds is reported for every minimum part length.
+
+Run with ``python -m benchmarks.compounds [number of words]``.
+"""
+import random
+import string
+import sys
+import time
+from typing import Collection, Dict, List, cast
+
+from benchmarks import make_options
+from benchmarks.suggestions import misspell
+from flake8_spellcheck import SpellCheckPlugin, _compounds
+
+
+def unknown_words(words: List[str], count: int) -> Dict[str, List[str]]:
+    rng = random.Random(0)
+    dictionary = set(words)
+    common = [word for word in words if 3 <= len(word) <= 7]
+    return {
+        "compounds": ["".join(rng.choices(common, k=rng.randint(2, 3))) for _ in range(count)],
+        "misspellings": [
+            misspelling
+            for misspelling in (misspell(rng.choice(words), 1, rng) for _ in range(count))
+            if misspelling not in dictionary
+        ],
+        "long tokens": ["".join(rng.choices(string.ascii_lowercase, k=60)) for _ in range(count)],
+    }
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    SpellCheckPlugin.parse_options(make_options())
+    SpellCheckPlugin.load_pending_dictionaries()
+    # Every backend iterates over its words
+    dictionary = cast(Collection[str], SpellCheckPlugin.words)
+    words = sorted(word for word in dictionary if "'" not in word)
+    samples = unknown_words(words, count)
+
+    for min_length in [2, 3, 4]:
+        decomposer = _compounds.Decomposer(
+            dictionary, min_length, _compounds.COMPOUND_MAX_STEPS, maxsize=0
+        )
+        start = time.perf_counter()
+        decomposer.split("")
+        print(
+            f"min length {min_length}, sorting the dictionary: {time.perf_counter() - start:.3f} s"
+        )
+        for name, sample in samples.items():
+            start = time.perf_counter()
+            accepted = sum(bool(decomposer.split(word)) for word in sample)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{name:>14}: {len(sample) / elapsed:8.0f} words/s, "
+                f"{elapsed / len(sample) * 1e6:6.1f} us per word, "
+                f"{accepted / len(sample):6.1%} accepted"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""Time loading the dictionaries with a cold and a warm compiled dictionary cache.
+
+Run with ``python -m benchmarks.dictionary_cache``.
+"""
+import tempfile
+import time
+from argparse import Namespace
+
+from benchmarks import make_options
+from flake8_spellcheck import SpellCheckPlugin
+
+
+def timed_load(options: Namespace) -> float:
+    start = time.perf_counter()
+    SpellCheckPlugin.load_dictionaries(options)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as cache_dir:
+        uncached_options = make_options(spellcheck_cache_dir=cache_dir)
+        cached_options = make_options(spellcheck_cache_dir=cache_dir, spellcheck_no_cache=False)
+        uncached = min(timed_load(uncached_options) for _ in range(5))
+        cold = timed_load(cached_options)
+        warm = min(timed_load(cached_options) for _ in range(5))
+    print(f"no cache: {uncached * 1e3:7.1f} ms")
+    print(f"    cold: {cold * 1e3:7.1f} ms (includes writing the cache)")
+    print(f"    warm: {warm * 1e3:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Measure SpellCheckPlugin.run with --spellcheck-diff over large legacy files.
+
+Synthetic diffs change an evenly spread share of each file's lines, in hunks of ten lines. The
+whole file is still tokenized, so the time is compared with checking it without a diff.
+
+Run with ``python -m benchmarks.diff [number of files]``.
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks import make_options
+from benchmarks.scanner import load_corpus
+from flake8_spellcheck import SpellCheckPlugin
+
+# No lines changed is the common case of files that the diff does not touch
+SHARES = [0.0, 0.01, 0.1, 0.5, 1.0]
+
+
+def make_diff(paths: Dict[str, int], share: float) -> str:
+    hunks = []
+    for path, count in paths.items():
+        hunks.append(f"--- a/{path}\n+++ b/{path}\n")
+        step = int(10 / share) if share else count + 1
+        for start in range(1, count + 1 if share else 1, step):
+            length = min(10, count + 1 - start)
+            body = "".join(f"+line {number}\n" for number in range(length))
+            hunks.append(f"@@ -{start},0 +{start},{length} @@\n{body}")
+    return "".join(hunks)
+
+
+def check(corpus: Dict[str, List[str]], diff_file: str) -> float:
+    SpellCheckPlugin.parse_options(make_options(spellcheck_diff=diff_file))
+    timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        for name, lines in corpus.items():
+            list(SpellCheckPlugin(None, name, lines).run())  # type: ignore
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    corpus = load_corpus(count)
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        full = check(corpus, "")
+        print(f"{'no diff':>18}: {full * 1e3:7.1f} ms")
+        for share in SHARES:
+            diff_file = str(Path(directory) / "changes.diff")
+            Path(diff_file).write_text(
+                make_diff({name: len(lines) for name, lines in corpus.items()}, share)
+            )
+            elapsed = check(corpus, diff_file)
+            print(
+                f"{share:>10.0%} changed: {elapsed * 1e3:7.1f} ms ({elapsed / full:6.1%} of no diff)"
+            )
+
+
+if __name__ == "__main__":
+    main()
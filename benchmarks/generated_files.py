@@ -0,0 +1,80 @@
+"""Measure SpellCheckPlugin.run over large generated modules, like protobuf stubs.
+
+Generated code repeats the same few names over and over, so checking it is dominated by the
+per word overhead rather than by dictionary lookups of distinct words. The file is checked
+in one batch, compared with checking it one token at a time, with and without memoization.
+
+Run with ``python -m benchmarks.generated_files [number of messages]``.
+"""
+import random
+import sys
+import time
+import tokenize
+from io import StringIO
+from typing import Iterator, List
+
+from benchmarks import make_options
+from benchmarks.pipeline import WORDS
+from flake8_spellcheck import LintError, SpellCheckPlugin
+
+MESSAGE = '''
+class {name}(google.protobuf.message.Message):
+    """{comment}"""
+
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+    {constant}_FIELD_NUMBER: builtins.int
+    {field}: builtins.str
+    def __init__(self, *, {field}: builtins.str | None = ...) -> None: ...
+    def HasField(self, field_name: typing_extensions.Literal["{field}", b"{field}"]) -> bool: ...
+    def ClearField(self, field_name: typing_extensions.Literal["{field}", b"{field}"]) -> None: ...
+
+global___{name} = {name}  # {comment}
+'''
+
+
+def generate_stub(count: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(count):
+        parts = rng.choices(WORDS, k=rng.randint(1, 3))
+        messages.append(
+            MESSAGE.format(
+                name="".join(part.capitalize() for part in parts),
+                constant="_".join(parts).upper(),
+                field="_".join(parts),
+                comment=" ".join(rng.choices(WORDS, k=6)),
+            )
+        )
+    return "".join(messages)
+
+
+class TokenAtATimePlugin(SpellCheckPlugin):
+    """Look up the words of every token as soon as it is parsed."""
+
+    def _run(self) -> Iterator[LintError]:
+        for token_info in self.file_tokens:
+            yield from self._detect_errors(list(self._parse_token(token_info)))
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    tokens: List[tokenize.TokenInfo] = list(
+        tokenize.generate_tokens(StringIO(generate_stub(count)).readline)
+    )
+    for memo_size in [0, 65536]:
+        SpellCheckPlugin.parse_options(
+            make_options(spellcheck_memo_size=memo_size, spellcheck_targets=["names", "strings"])
+        )
+        for plugin in [TokenAtATimePlugin, SpellCheckPlugin]:
+            list(plugin(None, file_tokens=tokens).run())  # type: ignore  # warm up the memo
+            start = time.perf_counter()
+            errors = list(plugin(None, file_tokens=tokens).run())  # type: ignore
+            elapsed = time.perf_counter() - start
+            print(
+                f"memo size {memo_size:>6}, {plugin.__name__:>18}: {elapsed * 1e3:7.1f} ms, "
+                f"{len(tokens) / elapsed:9.0f} tokens/s, {len(errors)} errors"
+            )
+
+
+if __name__ == "__main__":
+    main()
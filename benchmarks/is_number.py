@@ -0,0 +1,36 @@
+"""Compare is_number with the try/except float() implementation it replaced.
+
+Run with ``python -m benchmarks.is_number``.
+"""
+import timeit
+from typing import Any
+
+from flake8_spellcheck import is_number
+
+WORDS = ["kwargs", "idx", "ndarray", "conv2d", "relu", "qkv", "lr", "bs", "logits", "x1"]
+NUMBERS = ["1", "42", "1e5", "3"]
+
+
+def float_is_number(value: Any) -> bool:
+    try:
+        float(value)
+    except ValueError:
+        return False
+    else:
+        return True
+
+
+def main() -> None:
+    for label, sample in [("words", WORDS), ("numbers", NUMBERS)]:
+        for implementation in [float_is_number, is_number]:
+            elapsed = min(
+                timeit.repeat(
+                    lambda: [implementation(value) for value in sample], number=20000, repeat=5
+                )
+            )
+            per_call = elapsed / (20000 * len(sample)) * 1e9
+            print(f"{label:>7} {implementation.__name__:>15}: {per_call:6.0f} ns/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Measure the cost of nested allowlists in a repository with thousands of directories.
+
+Every team directory has an allowlist, and so has every one of its subdirectories. The files
+are checked in directory order like flake8 does, timing the first file of each directory,
+which reads its allowlists, apart from the other files, which should cost the same as without
+nested allowlists. The memory of the layers is compared with a merged copy of the words of
+every directory's allowlists.
+
+Run with ``python -m benchmarks.nested_allowlists [number of team directories]``.
+"""
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, FrozenSet, List
+
+from benchmarks import make_options
+from benchmarks.pipeline import WORDS
+from flake8_spellcheck import NestedAllowlists, SpellCheckPlugin
+
+FILES_PER_DIRECTORY = 5
+
+
+def vocabulary(rng: random.Random, count: int) -> List[str]:
+    return ["".join(rng.choices("bcdfghjklmnpqrstvwxz", k=8)) for _ in range(count)]
+
+
+def make_tree(root: Path, teams: int) -> List[Path]:
+    rng = random.Random(0)
+    (root / ".spellcheck-allowlist").write_text("\n".join(vocabulary(rng, 200)))
+    directories = []
+    for team in range(teams):
+        for directory in [root / f"team{team}", root / f"team{team}" / "service"]:
+            directory.mkdir()
+            words = vocabulary(rng, 100)
+            (directory / ".spellcheck-allowlist").write_text("\n".join(words))
+            for number in range(FILES_PER_DIRECTORY):
+                source = " ".join(rng.choices(WORDS, k=40) + rng.choices(words, k=10))
+                (directory / f"example{number}.py").write_text(f"# {source}\n")
+            directories.append(directory)
+    return directories
+
+
+def merged_words(directories: List[Path]) -> Dict[Path, FrozenSet[str]]:
+    """The words of the allowlists of every directory, copied into one set per directory."""
+    merged = {}
+    for directory in directories:
+        words: List[str] = []
+        for parent in [directory, *directory.parents]:
+            allowlist = parent / ".spellcheck-allowlist"
+            if allowlist.exists():
+                words.extend(allowlist.read_text().split("\n"))
+        merged[directory] = frozenset(words)
+    return merged
+
+
+def main() -> None:
+    teams = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        directories = make_tree(root, teams)
+        allowlist_file = str(root / ".spellcheck-allowlist")
+
+        timings: Dict[str, List[float]] = {
+            "single allowlist": [],
+            "first file in directory": [],
+            "other files": [],
+        }
+        for nested in [False, True]:
+            SpellCheckPlugin.parse_options(
+                make_options(
+                    spellcheck_allowlist_file=allowlist_file,
+                    spellcheck_nested_allowlists=nested,
+                )
+            )
+            for path in directories:
+                for number in range(FILES_PER_DIRECTORY):
+                    filename = str(path / f"example{number}.py")
+                    lines = [(path / f"example{number}.py").read_text()]
+                    start = time.perf_counter()
+                    list(SpellCheckPlugin(None, filename, lines).run())  # type: ignore
+                    elapsed = time.perf_counter() - start
+                    key = "other files" if number else "first file in directory"
+                    timings[key if nested else "single allowlist"].append(elapsed)
+
+        tracemalloc.start()
+        allowlists = NestedAllowlists(directory, ".spellcheck-allowlist")
+        layers = [allowlists.layer(str(path)) for path in directories]
+        layered, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        merged = merged_words(directories)
+        copied, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert len(merged) == len(layers)
+
+        print(f"{len(directories)} directories, {FILES_PER_DIRECTORY} files each")
+        for name, values in timings.items():
+            print(
+                f"{name:>28}: median {statistics.median(values) * 1e6:7.1f} us, "
+                f"mean {statistics.mean(values) * 1e6:7.1f} us per file"
+            )
+        print(f"{'layered allowlists':>28}: {layered / 2 ** 20:7.1f} MiB")
+        print(f"{'merged copy per directory':>28}: {copied / 2 ** 20:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""Time each stage of the tokenize -> split -> lookup pipeline over a generated corpus.
+
+Results are plain dictionaries that serialize to JSON so that runs can be stored and compared
+with ``compare``. The command line interface lives in ``benchmarks.__main__``.
+"""
+import platform
+import random
+import statistics
+import tempfile
+import timeit
+import tokenize
+from argparse import Namespace
+from io import StringIO
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Tuple
+
+from benchmarks import make_options
+from flake8_spellcheck import SpellCheckPlugin, parse_camel_case, parse_snake_case
+
+WORDS = [
+    "get",
+    "set",
+    "user",
+    "request",
+    "response",
+    "query",
+    "handler",
+    "config",
+    "value",
+    "item",
+    "count",
+    "index",
+    "buffer",
+    "token",
+    "parse",
+    "respnose",
+    "misspeled",
+    "árvíztűrő",
+]
+STYLES = ["snake", "camel", "pascal", "constant", "mixed"]
+
+Results = Dict[str, Any]
+
+
+def _join(parts: List[str], style: str) -> str:
+    if style == "snake":
+        return "_".join(parts)
+    if style == "camel":
+        return parts[0] + "".join(part.capitalize() for part in parts[1:])
+    if style == "pascal":
+        return "".join(part.capitalize() for part in parts)
+    return "_".join(parts).upper()
+
+
+def generate_identifiers(count: int, style: str = "mixed", seed: int = 0) -> List[str]:
+    """Generate ``count`` identifiers of one to four words in the given style."""
+    rng = random.Random(seed)
+    identifiers = []
+    for _ in range(count):
+        parts = rng.choices(WORDS, k=rng.randint(1, 4))
+        parts_style = rng.choice(STYLES[:-1]) if style == "mixed" else style
+        identifiers.append(_join(parts, parts_style))
+    return identifiers
+
+
+def generate_source(identifiers: List[str], seed: int = 0) -> str:
+    """Generate a module that assigns, calls and comments on the identifiers."""
+    rng = random.Random(seed)
+    lines = []
+    for number, identifier in enumerate(identifiers):
+        if number % 4 == 0:
+            lines.append(f"# {' '.join(rng.choices(WORDS, k=8))}")
+        lines.append(f"{identifier} = {rng.choice(identifiers)}({number})  # {rng.choice(WORDS)}")
+    return "\n".join(lines) + "\n"
+
+
+class Corpus(NamedTuple):
+    identifiers: List[str]
+    lines: List[str]
+    tokens: List[tokenize.TokenInfo]
+
+    @classmethod
+    def generate(cls, size: int, style: str = "mixed", seed: int = 0) -> "Corpus":
+        identifiers = generate_identifiers(size, style, seed)
+        source = generate_source(identifiers, seed)
+        tokens = list(tokenize.generate_tokens(StringIO(source).readline))
+        return cls(identifiers, source.splitlines(keepends=True), tokens)
+
+
+# A stage prepares a callable to time from a corpus and options, and reports how many items
+# (identifiers, tokens or dictionaries) one call processes.
+Stage = Callable[[Corpus, Namespace], Tuple[Callable[[], object], int]]
+
+
+def _load_dictionaries(corpus: Corpus, options: Namespace) -> Tuple[Callable[[], object], int]:
+    return lambda: SpellCheckPlugin.load_dictionaries(options), 1
+
+
+def _parse_camel_case(corpus: Corpus, options: Namespace) -> Tuple[Callable[[], object], int]:
+    def run() -> None:
+        for identifier in corpus.identifiers:
+            for _ in parse_camel_case(identifier, (1, 0)):
+                pass
+
+    return run, len(corpus.identifiers)
+
+
+def _parse_snake_case(corpus: Corpus, options: Namespace) -> Tuple[Callable[[], object], int]:
+    def run() -> None:
+        for identifier in corpus.identifiers:
+            for _ in parse_snake_case(identifier, (1, 0)):
+                pass
+
+    return run, len(corpus.identifiers)
+
+
+def _parse_token(corpus: Corpus, options: Namespace) -> Tuple[Callable[[], object], int]:
+    plugin = SpellCheckPlugin(None, file_tokens=corpus.tokens, lines=corpus.lines)  # type: ignore
+
+    def run() -> None:
+        for token in corpus.tokens:
+            for _ in plugin._parse_token(token):
+                pass
+
+    return run, len(corpus.tokens)
+
+
+def _run(corpus: Corpus, options: Namespace) -> Tuple[Callable[[], object], int]:
+    tokens, lines = corpus.tokens, corpus.lines
+
+    def run() -> None:
+        for _ in SpellCheckPlugin(None, file_tokens=tokens, lines=lines).run():  # type: ignore
+            pass
+
+    return run, len(corpus.tokens)
+
+
+STAGES: Dict[str, Stage] = {
+    "load_dictionaries": _load_dictionaries,
+    "parse_camel_case": _parse_camel_case,
+    "parse_snake_case": _parse_snake_case,
+    "parse_token": _parse_token,
+    "run": _run,
+}
+
+
+def measure(stage: str, corpus: Corpus, options: Namespace, repeat: int = 5) -> Dict[str, float]:
+    """Time one stage, returning the best and median wall clock time of ``repeat`` calls.
+
+    The stage is called once before timing so that lazily built state (character tables,
+    compiled patterns, the dictionary cache and memoized words) does not count against it.
+    """
+    function, items = STAGES[stage](corpus, options)
+    function()
+    timings = timeit.repeat(function, number=1, repeat=repeat)
+    best = min(timings)
+    return {
+        "seconds": best,
+        "median_seconds": statistics.median(timings),
+        "items": items,
+        "ns_per_item": best / items * 1e9,
+    }
+
+
+def run_benchmarks(
+    size: int = 2000,
+    style: str = "mixed",
+    repeat: int = 5,
+    stages: Iterable[str] = STAGES,
+    **overrides: Any,
+) -> Results:
+    """Time ``stages`` over a corpus of ``size`` identifiers with the default configuration.
+
+    Dictionaries are loaded from a temporary dictionary cache. ``overrides`` replace individual
+    options, e.g. ``spellcheck_word_splitter="regex"``.
+    """
+    corpus = Corpus.generate(size, style)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        options = make_options(
+            **{"spellcheck_cache_dir": cache_dir, "spellcheck_no_cache": False, **overrides}
+        )
+        SpellCheckPlugin.parse_options(options)
+        results = {stage: measure(stage, corpus, options, repeat) for stage in stages}
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+        },
+        "parameters": {"size": size, "style": style, "repeat": repeat, **overrides},
+        "stages": results,
+    }
+
+
+class Regression(NamedTuple):
+    stage: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline
+
+
+def compare(baseline: Results, current: Results, threshold: float = 0.1) -> List[Regression]:
+    """Return the stages whose best time grew by more than ``threshold`` (0.1 is 10%).
+
+    Stages that only appear in one of the runs are ignored.
+    """
+    regressions = []
+    for stage, result in current["stages"].items():
+        if stage not in baseline["stages"]:
+            continue
+        before, after = baseline["stages"][stage]["seconds"], result["seconds"]
+        if after > before * (1 + threshold):
+            regressions.append(Regression(stage, before, after))
+    return regressions
@@ -0,0 +1,98 @@
+"""Measure the cost of ``--spellcheck-report`` over a large generated code base.
+
+Every generated line has a comment with dictionary words and, now and then, one of a fixed
+vocabulary of unknown words. ``python -m flake8_spellcheck`` checks the files with and without
+the report, and the peak resident set size of the command and its workers is compared with
+the size of its output, which post-processing the errors has to go through. The peak is read
+from ``/proc``, as ``ru_maxrss`` carries over the peak of the parent through ``exec``, so this
+only runs on Linux.
+
+Run with ``python -m benchmarks.report [number of lines] [number of jobs]``.
+"""
+import json
+import random
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.pipeline import WORDS
+
+FILES = 200
+
+RUN = """
+import json, resource, sys, time
+from flake8_spellcheck.__main__ import main
+
+start = time.perf_counter()
+main(sys.argv[1:])
+elapsed = time.perf_counter() - start
+with open("/proc/self/status") as fp:
+    peak = next(int(line.split()[1]) for line in fp if line.startswith("VmHWM:"))
+# Forked workers start from the peak of this process, which is as good a lower bound
+peak = max(peak, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+print(json.dumps({"elapsed": elapsed, "peak": peak * 1024}), file=sys.stderr)
+"""
+
+
+def generate(directory: Path, lines: int) -> None:
+    rng = random.Random(0)
+    unknown = ["".join(rng.choices("bcdfghjklmnpqrstvwxz", k=7)) for _ in range(20000)]
+    for number in range(FILES):
+        source = []
+        for _ in range(lines // FILES):
+            words = rng.choices(WORDS, k=5)
+            if rng.random() < 0.2:
+                words[rng.randrange(5)] = rng.choice(unknown)
+            source.append(f"value = 1  # {' '.join(words)}\n")
+        (directory / f"module{number}.py").write_text("".join(source))
+
+
+def main() -> None:
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    jobs = sys.argv[2] if len(sys.argv) > 2 else "auto"
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        (root / "src").mkdir()
+        generate(root / "src", lines)
+        command = [
+            sys.executable,
+            "-c",
+            RUN,
+            "--isolated",
+            "--exit-zero",
+            f"--jobs={jobs}",
+            f"--spellcheck-cache-dir={directory}/cache",
+            str(root / "src"),
+        ]
+        report = [
+            f"--spellcheck-report={directory}/report.json",
+            f"--spellcheck-report-allowlist={directory}/allowlist.txt",
+        ]
+        for label, arguments in [("errors only", []), ("with report", report)]:
+            output = root / "errors.txt"
+            with open(output, "w") as fp:
+                process = subprocess.run(
+                    [*command, *arguments],
+                    check=True,
+                    stdout=fp,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                )
+            result = json.loads(process.stderr.splitlines()[-1])
+            with open(output) as fp:
+                errors = sum(1 for _ in fp)
+            print(
+                f"{label:>12}: {result['elapsed']:6.2f} s for {lines} lines, peak RSS "
+                f"{result['peak'] / 2 ** 20:6.1f} MiB, {output.stat().st_size / 2 ** 20:6.1f} MiB "
+                f"of output with {errors} errors"
+            )
+        words = json.loads((root / "report.json").read_text())
+        print(
+            f"{len(words)} unknown words, {(root / 'report.json').stat().st_size / 2 ** 20:.1f} "
+            f"MiB report, {(root / 'allowlist.txt').stat().st_size / 2 ** 20:.1f} MiB allowlist"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Time SpellCheckPlugin.run over a synthetic corpus with and without a warm result cache.
+
+Run with ``python -m benchmarks.result_cache [number of files]``.
+"""
+import sys
+import tempfile
+import time
+import tokenize
+from argparse import Namespace
+from io import StringIO
+from typing import List, Tuple
+
+from benchmarks import make_options
+from flake8_spellcheck import SpellCheckPlugin
+
+TEMPLATE = """
+# Handle the incoming request for user {number} and return a respnose
+def handle_request_{number}(request, user_id):
+    response_value = get_queryset(request).filter(user_id=user_id)  # filter by user
+    return HttpResponseRedirect(response_value)
+"""
+
+
+def result_cache_options(cache_dir: str, result_cache: bool) -> Namespace:
+    return make_options(
+        spellcheck_cache_dir=cache_dir,
+        spellcheck_no_cache=False,
+        spellcheck_result_cache=result_cache,
+        spellcheck_result_cache_size=100_000,
+    )
+
+
+def generate_files(count: int) -> List[Tuple[List[str], List[tokenize.TokenInfo]]]:
+    files = []
+    for number in range(count):
+        source = TEMPLATE.format(number=number) * 20
+        lines = source.splitlines(keepends=True)
+        files.append((lines, list(tokenize.generate_tokens(StringIO(source).readline))))
+    return files
+
+
+def check_all(files: List[Tuple[List[str], List[tokenize.TokenInfo]]]) -> float:
+    start = time.perf_counter()
+    for lines, tokens in files:
+        list(SpellCheckPlugin(None, file_tokens=tokens, lines=lines).run())  # type: ignore
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    files = generate_files(count)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        SpellCheckPlugin.parse_options(result_cache_options(cache_dir, result_cache=False))
+        uncached = check_all(files)
+        SpellCheckPlugin.parse_options(result_cache_options(cache_dir, result_cache=True))
+        cold = check_all(files)
+        warm = check_all(files)
+    print(f"no result cache: {uncached * 1e3:7.1f} ms for {count} files")
+    print(f"           cold: {cold * 1e3:7.1f} ms")
+    print(f"           warm: {warm * 1e3:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Compare the regex scanner with tokenize as the front-end of SpellCheckPlugin.run.
+
+The plugin is given the lines of a file, like flake8 does, so the tokenize front-end includes
+tokenizing the file. The largest standard library modules and a generated protobuf stub are
+checked, and every file is also checked for identical results.
+
+Run with ``python -m benchmarks.scanner [number of files]``.
+"""
+import sys
+import sysconfig
+import time
+import tokenize
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from benchmarks import make_options
+from benchmarks.generated_files import generate_stub
+from flake8_spellcheck import LintError, SpellCheckPlugin
+
+
+def load_corpus(count: int) -> Dict[str, List[str]]:
+    paths = sorted(
+        Path(sysconfig.get_paths()["stdlib"]).glob("*.py"), key=lambda path: path.stat().st_size
+    )
+    corpus = {"generated stub": generate_stub(1000).splitlines(keepends=True)}
+    for path in reversed(paths[-count:]):
+        with tokenize.open(path) as fp:
+            corpus[path.name] = fp.readlines()
+    return corpus
+
+
+def check(scanner: str, lines: List[str]) -> Tuple[float, List[LintError]]:
+    SpellCheckPlugin.parse_options(make_options(spellcheck_scanner=scanner))
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        errors = list(SpellCheckPlugin(None, lines=lines).run())  # type: ignore
+        timings.append(time.perf_counter() - start)
+    return min(timings), errors
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    totals = {"tokenize": 0.0, "regex": 0.0}
+    for name, lines in load_corpus(count).items():
+        tokenize_elapsed, expected = check("tokenize", lines)
+        regex_elapsed, errors = check("regex", lines)
+        assert errors == expected, name
+        totals["tokenize"] += tokenize_elapsed
+        totals["regex"] += regex_elapsed
+        print(
+            f"{name:>20} ({len(lines):6d} lines): tokenize {tokenize_elapsed * 1e3:7.1f} ms, "
+            f"regex {regex_elapsed * 1e3:7.1f} ms ({tokenize_elapsed / regex_elapsed:.1f}x)"
+        )
+    print(
+        f"{'total':>20}: tokenize {totals['tokenize'] * 1e3:7.1f} ms, "
+        f"regex {totals['regex'] * 1e3:7.1f} ms ({totals['tokenize'] / totals['regex']:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Compare worker startup and memory of the frozenset and shared backends with many flake8 jobs.
+
+flake8 runs with the spawn start method, where every worker parses the options and loads the
+dictionaries again. The peak proportional set size (PSS, shared pages are split between the
+processes sharing them) of flake8 and all its workers is sampled from ``/proc``, so this only
+runs on Linux. ``load_dictionaries`` comes from ``--spellcheck-stats-file`` and adds up the
+time every process spent loading dictionaries.
+
+Run with ``python -m benchmarks.shared_memory [number of jobs]``.
+"""
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+RUN = """
+import json, multiprocessing, os, sys, threading, time
+from pathlib import Path
+
+def descendants(pid):
+    children = Path(f"/proc/{pid}/task/{pid}/children").read_text().split()
+    return [int(child) for child in children] + [
+        grandchild for child in children for grandchild in descendants(child)
+    ]
+
+def pss(pid):
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines():
+        if line.startswith("Pss:"):
+            return int(line.split()[1]) * 1024
+    return 0
+
+peak = {"pss": 0, "processes": 0}
+done = threading.Event()
+
+def sample():
+    while not done.wait(0.02):
+        try:
+            pids = [os.getpid(), *descendants(os.getpid())]
+            total = sum(pss(pid) for pid in pids)
+        except OSError:
+            continue
+        if total > peak["pss"]:
+            peak.update(pss=total, processes=len(pids))
+
+if __name__ == "__main__":
+    multiprocessing.set_start_method("spawn")
+    from flake8.main.application import Application
+
+    threading.Thread(target=sample, daemon=True).start()
+    start = time.perf_counter()
+    application = Application()
+    application.run(sys.argv[1:])
+    elapsed = time.perf_counter() - start
+    done.set()
+    print(json.dumps({"elapsed": elapsed, **peak}))
+"""
+
+
+def main() -> None:
+    jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    with tempfile.TemporaryDirectory() as directory:
+        for number in range(jobs * 2):
+            (Path(directory) / f"example{number}.py").write_text("value = 1  # a comment\n")
+        for backend in ["frozenset", "shared"]:
+            stats_file = Path(directory) / "stats.json"
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    "-c",
+                    RUN,
+                    f"--jobs={jobs}",
+                    f"--spellcheck-backend={backend}",
+                    f"--spellcheck-cache-dir={directory}/cache",
+                    f"--spellcheck-stats-file={stats_file}",
+                    "--exit-zero",
+                    directory,
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+                cwd=directory,
+            ).stdout
+            result = json.loads(output.splitlines()[-1])
+            stats = json.loads(stats_file.read_text())
+            workers = stats["processes"] - 1
+            load = stats["timers"]["load_dictionaries"]
+            print(
+                f"{backend:>9}: {result['elapsed']:6.2f} s, peak PSS "
+                f"{result['pss'] / 2 ** 20:7.1f} MiB over {result['processes']} processes, "
+                f"load_dictionaries {load * 1e3:7.1f} ms in total over {workers} workers"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Measure what the plugin adds to the startup of a flake8 run that checks a single file.
+
+Every measurement runs in a fresh interpreter, the way an editor integration runs flake8. Set
+``PYTHONPATH`` to another checkout to measure that version instead.
+
+Run with ``python -m benchmarks.startup [number of runs]``.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+IMPORT = """
+import json, time
+import flake8.checker, flake8.main.application, flake8.style_guide
+start = time.perf_counter()
+import flake8_spellcheck
+print(json.dumps(time.perf_counter() - start))
+"""
+
+RUN = """
+import json, sys, time
+from flake8.main.application import Application
+start = time.perf_counter()
+application = Application()
+application.run(sys.argv[1:])
+print(json.dumps(time.perf_counter() - start))
+"""
+
+CASES: Dict[str, List[str]] = {
+    "all codes selected": [],
+    "SC codes ignored": ["--extend-ignore=SC"],
+    "SC codes not selected": ["--select=E,W,F"],
+}
+
+
+def measure(code: str, args: List[str], cwd: str, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", code, *args],
+            check=True,
+            capture_output=True,
+            text=True,
+            cwd=cwd,
+            # Like a real installation, import compiled bytecode instead of compiling every time
+            env={**os.environ, "PYTHONDONTWRITEBYTECODE": ""},
+        ).stdout
+        timings.append(json.loads(output.splitlines()[-1]))
+    return min(timings)
+
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    with tempfile.TemporaryDirectory() as directory:
+        (Path(directory) / "example.py").write_text("# A comment\nvalue = 1\n")
+        # The first run compiles the dictionary cache, which is not what is being measured
+        measure(RUN, ["--exit-zero", "example.py"], directory, 1)
+
+        elapsed = measure(IMPORT, [], directory, runs)
+        print(f"{'import flake8_spellcheck':>24}: {elapsed * 1e3:6.1f} ms")
+        for label, args in CASES.items():
+            elapsed = measure(RUN, ["--exit-zero", "example.py", *args], directory, runs)
+            print(f"{label:>24}: {elapsed * 1e3:6.1f} ms for flake8 example.py")
+
+
+if __name__ == "__main__":
+    main()
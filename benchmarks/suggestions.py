@@ -0,0 +1,106 @@
+"""Measure the latency of suggesting corrections for misspelt words.
+
+Misspellings are made by applying one or two random edits to dictionary words. Suggestions
+come from a bounded edit distance walk of the ``dawg`` word graph, which is compared with the
+naive approach of computing the distance to every dictionary word. Loading the graph is
+timed with an empty cache directory, where it is compiled, and again once it is cached.
+
+Run with ``python -m benchmarks.suggestions [number of misspellings]``.
+"""
+import random
+import statistics
+import string
+import sys
+import tempfile
+import time
+from typing import Callable, Iterable, List
+
+from benchmarks import make_options
+from flake8_spellcheck import SpellCheckPlugin, _suggest
+
+
+def misspell(word: str, edits: int, rng: random.Random) -> str:
+    letters = list(word)
+    for _ in range(edits):
+        position = rng.randrange(len(letters))
+        kind = rng.choice(["insert", "delete", "replace", "swap"])
+        if kind == "insert":
+            letters.insert(position, rng.choice(string.ascii_lowercase))
+        elif kind == "delete":
+            del letters[position]
+        elif kind == "replace":
+            letters[position] = rng.choice(string.ascii_lowercase)
+        elif position + 1 < len(letters):
+            letters[position], letters[position + 1] = letters[position + 1], letters[position]
+    return "".join(letters)
+
+
+def distance(word: str, other: str) -> int:
+    """Optimal string alignment distance, the naive way."""
+    previous, row = [], list(range(len(other) + 1))
+    for i, char in enumerate(word, 1):
+        previous, row = row, [i] + [0] * len(other)
+        for j, other_char in enumerate(other, 1):
+            row[j] = min(previous[j] + 1, row[j - 1] + 1, previous[j - 1] + (char != other_char))
+    return row[-1]
+
+
+def naive_suggest(words: Iterable[str], word: str, max_distance: int) -> List[str]:
+    return [
+        candidate
+        for candidate in words
+        if abs(len(candidate) - len(word)) <= max_distance
+        and distance(word, candidate) <= max_distance
+    ]
+
+
+def report(label: str, suggest: Callable[[str], object], misses: List[str]) -> None:
+    timings = []
+    for word in misses:
+        start = time.perf_counter()
+        suggest(word)
+        timings.append(time.perf_counter() - start)
+    quantiles = statistics.quantiles(timings, n=20, method="inclusive")
+    print(
+        f"{label:>34}: median {statistics.median(timings) * 1e3:7.2f} ms, "
+        f"p95 {quantiles[-1] * 1e3:7.2f} ms, max {max(timings) * 1e3:7.2f} ms per miss"
+    )
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        options = make_options(spellcheck_cache_dir=directory, spellcheck_no_cache=False)
+        words, _ = SpellCheckPlugin._compile_dictionaries(options)
+        candidates = sorted(word for word in words if len(word) >= 4 and word.isalpha())
+        misses: List[str] = []
+        while len(misses) < count:
+            miss = misspell(rng.choice(candidates), rng.choice([1, 1, 2]), rng)
+            if miss not in words:
+                misses.append(miss)
+
+        for label in ["load graph, empty cache", "load graph, cached"]:
+            start = time.perf_counter()
+            graphs = SpellCheckPlugin._load_suggestion_graphs(options)
+            print(f"{label:>34}: {(time.perf_counter() - start) * 1e3:7.1f} ms")
+
+        for max_distance in [1, 2]:
+            for budget in [float("inf"), 0.05]:
+                suggester = _suggest.Suggester(lambda: graphs, 3, max_distance, budget, maxsize=0)
+                limit = f"budget {budget * 1e3:g} ms" if budget < float("inf") else "no budget"
+                report(
+                    f"graph, distance {max_distance}, {limit}",
+                    lambda word: suggester.suggest(word, True),
+                    misses,
+                )
+        for max_distance in [1, 2]:
+            report(
+                f"naive, distance {max_distance}",
+                lambda word: naive_suggest(words, word, max_distance),
+                misses[:5],
+            )
+
+
+if __name__ == "__main__":
+    main()
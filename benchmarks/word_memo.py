@@ -0,0 +1,46 @@
+"""Measure SpellCheckPlugin.run throughput over the standard library with and without memoization.
+
+Run with ``python -m benchmarks.word_memo [number of files]``.
+"""
+import sys
+import sysconfig
+import time
+import tokenize
+from pathlib import Path
+from typing import List
+
+from benchmarks import make_options
+from flake8_spellcheck import SpellCheckPlugin
+
+
+def load_corpus(count: int) -> List[List[tokenize.TokenInfo]]:
+    corpus = []
+    for path in sorted(Path(sysconfig.get_paths()["stdlib"]).glob("*.py"))[:count]:
+        try:
+            with tokenize.open(path) as fp:
+                corpus.append(list(tokenize.generate_tokens(fp.readline)))
+        except (SyntaxError, UnicodeDecodeError):
+            continue
+    return corpus
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    corpus = load_corpus(count)
+    total_tokens = sum(len(tokens) for tokens in corpus)
+    for memo_size in [0, 65536]:
+        SpellCheckPlugin.parse_options(make_options(spellcheck_memo_size=memo_size))
+        start = time.perf_counter()
+        for tokens in corpus:
+            list(SpellCheckPlugin(None, file_tokens=tokens).run())  # type: ignore
+        elapsed = time.perf_counter() - start
+        print(
+            f"memo size {memo_size:>6}: {elapsed * 1e3:7.1f} ms, "
+            f"{total_tokens / elapsed:9.0f} tokens/s over {len(corpus)} files"
+        )
+        if memo_size:
+            print(f"  {SpellCheckPlugin.memo.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,13 +8,21 @@ export LC_ALL=C
 
 all_sorted="true"
 
-for file in "whitelist.txt" flake8_spellcheck/*.txt; do
+for file in "whitelist.txt" flake8_spellcheck/*.txt flake8_spellcheck/no_symbols/*.txt; do
   if [[ "$(sort < "$file")" != "$(<"$file")" ]]; then
     echo "$file is not sorted correctly" >&2
     all_sorted="false"
   fi
 done
 
+# The first line of a dictionary with suffix rules is the number of words
+for file in flake8_spellcheck/*.dic; do
+  if [[ "$(tail -n +2 "$file" | sort)" != "$(tail -n +2 "$file")" ]]; then
+    echo "$file is not sorted correctly" >&2
+    all_sorted="false"
+  fi
+done
+
 if [[ "$all_sorted" == "false" ]]; then
   exit 1
 fi
@@ -0,0 +1,27 @@
+#!/usr/bin/env python
+"""Rewrite a dictionary with suffix rules, like flake8_spellcheck/en_US.dic, with the fewest roots.
+
+    python compress-dictionary.py en_US [words.txt]
+
+The words of words.txt, one per line, replace those of the dictionary. Without it, the words
+the dictionary derives now are compressed again, e.g. after adding words to it by hand.
+"""
+import sys
+from pathlib import Path
+
+from flake8_spellcheck import DICTIONARY_PATH, _affixes, load_dictionary
+
+
+def main() -> None:
+    name = sys.argv[1]
+    if len(sys.argv) > 2:
+        words = set(Path(sys.argv[2]).read_text().lower().split("\n"))
+    else:
+        words = set(load_dictionary(name))
+    suffixes = _affixes.parse_aff((DICTIONARY_PATH / f"{name}.aff").read_text())
+    flags = _affixes.compress(words, suffixes)
+    (DICTIONARY_PATH / f"{name}.dic").write_text(_affixes.render_dic(flags))
+
+
+if __name__ == "__main__":
+    main()
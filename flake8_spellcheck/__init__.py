@@ -1,24 +1,86 @@
+import ast
+import copy
 import enum
+import functools
 import importlib.metadata
+import io
+import itertools
+import multiprocessing
 import os
 import re
+import struct
+import sys
+import time
 import tokenize
 import unicodedata
 from argparse import Namespace
+from array import array
 from ast import AST
 from pathlib import Path
 from string import digits
 from tokenize import TokenInfo
-from typing import Any, FrozenSet, Iterable, Iterator, List, Optional, Tuple, Type
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Container,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Pattern,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
 
+from flake8.exceptions import ExecutionError
 from flake8.options.manager import OptionManager
+from flake8.style_guide import Decision, DecisionEngine
+
+from . import (
+    _affixes,
+    _backends,
+    _cache,
+    _compounds,
+    _diff,
+    _patterns,
+    _report,
+    _scanner,
+    _stats,
+    _suggest,
+)
 
 NOQA_REGEX = re.compile(r"#[\s]*noqa:[\s]*[\D]+[\d]+")
+STRING_PREFIX_REGEX = re.compile(r"[a-zA-Z]*('\'\'|\"\"\"|'|\")")
+ESCAPE_REGEX = re.compile(
+    r"\\(?:N\{[^}]*\}|x[0-9a-fA-F]{2}|u[0-9a-fA-F]{4}|U[0-9a-fA-F]{8}|[0-7]{1,3}|.)", re.DOTALL
+)
+TARGET_CODES = {"comments": "SC100", "names": "SC200", "docstrings": "SC300", "strings": "SC300"}
+# Python 3.12+ tokenizes the literal parts of f-strings separately
+FSTRING_MIDDLE: Optional[int] = getattr(tokenize, "FSTRING_MIDDLE", None)
 DICTIONARY_PATH = Path(__file__).parent
+# Generated by update-no-symbols.py, see NoSymbolsSet
+NO_SYMBOLS_PATH = DICTIONARY_PATH / "no_symbols"
+# "<pid>:<segment name>" of the dictionaries shared by a flake8 process with its workers
+SHARED_DICTIONARIES_VARIABLE = "_FLAKE8_SPELLCHECK_SHARED_DICTIONARIES"
 
 
 LintError = Tuple[int, int, str, Type["SpellCheckPlugin"]]
 Position = Tuple[int, int]
+WordSplitter = Callable[[str, Position], Iterator[Tuple[Position, str]]]
+WordSet = Container[str]
+# The words of a dictionary as compiled, before they are packed by a backend
+CompiledWords = Union[FrozenSet[str], _affixes.AffixWordSet]
+# Position, text, whether symbols are kept and token type of a value to split and check
+Candidate = Tuple[Position, str, bool, int]
 
 
 class WordCase(enum.Enum):
@@ -27,9 +89,39 @@ class WordCase(enum.Enum):
     CAMEL = enum.auto()
 
 
-all_unicode = "".join(chr(i) for i in range(65536))
-unicode_lowercase_letters = "".join(c for c in all_unicode if unicodedata.category(c) == "Ll")
-unicode_uppercase_letters = "".join(c for c in all_unicode if unicodedata.category(c) == "Lu")
+class CharClass(enum.Enum):
+    LOWER = enum.auto()
+    UPPER = enum.auto()
+    DIGIT = enum.auto()
+    OTHER = enum.auto()
+
+
+class CharClassTable(Dict[str, CharClass]):
+    """Lazily populated mapping of characters to their CharClass.
+
+    Characters are classified with ``unicodedata`` the first time they are seen and
+    memoized, so every lookup after that is a single dict access. Nothing is computed
+    at import time and the whole code point range, astral planes included, is covered.
+    """
+
+    def __missing__(self, char: str) -> CharClass:
+        if char in digits:
+            char_class = CharClass.DIGIT
+        else:
+            category = unicodedata.category(char)
+            if category == "Ll":
+                char_class = CharClass.LOWER
+            elif category == "Lu":
+                char_class = CharClass.UPPER
+            else:
+                char_class = CharClass.OTHER
+        self[char] = char_class
+        return char_class
+
+
+char_classes = CharClassTable()
+# Module level aliases keep enum attribute access out of the per-character loops
+LOWER, UPPER, DIGIT = CharClass.LOWER, CharClass.UPPER, CharClass.DIGIT
 
 
 # Really simple detection function
@@ -51,12 +143,13 @@ def parse_camel_case(name: str, position: Position) -> Iterator[Tuple[Position,
     buffer = ""
     for c in name:
         index += 1
-        if c in unicode_lowercase_letters or c in digits or c in "'":
+        char_class = char_classes[c]
+        if char_class is LOWER or char_class is DIGIT or c == "'":
             buffer += c
         else:
             if buffer:
                 yield (position[0], start), buffer
-            if c in unicode_uppercase_letters:
+            if char_class is UPPER:
                 buffer = c
                 start = index - 1
             else:
@@ -73,7 +166,8 @@ def parse_snake_case(name: str, position: Position) -> Iterator[Tuple[Position,
     buffer = ""
     for c in name:
         index += 1
-        if c in unicode_lowercase_letters or c in digits or c in unicode_uppercase_letters:
+        char_class = char_classes[c]
+        if char_class is LOWER or char_class is DIGIT or char_class is UPPER:
             buffer += c
         else:
             if buffer:
@@ -86,7 +180,104 @@ def parse_snake_case(name: str, position: Position) -> Iterator[Tuple[Position,
         yield (position[0], start), buffer
 
 
+def _regex_character_class(chars: str) -> str:
+    """Collapse a sorted string of characters into a regex character class body."""
+    ranges = []
+    start = previous = chars[0]
+    for c in chars[1:]:
+        if ord(c) != ord(previous) + 1:
+            ranges.append((start, previous))
+            start = c
+        previous = c
+    ranges.append((start, previous))
+    return "".join(
+        re.escape(first) if first == last else f"{re.escape(first)}-{re.escape(last)}"
+        for first, last in ranges
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _unicode_splitter_patterns() -> Tuple[Pattern[str], Pattern[str]]:
+    """Build the snake and camel case patterns for the full Unicode range.
+
+    ``re`` has no support for Unicode categories, so the ``Ll`` and ``Lu`` classes are
+    assembled from ``unicodedata`` the first time a non-ASCII name is split.
+    """
+    # Decoding an array of code points is much faster than calling chr() a million times.
+    # Surrogates are skipped as they can not be decoded (and are never letters anyway).
+    code_points = array("I", range(0xD800))
+    code_points.extend(range(0xE000, sys.maxunicode + 1))
+    all_unicode = code_points.tobytes().decode(
+        "utf-32-le" if sys.byteorder == "little" else "utf-32-be"
+    )
+    # Ll is a subset of str.islower and Lu of str.isupper, filtering with those first
+    # leaves only a few thousand characters to run through unicodedata.category
+    lower = "".join(c for c in filter(str.islower, all_unicode) if unicodedata.category(c) == "Ll")
+    upper = "".join(c for c in filter(str.isupper, all_unicode) if unicodedata.category(c) == "Lu")
+    lower = _regex_character_class(lower)
+    upper = _regex_character_class(upper)
+    return (
+        re.compile(f"[{lower}{upper}0-9]+"),
+        re.compile(f"[{upper}][{lower}0-9']*|[{lower}0-9']+"),
+    )
+
+
+ASCII_SNAKE_CASE_REGEX = re.compile(r"[a-zA-Z0-9]+")
+ASCII_CAMEL_CASE_REGEX = re.compile(r"[A-Z][a-z0-9']*|[a-z0-9']+")
+
+
+def regex_parse_snake_case(name: str, position: Position) -> Iterator[Tuple[Position, str]]:
+    """Regex based equivalent of parse_snake_case."""
+    pattern = ASCII_SNAKE_CASE_REGEX if name.isascii() else _unicode_splitter_patterns()[0]
+    line, offset = position
+    for match in pattern.finditer(name):
+        yield (line, offset + match.start()), match.group()
+
+
+def regex_parse_camel_case(name: str, position: Position) -> Iterator[Tuple[Position, str]]:
+    """Regex based equivalent of parse_camel_case."""
+    pattern = ASCII_CAMEL_CASE_REGEX if name.isascii() else _unicode_splitter_patterns()[1]
+    line, offset = position
+    for match in pattern.finditer(name):
+        yield (line, offset + match.start()), match.group()
+
+
+# Word splitting engines selectable with --spellcheck-word-splitter
+WORD_SPLITTERS: Dict[str, Dict[WordCase, WordSplitter]] = {
+    "loop": {WordCase.SNAKE: parse_snake_case, WordCase.CAMEL: parse_camel_case},
+    "regex": {WordCase.SNAKE: regex_parse_snake_case, WordCase.CAMEL: regex_parse_camel_case},
+}
+
+
+# The grammar accepted by float() for ASCII strings, including PEP 515 underscores
+NUMBER_REGEX = re.compile(
+    r"""
+    [+-]?
+    (?:
+        (?:
+            [0-9](?:_?[0-9])*(?:\.(?:[0-9](?:_?[0-9])*)?)?
+            | \.[0-9](?:_?[0-9])*
+        )
+        (?:[eE][+-]?[0-9](?:_?[0-9])*)?
+        | inf | infinity | nan
+    )
+    """,
+    re.VERBOSE | re.IGNORECASE,
+)
+NUMBER_START = frozenset("0123456789+-.iInN")
+
+
 def is_number(value: Any) -> bool:
+    if isinstance(value, str) and value.isascii():
+        # Avoid raising and catching a ValueError for every word that is not a number
+        value = value.strip()
+        if value.isdigit():
+            return True
+        return (
+            value != "" and value[0] in NUMBER_START and NUMBER_REGEX.fullmatch(value) is not None
+        )
+
+    # Non-ASCII digits and whitespace, as well as non-string values, are left to float()
     try:
         float(value)
     except ValueError:
@@ -95,72 +286,615 @@ def is_number(value: Any) -> bool:
         return True
 
 
+def blank(text: str) -> str:
+    """Replace every character except newlines with a space, preserving positions."""
+    return re.sub(r"[^\n]", " ", text)
+
+
+def scan_words(text: str, start: Position) -> Iterator[Tuple[Position, str]]:
+    """Yield every space separated word in ``text`` along with its source position.
+
+    ``start`` is the position of the beginning of ``text`` in the file, lines after the
+    first one start at column 0.
+    """
+    line, column = start
+    for line_text in text.split("\n"):
+        for word in line_text.split(" "):
+            if word:
+                yield (line, column), word
+            column += len(word) + 1
+        line += 1
+        column = 0
+
+
+def comment_text(comment: str) -> str:
+    """Blank the leading ``#`` characters and ``noqa`` pragmas of a comment."""
+    text = comment.lstrip("#")
+    if "noqa" in text:
+        # strip out all `noqa: [code]` style comments so they aren't erroneously checked
+        # see https://github.com/MichaelAquilina/flake8-spellcheck/issues/36 for info
+        text = NOQA_REGEX.sub(lambda match: " " * len(match.group()), text)
+    return " " * (len(comment) - len(text)) + text
+
+
+def string_text(literal: str) -> str:
+    """Blank the prefix, quotes and escape sequences of a string literal."""
+    match = STRING_PREFIX_REGEX.match(literal)
+    if match is None:
+        return literal
+    quote = match.group(1)
+    body_start, body_end = match.end(), len(literal) - len(quote)
+    body = literal[body_start:body_end]
+    if "r" not in match.group().lower():
+        body = ESCAPE_REGEX.sub(lambda escape: blank(escape.group()), body)
+    return blank(match.group()) + body
+
+
 def get_code(token_type: int) -> str:
     if token_type == tokenize.COMMENT:
         return "SC100"
     elif token_type == tokenize.NAME:
         return "SC200"
+    elif token_type == tokenize.STRING or token_type == FSTRING_MIDDLE:
+        return "SC300"
     else:
         raise ValueError(f"Unknown token_type {token_type}")
 
 
+class Misspelling(NamedTuple):
+    """A possibly misspelt word, at the line and 0-based column it starts at."""
+
+    line: int
+    column: int
+    code: str
+    word: str
+    suggestions: Tuple[str, ...] = ()
+
+    @property
+    def message(self) -> str:
+        message = f"{self.code} Possibly misspelt word: '{self.word}'"
+        if not self.suggestions:
+            return message
+        quoted = [f"'{suggestion}'" for suggestion in self.suggestions]
+        alternatives = " or ".join(filter(None, [", ".join(quoted[:-1]), quoted[-1]]))
+        return f"{message} (did you mean {alternatives}?)"
+
+
+def selected_targets(options: Namespace) -> FrozenSet[str]:
+    """Drop the targets whose error code flake8 is not going to report."""
+    targets = frozenset(options.spellcheck_targets)
+    try:
+        decider = DecisionEngine(options)
+    except AttributeError:
+        # The options were not parsed by flake8, select everything
+        return targets
+    return frozenset(
+        target
+        for target in targets
+        if target not in TARGET_CODES
+        or decider.decision_for(TARGET_CODES[target]) == Decision.Selected
+    )
+
+
+def may_run_in_parallel(options: Namespace) -> bool:
+    """Whether flake8 might check files in worker processes."""
+    if str(getattr(options, "jobs", "1")) == "1":
+        return False
+    filenames = getattr(options, "filenames", None) or ["."]
+    return not (len(filenames) == 1 and (filenames[0] == "-" or os.path.isfile(filenames[0])))
+
+
+@functools.lru_cache(maxsize=None)
+def _version() -> str:
+    return importlib.metadata.version(__name__)
+
+
+class _Version:
+    """Look up the installed version on first access, the lookup is slow and rarely needed."""
+
+    def __get__(self, instance: object, owner: type) -> str:
+        return _version()
+
+
+def __getattr__(name: str) -> str:
+    if name == "__version__":
+        return _version()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def strip_symbols(word: str) -> str:
+    """Strip the apostrophes of a dictionary word, the way names are spelled."""
+    if word.endswith("'s"):
+        return word.replace("'s", "")
+    return word.replace("'", "")
+
+
+def no_symbols_extra(words: Iterable[str]) -> Set[str]:
+    """The stripped forms of ``words`` that a ``NoSymbolsSet`` over them has to add."""
+    with_symbols = [word for word in words if "'" in word]
+    variants = {strip_symbols(word) for word in with_symbols}
+    return variants.difference(words).union(variants.intersection(with_symbols))
+
+
+class NoSymbolsSet:
+    """The words with their symbols stripped, without a second copy of the dictionary.
+
+    Only words with an apostrophe change when they are stripped, so the set consists of
+    the words without one plus ``extra``, the stripped forms that are not among them.
+    """
+
+    def __init__(self, words: WordSet, extra: WordSet) -> None:
+        self.words = words
+        self.extra = extra
+
+    def __contains__(self, word: object) -> bool:
+        if word in self.extra:
+            return True
+        return isinstance(word, str) and "'" not in word and word in self.words
+
+
+def missing_words(dictionary: WordSet, words: Set[str]) -> Set[str]:
+    """Return the ``words`` that are not in ``dictionary``, in one set difference if possible."""
+    if isinstance(dictionary, (set, frozenset)):
+        return words.difference(dictionary)
+    if isinstance(dictionary, _affixes.AffixWordSet):
+        return dictionary.missing(words)
+    if isinstance(dictionary, NoSymbolsSet):
+        unknown = missing_words(dictionary.extra, words)
+        with_symbols = {word for word in unknown if "'" in word}
+        return with_symbols | missing_words(dictionary.words, unknown - with_symbols)
+    return {word for word in words if word not in dictionary}
+
+
+def dictionary_paths(name: str) -> List[Path]:
+    """The files of a shipped dictionary, a word list or root words and their suffix rules."""
+    dic_path = DICTIONARY_PATH / f"{name}.dic"
+    if dic_path.exists():
+        return [dic_path, dic_path.with_suffix(".aff")]
+    return [DICTIONARY_PATH / f"{name}.txt"]
+
+
+def dictionary_names() -> List[str]:
+    return sorted(
+        {path.stem for pattern in ["*.txt", "*.dic"] for path in DICTIONARY_PATH.glob(pattern)}
+    )
+
+
+def load_dictionary(name: str) -> CompiledWords:
+    """Load the lowercased words of a shipped dictionary."""
+    paths = dictionary_paths(name)
+    if len(paths) == 1:
+        return frozenset(paths[0].read_text().lower().split("\n"))
+    dic_path, aff_path = paths
+    flags = _affixes.parse_dic(dic_path.read_text())
+    return _affixes.AffixWordSet(
+        frozenset(flags),
+        {word: word_flags for word, word_flags in flags.items() if word_flags},
+        _affixes.parse_aff(aff_path.read_text()),
+    )
+
+
+def normalize_word(word: str) -> str:
+    return word.lower().strip("'").strip('"')
+
+
+def _allowlist_sources(options: Namespace) -> List[Tuple[str, List[str]]]:
+    entries = []
+    if os.path.exists(options.spellcheck_allowlist_file):
+        with open(options.spellcheck_allowlist_file) as fp:
+            entries = fp.read().split("\n")
+    return [
+        (options.spellcheck_allowlist_file, entries),
+        ("--spellcheck-allowlist", options.spellcheck_allowlist or []),
+    ]
+
+
+def read_allowlist(options: Namespace) -> List[str]:
+    """The entries of the allowlist file and of ``--spellcheck-allowlist``, words or patterns."""
+    return [entry for _, entries in _allowlist_sources(options) for entry in entries]
+
+
+def compile_allowlist_patterns(options: Namespace) -> Optional[Pattern[str]]:
+    """Compile the patterns of the allowlist file and of ``--spellcheck-allowlist``.
+
+    Raises ``ExecutionError`` for an invalid pattern, naming the allowlist it is in, which
+    flake8 reports as a critical error before any file is checked.
+    """
+    sources = _allowlist_sources(options)
+    _, patterns = _patterns.split_entries(entry for _, entries in sources for entry in entries)
+    try:
+        return _patterns.compile_patterns(patterns)
+    except ValueError as error:
+        combined_error = error
+    for source, entries in sources:
+        try:
+            _patterns.compile_patterns(_patterns.split_entries(entries)[1])
+        except ValueError as error:
+            raise ExecutionError(f"{source}: {error}") from None
+    raise ExecutionError(str(combined_error))
+
+
+class AllowlistLayer:
+    """The words of an allowlist file in a subdirectory, on top of those of its parents.
+
+    A directory without an allowlist file shares the layer of its parent, and every layer
+    only holds the words of its own file, so that no words are copied between directories.
+    """
+
+    def __init__(
+        self, path: str, words: Iterable[str], parent: Optional["AllowlistLayer"]
+    ) -> None:
+        self.path = path
+        allowed, patterns = _patterns.split_entries(words)
+        self.words = frozenset(allowed)
+        try:
+            self.patterns = _patterns.compile_patterns(patterns)
+        except ValueError as error:
+            raise ValueError(f"{path}: {error}") from None
+        no_symbols = {word for word in allowed if "'" not in word} | no_symbols_extra(allowed)
+        # Most allowlists have no words with apostrophes, so both forms are the same set
+        self.no_symbols = self.words if no_symbols == allowed else frozenset(no_symbols)
+        self.parent = parent
+
+    def allows(self, word: str, use_symbols: bool) -> bool:
+        test_word = normalize_word(word)
+        layer: Optional[AllowlistLayer] = self
+        while layer is not None:
+            if test_word in (layer.words if use_symbols else layer.no_symbols):
+                return True
+            if layer.patterns is not None and layer.patterns.fullmatch(test_word):
+                return True
+            layer = layer.parent
+        return False
+
+    def paths(self) -> Iterator[str]:
+        layer: Optional[AllowlistLayer] = self
+        while layer is not None:
+            yield layer.path
+            layer = layer.parent
+
+
+class NestedAllowlists:
+    """The allowlist files named ``name`` in the subdirectories of ``root``.
+
+    The layer of a directory is built when the first file in it is checked, and cached by
+    its path, so that any other file in it costs a dictionary lookup. The allowlist file of
+    ``root`` itself is compiled into the dictionaries.
+    """
+
+    def __init__(self, root: str, name: str) -> None:
+        self.prefix = os.path.join(root, "")
+        self.name = name
+        self._layers: Dict[str, Optional[AllowlistLayer]] = {}
+
+    def for_file(self, filename: str) -> Optional[AllowlistLayer]:
+        return self.layer(os.path.dirname(os.path.abspath(filename)))
+
+    def layer(self, directory: str) -> Optional[AllowlistLayer]:
+        try:
+            return self._layers[directory]
+        except KeyError:
+            pass
+
+        layer = None
+        if directory.startswith(self.prefix):
+            layer = self.layer(os.path.dirname(directory))
+            path = os.path.join(directory, self.name)
+            try:
+                with open(path) as fp:
+                    layer = AllowlistLayer(path, fp.read().split("\n"), layer)
+            except OSError:
+                pass
+        self._layers[directory] = layer
+        return layer
+
+
+class WordMemo:
+    """Bounded, process wide memoization of word splitting and dictionary lookups.
+
+    ``split`` maps a name, or a single space separated word of a comment, to the words
+    it is made of as ``(offset, word)`` tuples relative to its start. ``verdict`` maps a
+    single word to whether it is valid. Both are LRU caches bounded by ``maxsize``.
+    """
+
+    def __init__(
+        self,
+        words: WordSet,
+        no_symbols: WordSet,
+        word_splitters: Dict[WordCase, WordSplitter],
+        maxsize: Optional[int],
+    ) -> None:
+        self.words = words
+        self.no_symbols = no_symbols
+        self.word_splitters = word_splitters
+        # Set differences beat memoized lookups, which only pay off for the packed backends
+        self.batch_lookups = isinstance(words, (set, frozenset, _affixes.AffixWordSet))
+        self.split = functools.lru_cache(maxsize=maxsize)(self._split)
+        self.verdict = functools.lru_cache(maxsize=maxsize)(self._verdict)
+
+    def _split(self, value: str) -> Tuple[Tuple[int, str], ...]:
+        case = detect_case(value)
+        if case == WordCase.URL:
+            # Nothing to do here
+            return ()
+        return tuple(
+            (column, word) for (_, column), word in self.word_splitters[case](value, (0, 0))
+        )
+
+    def _verdict(self, word: str, use_symbols: bool) -> bool:
+        test_word = normalize_word(word)
+        # Tokens like ' are no words at all
+        if not test_word:
+            return True
+        if use_symbols:
+            valid = test_word in self.words
+        else:
+            valid = test_word in self.no_symbols
+        # Need a way of matching words without symbols
+        return valid or is_number(word)
+
+    def misspellings(self, words: Iterable[str], use_symbols: bool) -> Set[str]:
+        """Return the misspelt words among ``words``, looking every unique word up once."""
+        if not self.batch_lookups:
+            return {word for word in words if not self.verdict(word, use_symbols)}
+
+        by_test_word: Dict[str, List[str]] = {}
+        for word in words:
+            by_test_word.setdefault(normalize_word(word), []).append(word)
+        by_test_word.pop("", None)
+        dictionary = self.words if use_symbols else self.no_symbols
+        return {
+            word
+            for test_word in missing_words(dictionary, set(by_test_word))
+            for word in by_test_word[test_word]
+            if not is_number(word)
+        }
+
+    def stats(self) -> Dict[str, int]:
+        split_info = self.split.cache_info()
+        verdict_info = self.verdict.cache_info()
+        return {
+            "split_hits": split_info.hits,
+            "split_misses": split_info.misses,
+            "verdict_hits": verdict_info.hits,
+            "verdict_misses": verdict_info.misses,
+        }
+
+
+# Packed dictionary backends: the functions that pack word sets and unpack a buffer
+MAPPED_BACKENDS: Dict[
+    str, Tuple[Callable[[Iterable[Iterable[str]]], bytes], Callable[[Any], Sequence[WordSet]]]
+] = {
+    "mmap": (_backends.pack_word_sets, _backends.unpack_word_sets),
+    "dawg": (_backends.pack_word_graphs, _backends.unpack_word_graphs),
+}
+
+
 class SpellCheckPlugin:
     name = "flake8-spellcheck"
-    version = importlib.metadata.version(__name__)
+    version = _Version()
 
     spellcheck_targets: FrozenSet[str] = frozenset()
-    no_symbols: FrozenSet[str] = frozenset()
-    words: FrozenSet[str] = frozenset()
+    word_splitters: Dict[WordCase, WordSplitter] = WORD_SPLITTERS["loop"]
+    scanner = "regex"
+    result_cache_dir: Optional[Path] = None
+    result_cache_size = 10000
+    # Entries this process added to the result cache, see _before_result_cache_write
+    result_cache_writes = 0
+    configuration_fingerprint = ""
+    no_symbols: WordSet = frozenset()
+    words: WordSet = frozenset()
+    memo = WordMemo(words, no_symbols, word_splitters, maxsize=0)
+    stats: Optional[_stats.Stats] = None
+    report: Optional[_report.Report] = None
+    suggester: Optional[_suggest.Suggester] = None
+    nested_allowlists: Optional[NestedAllowlists] = None
+    # The globs and regexes of the allowlist, only matched against words missing from the others
+    allowlist_patterns: Optional[Pattern[str]] = None
+    decomposer: Optional[_compounds.Decomposer] = None
+    # The lines to check of every file in --spellcheck-diff, by normalized path
+    changed_lines: Optional[_diff.ChangedLines] = None
+    # Options whose dictionaries are loaded when the first file is checked
+    pending_options: Optional[Namespace] = None
 
     def __init__(
         self,
         tree: AST,
         filename: str = "(none)",
+        lines: Optional[List[str]] = None,
+        *,
         file_tokens: Optional[Iterable[TokenInfo]] = None,
     ) -> None:
-        if file_tokens is None:
-            raise ValueError("Plugin requires file_tokens")
-        else:
-            self.file_tokens: Iterable[TokenInfo] = file_tokens
+        # flake8 only passes the positional parameters. Asking it for file_tokens would make
+        # it tokenize every file for this plugin, so they are generated from the lines if needed.
+        if file_tokens is None and lines is None:
+            raise ValueError("Plugin requires lines or file_tokens")
+        self._file_tokens = file_tokens
+        self.tree = tree
+        self.filename = filename
+        self.lines = lines
+        self._docstrings: Optional[FrozenSet[Position]] = None
+        self.changed: Optional[FrozenSet[int]] = None
+        if self.changed_lines is not None:
+            self.changed = self.changed_lines.get(_diff.normalize_path(filename), frozenset())
+        self.allowlist: Optional[AllowlistLayer] = None
+        if self.nested_allowlists is not None:
+            self.allowlist = self.nested_allowlists.for_file(filename)
+        if self.pending_options is not None:
+            self.load_pending_dictionaries()
+
+    @classmethod
+    def load_dictionaries(cls, options: Namespace) -> Tuple[WordSet, WordSet]:
+        if options.spellcheck_backend in MAPPED_BACKENDS:
+            return cls._load_mapped_dictionaries(options)
+        elif options.spellcheck_backend == "shared":
+            return cls._load_shared_dictionaries(options)
+
+        cache_path = cls._dictionary_cache_path(options, "pickle")
+        if cache_path is not None:
+            cached = _cache.read_pickle(cache_path)
+            if (
+                isinstance(cached, tuple)
+                and len(cached) == 2
+                and isinstance(cached[0], (frozenset, _affixes.AffixWordSet))
+                and isinstance(cached[1], frozenset)
+            ):
+                return cached[0], NoSymbolsSet(*cached)
+
+        words, extra = cls._compile_dictionaries(options)
+
+        if cache_path is not None:
+            _cache.write_pickle(cache_path, (words, extra))
+            _cache.prune(cache_path.parent, "dictionaries-*.pickle", keep=8)
+        return words, NoSymbolsSet(words, extra)
 
     @classmethod
-    def load_dictionaries(cls, options: Namespace) -> Tuple[FrozenSet[str], FrozenSet[str]]:
-        words = set()
+    def _load_mapped_dictionaries(cls, options: Namespace) -> Tuple[WordSet, WordSet]:
+        words, extra = cls._load_packed(options, options.spellcheck_backend)
+        return words, NoSymbolsSet(words, extra)
+
+    @classmethod
+    def _load_packed(cls, options: Namespace, backend: str) -> Sequence[WordSet]:
+        """Load the words and extra no symbols words in a packed backend.
+
+        They are memory mapped from the cache directory, and compiled into it if needed.
+        """
+        pack, unpack = MAPPED_BACKENDS[backend]
+        cache_path = cls._dictionary_cache_path(options, backend)
+        if cache_path is not None:
+            try:
+                return unpack(_backends.map_packed(cache_path))
+            except (OSError, ValueError, struct.error):
+                pass
+
+        packed = pack(cls._compile_dictionaries(options))
+        if cache_path is not None:
+            try:
+                _backends.write_packed(cache_path, packed)
+                word_sets = unpack(_backends.map_packed(cache_path))
+            except OSError:
+                pass
+            else:
+                _cache.prune(cache_path.parent, f"dictionaries-*.{backend}", keep=8)
+                return word_sets
+
+        # Without a cache directory the packed word sets can only live in this process
+        return unpack(packed)
+
+    @classmethod
+    def _load_suggestion_graphs(cls, options: Namespace) -> Sequence[_backends.WordGraph]:
+        return cast(Sequence[_backends.WordGraph], cls._load_packed(options, "dawg"))
+
+    @classmethod
+    def _load_shared_dictionaries(cls, options: Namespace) -> Tuple[WordSet, WordSet]:
+        """Attach to the dictionaries shared by the parent flake8 process, or share them.
+
+        Spawned workers parse the options again and find the segment through the environment
+        they inherit, forked workers inherit the dictionaries themselves.
+        """
+        fingerprint = cls.dictionary_fingerprint(options)[:16]
+        owner, _, name = os.environ.get(SHARED_DICTIONARIES_VARIABLE, "").partition(":")
+        parent = multiprocessing.parent_process()
+        if parent is not None and owner == str(parent.pid) and name.endswith(fingerprint):
+            try:
+                words, extra = _backends.unpack_word_sets(_backends.attach_shared(name))
+            except (OSError, ValueError, struct.error):
+                pass
+            else:
+                return words, NoSymbolsSet(words, extra)
+
+        packed = _backends.pack_word_sets(cls._compile_dictionaries(options))
+        if parent is None and may_run_in_parallel(options):
+            # Short enough for the 31 character limit of macOS
+            name = f"sc{os.getpid()}_{fingerprint}"
+            try:
+                buffer = _backends.share_packed(name, packed)
+            except OSError:
+                pass
+            else:
+                os.environ[SHARED_DICTIONARIES_VARIABLE] = f"{os.getpid()}:{name}"
+                words, extra = _backends.unpack_word_sets(buffer)
+                return words, NoSymbolsSet(words, extra)
+
+        words, extra = _backends.unpack_word_sets(packed)
+        return words, NoSymbolsSet(words, extra)
+
+    @classmethod
+    def dictionary_fingerprint(cls, options: Namespace) -> str:
+        """Fingerprint everything that affects the contents of the loaded dictionaries."""
+        parts = [cls.version]
         for dictionary_name in options.dictionaries:
-            dictionary_path = DICTIONARY_PATH / f"{dictionary_name}.txt"
-            data = dictionary_path.read_text()
-            words |= {w.lower() for w in data.split("\n")}
-
-        if os.path.exists(options.spellcheck_allowlist_file):
-            with open(options.spellcheck_allowlist_file) as fp:
-                allowlist = fp.read()
-            allowlist_data_from_file = {w.lower() for w in allowlist.split("\n")}
-            words |= allowlist_data_from_file
-
-        if options.spellcheck_allowlist is not None:
-            allowlist_data = {w.lower() for w in options.spellcheck_allowlist}
-            words |= allowlist_data
-
-        # Hacky way of getting dictionary with symbols stripped
-        no_symbols = set()
-        for w in words:
-            if w.endswith("'s"):
-                no_symbols.add(w.replace("'s", ""))
+            parts.append(dictionary_name)
+            parts += map(_cache.file_fingerprint, dictionary_paths(dictionary_name))
+            parts.append(_cache.file_fingerprint(NO_SYMBOLS_PATH / f"{dictionary_name}.txt"))
+        parts.append(_cache.file_fingerprint(options.spellcheck_allowlist_file, content=True))
+        parts += options.spellcheck_allowlist or []
+        return _cache.fingerprint(parts)
+
+    @classmethod
+    def _dictionary_cache_path(cls, options: Namespace, extension: str) -> Optional[Path]:
+        if options.spellcheck_no_cache:
+            return None
+        cache_dir = Path(options.spellcheck_cache_dir or _cache.user_cache_dir())
+        return cache_dir / f"dictionaries-{cls.dictionary_fingerprint(options)}.{extension}"
+
+    @classmethod
+    def _compile_dictionaries(cls, options: Namespace) -> Tuple[CompiledWords, FrozenSet[str]]:
+        """Return the allowed words and the ``extra`` words of their ``NoSymbolsSet``.
+
+        The words of dictionaries with suffix rules are kept as roots, unless another enabled
+        dictionary has different rules, which is expanded instead.
+        """
+        words: Set[str] = set()
+        extra = set()
+        flags: Dict[str, str] = {}
+        suffixes: List[_affixes.Suffix] = []
+        for dictionary_name in options.dictionaries:
+            dictionary = load_dictionary(dictionary_name)
+            if isinstance(dictionary, _affixes.AffixWordSet) and suffixes in (
+                [],
+                dictionary.suffixes,
+            ):
+                suffixes = dictionary.suffixes
+                for root, root_flags in dictionary.flags.items():
+                    flags[root] = flags.get(root, "") + root_flags
+                words.update(dictionary.words)
             else:
-                no_symbols.add(w.replace("'", ""))
-        return frozenset(words), frozenset(no_symbols)
+                words.update(dictionary)
+            try:
+                extra.update((NO_SYMBOLS_PATH / f"{dictionary_name}.txt").read_text().split("\n"))
+            except FileNotFoundError:
+                extra |= no_symbols_extra(set(dictionary))
+
+        allowlist, _ = _patterns.split_entries(read_allowlist(options))
+        words |= allowlist
+        extra |= no_symbols_extra(allowlist)
+        if suffixes:
+            return _affixes.AffixWordSet(frozenset(words), flags, suffixes), frozenset(extra)
+        return frozenset(words), frozenset(extra)
 
     @classmethod
     def add_options(cls, parser: OptionManager) -> None:
         parser.add_option(
             "--spellcheck-allowlist-file",
-            help="Path to text file containing allowed words",
+            help="Path to text file containing allowed words, globs and /regexes/",
             default=".spellcheck-allowlist",
             parse_from_config=True,
         )
+        parser.add_option(
+            "--spellcheck-nested-allowlists",
+            help=(
+                "Also allow the words of the allowlist files with the same name as "
+                "--spellcheck-allowlist-file in the subdirectories of its directory that "
+                "contain a checked file"
+            ),
+            default=False,
+            action="store_true",
+            parse_from_config=True,
+        )
         parser.add_option(
             "--spellcheck-allowlist",
-            help="Comma separated list of words to allow",
+            help="Comma separated list of words, globs and /regexes/ to allow",
             default=None,
             comma_separated_list=True,
             parse_from_config=True,
@@ -176,42 +910,458 @@ class SpellCheckPlugin:
         )
         parser.add_option(
             "--spellcheck-targets",
-            help="Specify the targets to spellcheck",
+            help="Specify the targets to spellcheck: names, comments, docstrings and strings",
             default="names,comments",
             comma_separated_list=True,
             parse_from_config=True,
         )
+        parser.add_option(
+            "--spellcheck-word-splitter",
+            help="Engine used to split names into words",
+            default="loop",
+            choices=sorted(WORD_SPLITTERS),
+            parse_from_config=True,
+        )
+        parser.add_option(
+            "--spellcheck-scanner",
+            help=(
+                "How names, comments and strings are extracted from a file: with a regex "
+                "scanner that falls back to tokenize when in doubt (default), or with tokenize"
+            ),
+            default="regex",
+            choices=["regex", "tokenize"],
+            parse_from_config=True,
+        )
+        parser.add_option(
+            "--spellcheck-cache-dir",
+            help="Directory to cache compiled dictionaries in (defaults to the user cache directory)",
+            default=None,
+            parse_from_config=True,
+        )
+        parser.add_option(
+            "--spellcheck-no-cache",
+            help="Do not read or write the compiled dictionary cache",
+            default=False,
+            action="store_true",
+            parse_from_config=True,
+        )
+        parser.add_option(
+            "--spellcheck-backend",
+            help=(
+                "Data structure used for dictionary lookups: frozenset (default), mmap, a "
+                "hash table memory mapped from the cache directory and shared between "
+                "processes, dawg, a compact word graph that is memory mapped the same way, or "
+                "shared, the same hash table in shared memory published to flake8's workers"
+            ),
+            default="frozenset",
+            choices=["frozenset", *MAPPED_BACKENDS, "shared"],
+            parse_from_config=True,
+        )
+        parser.add_option(
+            "--spellcheck-result-cache",
+            help="Cache the errors found in each file and replay them for unchanged files",
+            default=False,
+            action="store_true",
+            parse_from_config=True,
+        )
+        parser.add_option(
+            "--spellcheck-result-cache-size",
+            help="Maximum number of files to keep in the result cache (default: 10000)",
+            default=10000,
+            type=int,
+            parse_from_config=True,
+        )
+        parser.add_option(
+            "--spellcheck-memo-size",
+            help=(
+                "Number of names, comment words and dictionary lookups to memoize per process "
+                "(default: 65536, 0 disables memoization)"
+            ),
+            default=65536,
+            type=int,
+            parse_from_config=True,
+        )
+        parser.add_option(
+            "--spellcheck-stats",
+            help=(
+                "Count tokens, words, lookups and misspellings, time the dictionary loading and "
+                "checking, and print the totals of all processes at exit"
+            ),
+            default=False,
+            action="store_true",
+            parse_from_config=True,
+        )
+        parser.add_option(
+            "--spellcheck-stats-file",
+            help="Write the totals collected by --spellcheck-stats to this JSON file instead",
+            default=None,
+            parse_from_config=True,
+        )
+        parser.add_option(
+            "--spellcheck-report",
+            help=(
+                "Write the unknown words of all files to this JSON file at exit, with their "
+                "number of occurrences by code and first location, most frequent first"
+            ),
+            default=None,
+            parse_from_config=True,
+        )
+        parser.add_option(
+            "--spellcheck-report-allowlist",
+            help="Write the unknown words of all files to this file at exit, as an allowlist",
+            default=None,
+            parse_from_config=True,
+        )
+        parser.add_option(
+            "--spellcheck-suggestions",
+            help="Number of corrections to suggest for every misspelt word (default: 0, none)",
+            default=0,
+            type=int,
+            parse_from_config=True,
+        )
+        parser.add_option(
+            "--spellcheck-suggestion-distance",
+            help=(
+                "Maximum number of inserted, deleted, replaced or swapped characters between a "
+                "misspelt word and a suggestion (default: 2)"
+            ),
+            default=2,
+            type=int,
+            parse_from_config=True,
+        )
+        parser.add_option(
+            "--spellcheck-suggestion-budget",
+            help="Milliseconds to spend on the suggestions of a word at most (default: 50)",
+            default=50.0,
+            type=float,
+            parse_from_config=True,
+        )
+        parser.add_option(
+            "--spellcheck-compounds",
+            help=(
+                "Accept unknown words made of dictionary words, like filesystem or getattr, "
+                "see --spellcheck-compound-min-length"
+            ),
+            default=False,
+            action="store_true",
+            parse_from_config=True,
+        )
+        parser.add_option(
+            "--spellcheck-compound-min-length",
+            help=(
+                "Minimum length of the dictionary words a compound word is made of, shorter "
+                "ones let more misspellings through (default: 3)"
+            ),
+            default=3,
+            type=int,
+            parse_from_config=True,
+        )
+        parser.add_option(
+            "--spellcheck-diff",
+            help=(
+                "Only check the lines a unified diff adds or changes, e.g. the output of git "
+                "diff, read from this file or from stdin with -"
+            ),
+            default=None,
+        )
 
     @classmethod
     def parse_options(cls, options: Namespace) -> None:
-        cls.words, cls.no_symbols = cls.load_dictionaries(options)
-        cls.spellcheck_targets = frozenset(options.spellcheck_targets)
+        # FLAKE8_SPELLCHECK_STATS=1 prints the stats, any other value is a file to write them to
+        environment = os.environ.get(_stats.ENVIRONMENT_VARIABLE, "")
+        if options.spellcheck_stats or options.spellcheck_stats_file or environment:
+            output = options.spellcheck_stats_file or (environment if environment != "1" else None)
+            cls.stats = _stats.start(output)
+        else:
+            cls.stats = None
+        if options.spellcheck_report or options.spellcheck_report_allowlist:
+            cls.report = _report.start(
+                options.spellcheck_report, options.spellcheck_report_allowlist
+            )
+        else:
+            cls.report = None
 
-    def _detect_errors(
-        self, tokens: Iterable[Tuple[Position, str]], use_symbols: bool, token_type: int
-    ) -> Iterator[LintError]:
-        code = get_code(token_type)
+        cls.spellcheck_targets = selected_targets(options)
+        cls.word_splitters = WORD_SPLITTERS[options.spellcheck_word_splitter]
+        cls.scanner = options.spellcheck_scanner
+        if options.spellcheck_suggestions > 0:
+            cls.suggester = _suggest.Suggester(
+                functools.partial(cls._load_suggestion_graphs, options),
+                options.spellcheck_suggestions,
+                options.spellcheck_suggestion_distance,
+                options.spellcheck_suggestion_budget / 1000,
+                options.spellcheck_memo_size,
+            )
+        else:
+            cls.suggester = None
+        if options.spellcheck_nested_allowlists:
+            allowlist_file = os.path.abspath(options.spellcheck_allowlist_file)
+            cls.nested_allowlists = NestedAllowlists(
+                os.path.dirname(allowlist_file), os.path.basename(allowlist_file)
+            )
+        else:
+            cls.nested_allowlists = None
+        if options.spellcheck_diff:
+            cls.changed_lines = _diff.read_changed_lines(options.spellcheck_diff)
+        else:
+            cls.changed_lines = None
+        cls.words = cls.no_symbols = frozenset()
+        cls.memo = WordMemo(cls.words, cls.no_symbols, cls.word_splitters, maxsize=0)
+        cls.allowlist_patterns = compile_allowlist_patterns(options)
+        cls.decomposer = None
+        # Nothing is loaded if all codes are deselected. Otherwise loading waits for the first
+        # file, unless flake8 may fork workers which should share the parent's copy.
+        cls.pending_options = options if cls.spellcheck_targets else None
+        if cls.pending_options is not None and may_run_in_parallel(options):
+            cls.load_pending_dictionaries()
 
-        for position, token in tokens:
-            test_token = token.lower().strip("'").strip('"')
+        # Reports need every file to be checked, not replayed
+        if (
+            options.spellcheck_result_cache
+            and not options.spellcheck_no_cache
+            and cls.report is None
+        ):
+            cache_dir = Path(options.spellcheck_cache_dir or _cache.user_cache_dir())
+            cls.result_cache_dir = cache_dir / "results"
+            # Suggestions are part of the messages, and depend on their time budget
+            suggestions = cls.suggester and [
+                options.spellcheck_suggestions,
+                options.spellcheck_suggestion_distance,
+                options.spellcheck_suggestion_budget,
+            ]
+            compounds = options.spellcheck_compounds and [options.spellcheck_compound_min_length]
+            cls.configuration_fingerprint = _cache.fingerprint(
+                [
+                    cls.dictionary_fingerprint(options),
+                    *sorted(cls.spellcheck_targets),
+                    *map(str, suggestions or []),
+                    *(f"compounds {length}" for length in compounds or []),
+                ]
+            )
+            cls.result_cache_size = options.spellcheck_result_cache_size
+            cls.result_cache_writes = 0
+        else:
+            cls.result_cache_dir = None
 
-            if use_symbols:
-                valid = test_token in self.words
-            else:
-                valid = test_token in self.no_symbols
-
-            # Need a way of matching words without symbols
-            if not valid and not is_number(token):
-                yield (
-                    position[0],
-                    position[1],
-                    f"{code} Possibly misspelt word: '{token}'",
-                    type(self),
+    @classmethod
+    def load_pending_dictionaries(cls) -> None:
+        options = cls.pending_options
+        if options is None:
+            return
+        cls.pending_options = None
+        start = time.perf_counter()
+        cls.words, cls.no_symbols = cls.load_dictionaries(options)
+        # Built once here like the dictionaries, rather than by every worker
+        if cls.suggester is not None:
+            cls.suggester.load_graphs()
+        if cls.stats is not None:
+            cls.stats.claim()
+            cls.stats.timers["load_dictionaries"] += time.perf_counter() - start
+        cls.memo = WordMemo(
+            cls.words, cls.no_symbols, cls.word_splitters, options.spellcheck_memo_size
+        )
+        if options.spellcheck_compounds:
+            cls.decomposer = _compounds.Decomposer(
+                # Every backend iterates over its words
+                cast(Iterable[str], cls.words),
+                options.spellcheck_compound_min_length,
+                _compounds.COMPOUND_MAX_STEPS,
+                options.spellcheck_memo_size,
+            )
+
+    @classmethod
+    def needs_tree(cls) -> bool:
+        """Whether docstrings have to be told apart from other strings, which takes the AST."""
+        return {"docstrings", "strings"} & cls.spellcheck_targets == {"docstrings"}
+
+    def _detect_errors(self, candidates: Sequence[Candidate]) -> Iterator[LintError]:
+        report = self.report
+        for misspelling in self._detect_misspellings(candidates):
+            if report is not None:
+                report.add(
+                    normalize_word(misspelling.word),
+                    misspelling.code,
+                    self.filename,
+                    misspelling.line,
+                    misspelling.column + 1,
                 )
+            yield misspelling.line, misspelling.column, misspelling.message, type(self)
+
+    def _detect_misspellings(self, candidates: Sequence[Candidate]) -> Iterator["Misspelling"]:
+        """Split and look up every unique value once, then yield the misspellings in order."""
+        splits: Dict[Tuple[str, bool], Tuple[Tuple[int, str], ...]] = {}
+        words: Dict[bool, Set[str]] = {False: set(), True: set()}
+        for _, value, use_symbols, _ in candidates:
+            if (value, use_symbols) not in splits:
+                splits[value, use_symbols] = split = self.memo.split(value)
+                words[use_symbols].update(word for _, word in split)
+        misspellings = {
+            use_symbols: self._misspellings(unique, use_symbols)
+            for use_symbols, unique in words.items()
+            if unique
+        }
+
+        for (line, column), value, use_symbols, token_type in candidates:
+            for offset, word in splits[value, use_symbols]:
+                if word in misspellings[use_symbols]:
+                    yield Misspelling(
+                        line,
+                        column + offset,
+                        get_code(token_type),
+                        word,
+                        self.suggester.suggest(word, use_symbols) if self.suggester else (),
+                    )
+
+    def _misspellings(self, words: Set[str], use_symbols: bool) -> Set[str]:
+        misspellings = self.memo.misspellings(words, use_symbols)
+        # Only the few words missing from the dictionaries are matched against patterns
+        patterns = self.allowlist_patterns
+        if patterns is not None:
+            misspellings = {
+                word for word in misspellings if not patterns.fullmatch(normalize_word(word))
+            }
+        allowlist = self.allowlist
+        if allowlist is not None:
+            misspellings = {
+                word for word in misspellings if not allowlist.allows(word, use_symbols)
+            }
+        decomposer = self.decomposer
+        if decomposer is not None:
+            misspellings = {
+                word for word in misspellings if not decomposer.split(normalize_word(word))
+            }
+        return misspellings
 
     def run(self) -> Iterator[LintError]:
-        for token_info in self.file_tokens:
-            yield from self._parse_token(token_info)
+        if not self.spellcheck_targets or self.changed == frozenset():
+            return
+        if self.report is not None:
+            self.report.claim()
+        if self.stats is not None:
+            yield from self._run_with_stats(self.stats)
+        elif self.result_cache_dir is not None:
+            yield from self._run_cached(self.result_cache_dir)
+        else:
+            yield from self._run()
+
+    def _run_with_stats(self, stats: _stats.Stats) -> Iterator[LintError]:
+        """Run with the hot paths of this instance wrapped to count and time them.
+
+        ``_parse_token`` collects the words of a token, ``_detect_errors`` splits and looks up
+        the words of the whole file.
+        """
+        stats.claim()
+        parse_token, detect_errors, memo = self._parse_token, self._detect_errors, self.memo
+
+        def counted_parse_token(token_info: TokenInfo) -> Iterator[Candidate]:
+            stats.counters[f"tokens.{tokenize.tok_name[token_info.type]}"] += 1
+            start = time.perf_counter()
+            candidates = list(parse_token(token_info))
+            stats.timers["_parse_token"] += time.perf_counter() - start
+            return iter(candidates)
+
+        def counted_detect_errors(candidates: Sequence[Candidate]) -> Iterator[LintError]:
+            start = time.perf_counter()
+            errors = list(detect_errors(candidates))
+            stats.timers["_detect_errors"] += time.perf_counter() - start
+            return iter(errors)
+
+        def counted_split(value: str) -> Tuple[Tuple[int, str], ...]:
+            words = memo.split(value)
+            stats.counters["words"] += len(words)
+            return words
+
+        def counted_misspellings(words: Set[str], use_symbols: bool) -> Set[str]:
+            stats.counters["lookups"] += len(words)
+            return memo.misspellings(words, use_symbols)
+
+        # Instance attributes shadow the methods, so instances without stats are unaffected
+        self._parse_token = counted_parse_token  # type: ignore
+        self._detect_errors = counted_detect_errors  # type: ignore
+        self.memo = copy.copy(memo)
+        self.memo.split = counted_split  # type: ignore
+        self.memo.misspellings = counted_misspellings  # type: ignore
+
+        memo_before = memo.stats()
+        start = time.perf_counter()
+        if self.result_cache_dir is not None:
+            errors = list(self._run_cached(self.result_cache_dir))
+        else:
+            errors = list(self._run())
+        stats.timers["run"] += time.perf_counter() - start
+        for name, value in memo.stats().items():
+            stats.counters[f"memo.{name}"] += value - memo_before[name]
+        stats.counters["files"] += 1
+        stats.counters["misspellings"] += len(errors)
+        yield from errors
+
+    def _run(self) -> Iterator[LintError]:
+        # Generated files repeat the same few names, so the whole file is checked in one batch
+        if self.changed is not None:
+            candidates = list(self._changed_candidates(self.changed))
+        else:
+            candidates = [
+                candidate
+                for token_info in self._tokens()
+                for candidate in self._parse_token(token_info)
+            ]
+        yield from self._detect_errors(candidates)
+
+    def _changed_candidates(self, changed: FrozenSet[int]) -> Iterator[Candidate]:
+        """Parse only the tokens on changed lines, and keep only the words on them."""
+        # Only the tokenize fallback returns tokens on lines that did not change
+        for token_info in self._tokens():
+            if not changed.isdisjoint(range(token_info.start[0], token_info.end[0] + 1)):
+                for candidate in self._parse_token(token_info):
+                    if candidate[0][0] in changed:
+                        yield candidate
+
+    def _tokens(self) -> Iterable[TokenInfo]:
+        if self.scanner == "regex" and self.lines is not None:
+            tokens = _scanner.scan_tokens(self.lines, self.changed)
+            if tokens is not None:
+                return tokens
+        return self.file_tokens
+
+    def _source_fingerprint(self) -> str:
+        # The source lines fully determine the token stream and are much cheaper to hash
+        if self.lines is not None:
+            source: Iterable[str] = self.lines
+        else:
+            source = (f"{t.type} {t.start} {t.string}" for t in self.file_tokens)
+        if self.changed is not None:
+            source = itertools.chain([repr(sorted(self.changed))], source)
+        if self.allowlist is not None:
+            allowlists = [_cache.file_fingerprint(path) for path in self.allowlist.paths()]
+            source = itertools.chain(allowlists, source)
+        return _cache.fingerprint([self.configuration_fingerprint, *source])
+
+    def _run_cached(self, cache_dir: Path) -> Iterator[LintError]:
+        """Replay the errors of a previous run over identical source and configuration."""
+        cache_path = cache_dir / f"{self._source_fingerprint()}.pickle"
+        cached = _cache.read_pickle(cache_path)
+        if isinstance(cached, list):
+            _cache.touch(cache_path)
+            for line, column, message in cached:
+                yield line, column, message, type(self)
+            return
+
+        suggester = self.suggester
+        cut_short = suggester.cut_short if suggester is not None else 0
+        errors = list(self._run())
+        # Suggestions the time budget ran out on could be better on a later run
+        if suggester is None or suggester.cut_short == cut_short:
+            self._before_result_cache_write(cache_dir)
+            _cache.write_pickle(cache_path, [error[:3] for error in errors])
+        yield from errors
+
+    @classmethod
+    def _before_result_cache_write(cls, cache_dir: Path) -> None:
+        # Only processes that add entries prune, before their first one and then every time they
+        # could have filled the cache again, so runs that replay every file never list it
+        if cls.result_cache_writes % max(cls.result_cache_size, 1) == 0:
+            _cache.prune(cache_dir, "*.pickle", keep=cls.result_cache_size)
+        cls.result_cache_writes += 1
 
     def _is_valid_comment(self, token_info: tokenize.TokenInfo) -> bool:
         return (
@@ -224,35 +1374,171 @@ class SpellCheckPlugin:
             and token_info.string.lstrip("#").split()[0] != "noqa:"
         )
 
-    def _parse_token(self, token_info: tokenize.TokenInfo) -> Iterator[LintError]:
-        if token_info.type == tokenize.NAME and "names" in self.spellcheck_targets:
-            value = token_info.string
-        elif self._is_valid_comment(token_info):
-            # strip out all `noqa: [code]` style comments so they aren't erroneously checked
-            # see https://github.com/MichaelAquilina/flake8-spellcheck/issues/36 for info
-            value = NOQA_REGEX.sub("", token_info.string.lstrip("#"))
-        else:
-            return
+    @property
+    def file_tokens(self) -> Iterable[TokenInfo]:
+        if self._file_tokens is None:
+            assert self.lines is not None
+            self._file_tokens = list(tokenize.generate_tokens(iter(self.lines).__next__))
+        return self._file_tokens
+
+    @property
+    def docstrings(self) -> FrozenSet[Position]:
+        """Line and byte offset of every module, class and function docstring."""
+        if self._docstrings is None:
+            positions = set()
+            for node in ast.walk(self.tree) if self.tree is not None else ():
+                if not isinstance(
+                    node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)
+                ):
+                    continue
+                first = node.body[0] if node.body else None
+                if (
+                    isinstance(first, ast.Expr)
+                    and isinstance(first.value, ast.Constant)
+                    and isinstance(first.value.value, str)
+                ):
+                    positions.add((first.value.lineno, first.value.col_offset))
+            self._docstrings = frozenset(positions)
+        return self._docstrings
+
+    def _is_checked_string(self, token_info: tokenize.TokenInfo) -> bool:
+        if "strings" in self.spellcheck_targets:
+            return True
+        if "docstrings" not in self.spellcheck_targets:
+            return False
+        line, column = token_info.start
+        # ast offsets are in bytes, tokenize offsets are in characters
+        offset = len(token_info.line[:column].encode("utf-8"))
+        return (line, offset) in self.docstrings
 
-        tokens: List[Tuple[Position, str]] = []
-        for word in value.split(" "):
-            case = detect_case(word)
-            if case == WordCase.URL:
-                # Nothing to do here
-                continue
-            elif case == WordCase.SNAKE:
-                tokens.extend(parse_snake_case(word, token_info.start))
-            elif case == WordCase.CAMEL:
-                tokens.extend(parse_camel_case(word, token_info.start))
+    def _token_text(self, token_info: tokenize.TokenInfo) -> Optional[str]:
+        """Return the part of a token to spellcheck, or None if it should be skipped.
 
+        Anything that is not prose (comment markers, quotes, escapes...) is blanked out
+        so that offsets into the returned text match offsets into the token.
+        """
         if token_info.type == tokenize.NAME:
-            use_symbols = False
-        elif token_info.type == tokenize.COMMENT:
-            use_symbols = True
+            return token_info.string if "names" in self.spellcheck_targets else None
+        elif self._is_valid_comment(token_info):
+            return comment_text(token_info.string)
+        elif token_info.type == tokenize.STRING and self._is_checked_string(token_info):
+            return string_text(token_info.string)
+        elif token_info.type == FSTRING_MIDDLE and "strings" in self.spellcheck_targets:
+            return ESCAPE_REGEX.sub(lambda escape: blank(escape.group()), token_info.string)
         else:
+            return None
+
+    def _parse_token(self, token_info: tokenize.TokenInfo) -> Iterator[Candidate]:
+        """Yield the values of a token to split into words and check."""
+        text = self._token_text(token_info)
+        if text is None:
             return
+        elif token_info.type == tokenize.NAME:
+            yield token_info.start, text, False, token_info.type
+        else:
+            for position, value in scan_words(text, token_info.start):
+                yield position, value, True, token_info.type
+
+
+class _DefaultsRecorder:
+    """Collects option defaults in place of flake8's OptionManager."""
+
+    def __init__(self) -> None:
+        self.defaults: Dict[str, Any] = {}
+
+    def add_option(self, *flags: str, **kwargs: Any) -> None:
+        default = kwargs.get("default")
+        if kwargs.get("comma_separated_list") and isinstance(default, str):
+            default = default.split(",")
+        self.defaults[flags[-1].lstrip("-").replace("-", "_")] = default
+
+
+def default_options(**overrides: Any) -> Namespace:
+    """Build the options flake8 would parse from an empty configuration, with ``overrides``."""
+    recorder = _DefaultsRecorder()
+    SpellCheckPlugin.add_options(recorder)  # type: ignore  # only add_option is used
+    return Namespace(**{**recorder.defaults, **overrides})
+
+
+class SpellChecker:
+    """Spellcheck source code and streams of tokens without flake8.
+
+    The dictionaries are loaded once, when the checker is created, and every check made with
+    it looks words up in the same copy, including checks that run concurrently. ``options``
+    are the plugin's, see ``default_options``.
+    """
+
+    def __init__(self, options: Optional[Namespace] = None, *, batch_size: int = 1024) -> None:
+        # The configuration lives on a subclass so that the plugin's own is left alone
+        self.plugin: Type[SpellCheckPlugin] = type("SpellChecker", (SpellCheckPlugin,), {})
+        self.plugin.parse_options(options if options is not None else default_options())
+        self.plugin.load_pending_dictionaries()
+        self.batch_size = batch_size
+
+    def check_source(self, source: str, filename: str = "(none)") -> List[Misspelling]:
+        """Check the source code of a whole file.
+
+        Raises ``tokenize.TokenError`` or ``SyntaxError`` for source that can't be tokenized,
+        like an unterminated triple-quoted string, which flake8 reports as E902. The regex
+        scanner only tokenizes what it is in doubt about, so it lets some invalid source through.
+        """
+        # Like tokenize and flake8, only "\n", "\r" and "\r\n" end lines, unlike splitlines
+        lines = io.StringIO(source, newline="").readlines()
+        tree = None
+        if self.plugin.needs_tree():
+            try:
+                tree = ast.parse(source)
+            except (SyntaxError, ValueError):
+                pass
+        check = self.plugin(tree, filename, lines)  # type: ignore
+        return list(
+            check._detect_misspellings(
+                [
+                    candidate
+                    for token_info in check._tokens()
+                    for candidate in check._parse_token(token_info)
+                ]
+            )
+        )
+
+    def check_tokens(
+        self, tokens: Iterable[TokenInfo], tree: Optional[AST] = None
+    ) -> Iterator[Misspelling]:
+        """Check tokens as they are generated, yielding the misspellings of every batch of them.
+
+        Stop iterating to cancel the check. Docstrings can only be told apart from other
+        strings given the ``tree`` of the file.
+        """
+        check = self.plugin(tree, file_tokens=())  # type: ignore
+        candidates: List[Candidate] = []
+        for token_info in tokens:
+            candidates.extend(check._parse_token(token_info))
+            if len(candidates) >= self.batch_size:
+                yield from check._detect_misspellings(candidates)
+                candidates = []
+        yield from check._detect_misspellings(candidates)
+
+    async def check_tokens_async(
+        self, tokens: AsyncIterable[TokenInfo], tree: Optional[AST] = None
+    ) -> AsyncIterator[Misspelling]:
+        """Check tokens from an async iterator, like ``check_tokens``.
+
+        The check gives way to other tasks after every batch, where cancelling it takes effect.
+        """
+        # Imported here as only async callers need it, and importing it slows down startup
+        import asyncio
 
-        yield from self._detect_errors(tokens, use_symbols, token_info.type)
+        check = self.plugin(tree, file_tokens=())  # type: ignore
+        candidates: List[Candidate] = []
+        async for token_info in tokens:
+            candidates.extend(check._parse_token(token_info))
+            if len(candidates) >= self.batch_size:
+                for misspelling in check._detect_misspellings(candidates):
+                    yield misspelling
+                candidates = []
+                await asyncio.sleep(0)
+        for misspelling in check._detect_misspellings(candidates):
+            yield misspelling
 
 
-__all__ = ("__version__", "SpellCheckPlugin")
+__all__ = ("__version__", "Misspelling", "SpellCheckPlugin", "SpellChecker", "default_options")
@@ -0,0 +1,294 @@
+"""Spellcheck files without flake8, as a fast stage of its own.
+
+``python -m flake8_spellcheck [path ...]`` accepts the plugin's options and flake8's options
+that select and ignore codes, also reads them from the ``[flake8]`` section of the configuration
+file flake8 would use, and prints the errors flake8 would report in its format. Files are checked
+by a pool of worker processes, largest first.
+"""
+import argparse
+import ast
+import configparser
+import fnmatch
+import multiprocessing
+import os
+import sys
+import time
+import tokenize
+from argparse import Namespace
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from flake8.defaults import EXCLUDE, NOQA_INLINE_REGEXP
+from flake8.exceptions import ExecutionError
+from flake8.style_guide import Decision, StyleGuideManager
+from flake8.utils import parse_comma_separated_list
+
+from flake8_spellcheck import SpellCheckPlugin
+
+# The files flake8 reads its configuration from, in the order it looks for them
+CONFIG_FILES = ("setup.cfg", "tox.ini", ".flake8")
+
+Error = Tuple[int, int, str]
+Result = Tuple[str, List[Error]]
+
+
+class _ArgumentParserAdapter:
+    """Registers the plugin's options with argparse in place of flake8's OptionManager."""
+
+    def __init__(self, parser: argparse.ArgumentParser) -> None:
+        self.parser = parser
+        # Options that may be set in the configuration file, by destination
+        self.config_options: Dict[str, argparse.Action] = {}
+
+    def add_option(
+        self,
+        *flags: str,
+        parse_from_config: bool = False,
+        comma_separated_list: bool = False,
+        **kwargs: Any,
+    ) -> None:
+        if comma_separated_list:
+            kwargs["type"] = parse_comma_separated_list
+        action = self.parser.add_argument(*flags, **kwargs)
+        if parse_from_config:
+            self.config_options[action.dest] = action
+
+
+def find_config(directory: Path) -> Optional[Path]:
+    """Find the configuration file of flake8, searching upwards from a directory like it does."""
+    for parent in (directory, *directory.parents):
+        for name in CONFIG_FILES:
+            config = configparser.RawConfigParser()
+            try:
+                config.read(parent / name, encoding="utf-8")
+            except (configparser.Error, UnicodeDecodeError):
+                continue
+            if config.has_section("flake8"):
+                return parent / name
+    return None
+
+
+def config_defaults(path: Path, options: Dict[str, argparse.Action]) -> Dict[str, Any]:
+    """Read the plugin's options from the ``[flake8]`` section of a configuration file."""
+    config = configparser.RawConfigParser()
+    config.read(path, encoding="utf-8")
+    defaults: Dict[str, Any] = {}
+    for key in config.options("flake8"):
+        action = options.get(key.replace("-", "_"))
+        if action is None:
+            continue
+        elif action.nargs == 0:
+            defaults[action.dest] = config.getboolean("flake8", key)
+        else:
+            # argparse converts string defaults with the option's type
+            defaults[action.dest] = config.get("flake8", key)
+    return defaults
+
+
+def _is_excluded(name: str, patterns: Sequence[str]) -> bool:
+    return any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+
+def expand_paths(paths: Sequence[str], exclude: Sequence[str]) -> Iterator[str]:
+    """Yield the Python files in the given paths, skipping excluded files and directories."""
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for root, directories, files in os.walk(path):
+            directories[:] = sorted(
+                name for name in directories if not _is_excluded(name, exclude)
+            )
+            for name in sorted(files):
+                if name.endswith(".py") and not _is_excluded(name, exclude):
+                    yield os.path.join(root, name)
+
+
+def _size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def schedule(paths: Sequence[str]) -> List[str]:
+    """Order the files largest first.
+
+    Idle workers take the next file from the front, so the small files at the end even out
+    the load instead of a large file keeping a single worker busy after the others finished.
+    """
+    return sorted(paths, key=_size, reverse=True)
+
+
+def _is_noqa(line: str, code: str) -> bool:
+    match = NOQA_INLINE_REGEXP.search(line)
+    if match is None:
+        return False
+    codes = match.group("codes")
+    return not codes or code.startswith(tuple(parse_comma_separated_list(codes)))
+
+
+def check_file(path: str) -> Result:
+    """Check a file with the options the plugin was configured with in this process."""
+    try:
+        with tokenize.open(path) as fp:
+            lines = fp.readlines()
+    except (OSError, SyntaxError, UnicodeError) as error:
+        return path, [(1, 0, f"E902 {type(error).__name__}: {error}")]
+
+    tree: Optional[ast.AST] = None
+    if SpellCheckPlugin.needs_tree():
+        try:
+            tree = ast.parse("".join(lines))
+        except (SyntaxError, ValueError):
+            pass
+    plugin = SpellCheckPlugin(tree, path, lines)  # type: ignore
+    try:
+        errors = [
+            (line, column, message)
+            for line, column, message, _ in plugin.run()
+            if not (line <= len(lines) and _is_noqa(lines[line - 1], message.split()[0]))
+        ]
+    except (SyntaxError, tokenize.TokenError) as error:
+        return path, [(1, 0, f"E902 {type(error).__name__}: {error}")]
+    return path, sorted(errors)
+
+
+def _init_worker(options: Namespace) -> None:
+    SpellCheckPlugin.parse_options(options)
+
+
+def check_files(paths: Sequence[str], options: Namespace, jobs: int) -> Iterator[Result]:
+    """Check files in parallel, yielding the results in the order the files are finished."""
+    if jobs <= 1 or len(paths) <= 1:
+        yield from map(check_file, paths)
+        return
+
+    # Forked workers inherit the dictionaries loaded by parse_options, others load them again
+    forked = multiprocessing.get_start_method() == "fork"
+    pool = multiprocessing.Pool(
+        min(jobs, len(paths)), None if forked else _init_worker, () if forked else (options,)
+    )
+    try:
+        yield from pool.imap_unordered(check_file, paths, chunksize=1)
+    except BaseException:
+        pool.terminate()
+        raise
+    else:
+        # Let the workers exit normally so that they save their stats
+        pool.close()
+    finally:
+        pool.join()
+
+
+def make_decider(options: Namespace) -> Callable[[str, str], bool]:
+    """Decide whether flake8 would report a code in a file, given its select and ignore options.
+
+    As in flake8, the codes this command reports, SC and E902, are selected by default.
+    """
+    options.extended_default_select = ["E902", "SC"]
+    options.extended_default_ignore = []
+    # Only the decisions of the style guides are used, which never touch the formatter
+    manager = StyleGuideManager(options, None)  # type: ignore
+
+    def is_reported(path: str, code: str) -> bool:
+        return manager.style_guide_for(path).should_report_error(code) == Decision.Selected
+
+    return is_reported
+
+
+def _jobs(value: str) -> int:
+    if value == "auto":
+        return os.cpu_count() or 1
+    return int(value)
+
+
+def make_parser() -> Tuple[argparse.ArgumentParser, Dict[str, argparse.Action]]:
+    parser = argparse.ArgumentParser(
+        prog="python -m flake8_spellcheck",
+        description="Spellcheck names, comments and strings in Python files.",
+    )
+    parser.add_argument(
+        "filenames", nargs="*", default=["."], metavar="path", help="files and directories"
+    )
+    parser.add_argument(
+        "-j", "--jobs", default="auto", help="number of processes to use (default: auto)"
+    )
+    exclude = parser.add_argument(
+        "--exclude",
+        type=parse_comma_separated_list,
+        default=",".join(EXCLUDE),
+        help=(
+            "comma separated patterns of files and directories to skip "
+            f"(default: {','.join(EXCLUDE)})"
+        ),
+    )
+    extend_exclude = parser.add_argument(
+        "--extend-exclude",
+        type=parse_comma_separated_list,
+        default="",
+        help="patterns to skip in addition to --exclude",
+    )
+    codes = {}
+    for flag, help_text in [
+        ("--select", "comma separated error codes to report, like flake8's"),
+        ("--ignore", "comma separated error codes to skip, like flake8's"),
+        ("--extend-select", "error codes to report in addition to --select"),
+        ("--extend-ignore", "error codes to skip in addition to --ignore"),
+    ]:
+        codes[flag] = parser.add_argument(flag, type=parse_comma_separated_list, help=help_text)
+    per_file_ignores = parser.add_argument(
+        "--per-file-ignores",
+        default="",
+        help="error codes to skip in the files matching a pattern, like flake8's",
+    )
+    parser.add_argument("--config", help="path to the flake8 configuration file to read")
+    parser.add_argument("--isolated", action="store_true", help="ignore configuration files")
+    parser.add_argument("--exit-zero", action="store_true", help="exit with status 0 on errors")
+    parser.add_argument(
+        "--benchmark", action="store_true", help="print the number of files checked per second"
+    )
+    adapter = _ArgumentParserAdapter(parser)
+    SpellCheckPlugin.add_options(adapter)  # type: ignore  # only add_option is used
+    adapter.config_options.update(exclude=exclude, extend_exclude=extend_exclude)
+    adapter.config_options.update({action.dest: action for action in codes.values()})
+    adapter.config_options.update(per_file_ignores=per_file_ignores)
+    return parser, adapter.config_options
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser, config_options = make_parser()
+    preliminary, _ = parser.parse_known_args(argv)
+    if not preliminary.isolated:
+        config = Path(preliminary.config) if preliminary.config else find_config(Path.cwd())
+        if config is not None:
+            parser.set_defaults(**config_defaults(config, config_options))
+    options = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    is_reported = make_decider(options)
+    try:
+        SpellCheckPlugin.parse_options(options)
+    except ExecutionError as error:
+        parser.exit(2, f"{parser.prog}: error: {error}\n")
+    paths = schedule(
+        list(expand_paths(options.filenames, [*options.exclude, *options.extend_exclude]))
+    )
+    count = 0
+    for path, errors in check_files(paths, options, _jobs(options.jobs)):
+        for line, column, message in errors:
+            if is_reported(path, message.split()[0]):
+                print(f"{path}:{line}:{column + 1}: {message}")
+                count += 1
+    elapsed = time.perf_counter() - start
+
+    if options.benchmark:
+        print(
+            f"{len(paths)} files in {elapsed:.3f} s, {len(paths) / elapsed:.1f} files/s",
+            file=sys.stderr,
+        )
+    return 1 if count and not options.exit_zero else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
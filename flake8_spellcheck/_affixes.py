@@ -0,0 +1,172 @@
+"""Dictionaries of root words and suffix rules, in the format of Hunspell's ``.dic`` and ``.aff``.
+
+Only what the shipped dictionaries use is supported: single character flags and suffix rules.
+A suffix rule of a flag strips characters from the end of a root word that matches its
+condition and appends others, so that ``user/MS`` stands for ``user``, ``user's`` and
+``users``. Words are looked up by undoing the suffix rules instead of expanding every form.
+"""
+import re
+from typing import Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Pattern, Set
+
+
+class Suffix(NamedTuple):
+    flag: str
+    # Removed from the end of the root before ``add`` is appended
+    strip: str
+    add: str
+    # Matches the end of the roots the rule applies to
+    condition: Pattern[str]
+
+    def applies(self, root: str) -> bool:
+        return len(root) > len(self.strip) and self.condition.search(root) is not None
+
+    def apply(self, root: str) -> str:
+        return root[: len(root) - len(self.strip)] + self.add
+
+
+def _field(value: str) -> str:
+    # "0" stands for nothing to strip or add
+    return "" if value == "0" else value
+
+
+def parse_aff(text: str) -> List[Suffix]:
+    """Parse the suffix rules of an ``.aff`` file.
+
+    Every other directive is ignored, except for prefix rules, which are not supported.
+    """
+    suffixes = []
+    for line in text.splitlines():
+        fields = line.split()
+        if not fields or fields[0] not in ("SFX", "PFX"):
+            continue
+        elif fields[0] == "PFX":
+            raise ValueError("prefix rules are not supported")
+        elif len(fields) == 4:
+            # The header of a flag's rules: SFX <flag> <cross product> <number of rules>
+            continue
+        _, flag, strip, add, condition = fields[:5]
+        if "/" in add:
+            raise ValueError(f"suffixes of suffixes are not supported: {line!r}")
+        suffixes.append(Suffix(flag, _field(strip), _field(add), re.compile(f"(?:{condition})$")))
+    return suffixes
+
+
+def parse_dic(text: str) -> Dict[str, str]:
+    """Map the words of a ``.dic`` file to their flags.
+
+    Words are lowercased like the words of every dictionary, which may merge some of them.
+    """
+    flags: Dict[str, str] = {}
+    # There are only a few combinations of flags, every root shares one of them
+    interned: Dict[str, str] = {}
+    # The first line is the number of words
+    for line in text.splitlines()[1:]:
+        word, _, word_flags = line.partition("/")
+        word = word.lower()
+        if word in flags:
+            word_flags = "".join(sorted(set(flags[word] + word_flags)))
+        flags[word] = interned.setdefault(word_flags, word_flags)
+    flags.pop("", None)
+    return flags
+
+
+def render_dic(flags: Dict[str, str]) -> str:
+    lines = [f"{word}/{word_flags}" if word_flags else word for word, word_flags in flags.items()]
+    return "".join(f"{line}\n" for line in [str(len(lines)), *sorted(lines)])
+
+
+def _forms(root: str, suffixes: Iterable[Suffix]) -> List[str]:
+    return [suffix.apply(root) for suffix in suffixes if suffix.applies(root)]
+
+
+def compress(words: Iterable[str], suffixes: Iterable[Suffix]) -> Dict[str, str]:
+    """Find the roots and flags that derive exactly ``words``.
+
+    A word gets a flag if every form the flag's rules derive from it is a word itself. The
+    words that are derived from another word are left out, unless they have flags of their own.
+    """
+    by_flag: Dict[str, List[Suffix]] = {}
+    for suffix in suffixes:
+        by_flag.setdefault(suffix.flag, []).append(suffix)
+    unique = set(words)
+    unique.discard("")
+    flags: Dict[str, str] = {}
+    derived: Set[str] = set()
+    for word in unique:
+        word_flags = ""
+        for flag, rules in sorted(by_flag.items()):
+            forms = _forms(word, rules)
+            if forms and unique.issuperset(forms) and word not in forms:
+                word_flags += flag
+                derived.update(forms)
+        flags[word] = word_flags
+    return {
+        word: word_flags for word, word_flags in flags.items() if word_flags or word not in derived
+    }
+
+
+class AffixWordSet:
+    """Words and the words suffix rules derive from the ones with flags, without expanding them.
+
+    A word is looked up in ``words`` first, which holds every word of the ``.dic`` file and any
+    other words, and otherwise by replacing each suffix it ends with by the characters the rule
+    strips, to see if that gives a root with the rule's flag.
+    """
+
+    def __init__(
+        self, words: FrozenSet[str], flags: Dict[str, str], suffixes: List[Suffix]
+    ) -> None:
+        self.words = words
+        self.flags = flags
+        self.suffixes = suffixes
+        # The rules by the suffix they add and then by the characters they strip, which
+        # together give the root to look up
+        self.by_add: Dict[str, Dict[str, List[Suffix]]] = {}
+        for suffix in suffixes:
+            self.by_add.setdefault(suffix.add, {}).setdefault(suffix.strip, []).append(suffix)
+        self.add_lengths = sorted({len(add) for add in self.by_add})
+
+    def __contains__(self, word: object) -> bool:
+        if word in self.words:
+            return True
+        return isinstance(word, str) and self.derives(word)
+
+    def derives(self, word: str) -> bool:
+        """Whether a suffix rule derives ``word`` from a root with its flag."""
+        by_add, all_flags = self.by_add, self.flags
+        size = len(word)
+        for length in self.add_lengths:
+            if length >= size:
+                break
+            cut = size - length
+            by_strip = by_add.get(word[cut:])
+            if by_strip is None:
+                continue
+            stem = word[:cut]
+            for strip, suffixes in by_strip.items():
+                root = stem + strip
+                flags = all_flags.get(root)
+                if flags is None:
+                    continue
+                for suffix in suffixes:
+                    if suffix.flag in flags and suffix.applies(root):
+                        return True
+        return False
+
+    def missing(self, words: Set[str]) -> Set[str]:
+        """Return the ``words`` that are not in the set, in one set difference and a few lookups."""
+        return {word for word in words.difference(self.words) if not self.derives(word)}
+
+    def derived(self) -> Iterator[str]:
+        by_flag: Dict[str, List[Suffix]] = {}
+        for suffix in self.suffixes:
+            by_flag.setdefault(suffix.flag, []).append(suffix)
+        for root, flags in self.flags.items():
+            for flag in flags:
+                yield from _forms(root, by_flag.get(flag, ()))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.words.union(self.derived()))
+
+    def __len__(self) -> int:
+        return len(self.words.union(self.derived()))
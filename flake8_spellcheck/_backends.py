@@ -0,0 +1,431 @@
+"""Alternative representations of the word sets used for dictionary lookups.
+
+Every backend only needs to support ``word in word_set`` so that
+``SpellCheckPlugin._detect_errors`` can use them interchangeably with frozensets.
+Each one is packed into a flat buffer that is written to the cache directory and memory
+mapped from there, or shared with worker processes through shared memory.
+"""
+import atexit
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from array import array
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Tuple, Union
+
+if TYPE_CHECKING:
+    from multiprocessing.shared_memory import SharedMemory
+
+MAGIC = b"SCWS"
+GRAPH_MAGIC = b"SCWG"
+FORMAT_VERSION = 1
+# magic, format version, byte order marker, number of word sets
+HEADER = struct.Struct("=4sIII")
+# number of words, length of the encoded words in bytes, number of hash table slots
+SECTION_HEADER = struct.Struct("=III")
+# number of words, nodes and edges, length of the encoded edge labels in bytes
+GRAPH_SECTION_HEADER = struct.Struct("=IIII")
+BYTE_ORDER = 1 if sys.byteorder == "little" else 2
+
+Buffer = Union[bytes, mmap.mmap, memoryview]
+
+# Shared memory segments created or attached by this process, open for as long as it runs
+_segments: Dict[str, "SharedMemory"] = {}
+
+
+def _encode(word: str) -> bytes:
+    return word.encode("utf-8", "surrogatepass")
+
+
+def _align(size: int) -> int:
+    return (size + 3) & ~3
+
+
+class SortedWordSet:
+    """Word set stored as sorted UTF-8 strings in a flat buffer with a hash index.
+
+    Lookups hash the encoded word with crc32 and probe an open addressing table of
+    word numbers, so only one or two words have to be compared per lookup. The buffer
+    is typically a memory mapped file, which lets the operating system share a single
+    copy of the dictionary between all flake8 worker processes.
+    """
+
+    def __init__(self, data: memoryview, offsets: memoryview, table: memoryview) -> None:
+        self._data = data
+        self._offsets = offsets
+        self._table = table
+        self._mask = len(table) - 1
+
+    def __contains__(self, word: object) -> bool:
+        if not isinstance(word, str):
+            return False
+        key = _encode(word)
+        data, offsets, table, mask = self._data, self._offsets, self._table, self._mask
+        slot = zlib.crc32(key) & mask
+        entry = table[slot]
+        while entry:
+            start, end = offsets[entry - 1], offsets[entry]
+            if end - start == len(key) and data[start:end] == key:
+                return True
+            slot = (slot + 1) & mask
+            entry = table[slot]
+        return False
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __iter__(self) -> Iterator[str]:
+        data, offsets = self._data, self._offsets
+        for index in range(len(self)):
+            start, end = offsets[index], offsets[index + 1]
+            yield str(data[start:end], "utf-8", "surrogatepass")
+
+
+def _hash_table(encoded: List[bytes]) -> List[int]:
+    # Keep the load factor at or below 0.5 so that probe sequences stay short
+    size = 1
+    while size < 2 * len(encoded):
+        size *= 2
+    mask = size - 1
+    table = [0] * size
+    for number, word in enumerate(encoded, start=1):
+        slot = zlib.crc32(word) & mask
+        while table[slot]:
+            slot = (slot + 1) & mask
+        table[slot] = number
+    return table
+
+
+def pack_word_sets(word_sets: Iterable[Iterable[str]]) -> bytes:
+    """Serialize word sets into the layout read by ``unpack_word_sets``.
+
+    Layout (native byte order, every field 4 byte aligned)::
+
+        header | section*
+        section = count | size | table size | offsets[count + 1] | table | data
+    """
+    sections = []
+    for word_set in word_sets:
+        encoded = sorted({_encode(word) for word in word_set})
+        offsets = [0]
+        for word in encoded:
+            offsets.append(offsets[-1] + len(word))
+        table = _hash_table(encoded)
+        data = b"".join(encoded)
+        sections.append(
+            SECTION_HEADER.pack(len(encoded), len(data), len(table))
+            + array("I", offsets).tobytes()
+            + array("I", table).tobytes()
+            + data
+            + b"\0" * (_align(len(data)) - len(data))
+        )
+    return HEADER.pack(MAGIC, FORMAT_VERSION, BYTE_ORDER, len(sections)) + b"".join(sections)
+
+
+def _unpack_header(view: memoryview, magic: bytes) -> int:
+    found_magic, version, byte_order, count = HEADER.unpack_from(view)
+    if found_magic != magic or version != FORMAT_VERSION or byte_order != BYTE_ORDER:
+        raise ValueError("Unsupported word set format")
+    return int(count)
+
+
+def unpack_word_sets(buffer: Buffer) -> List[SortedWordSet]:
+    """Wrap the sections of a buffer produced by ``pack_word_sets`` without copying them."""
+    view = memoryview(buffer)
+    count = _unpack_header(view, MAGIC)
+
+    word_sets = []
+    position = HEADER.size
+    for _ in range(count):
+        word_count, size, table_size = SECTION_HEADER.unpack_from(view, position)
+        offsets_start = position + SECTION_HEADER.size
+        table_start = offsets_start + 4 * (word_count + 1)
+        data_start = table_start + 4 * table_size
+        data_end = data_start + size
+        offsets = view[offsets_start:table_start].cast("I")
+        table = view[table_start:data_start].cast("I")
+        word_sets.append(SortedWordSet(view[data_start:data_end], offsets, table))
+        position = data_start + _align(size)
+    return word_sets
+
+
+class WordGraph:
+    """Word set stored as a minimal acyclic automaton, also known as a DAWG.
+
+    Words that share a prefix share the path to it and words that share a suffix share
+    the path from it, so the graph needs far fewer edges than the words have characters.
+    Node ``n`` owns the edges ``starts[n]`` to ``starts[n + 1]``, whose labels are the
+    characters of ``labels`` at those indices in sorted order, so that finding an edge
+    is a single ``str.find``. ``targets`` holds the node each edge leads to.
+    """
+
+    def __init__(
+        self, labels: str, starts: memoryview, targets: memoryview, final: memoryview, count: int
+    ) -> None:
+        self._labels = labels
+        self._starts = starts
+        self._targets = targets
+        self._final = final
+        self._count = count
+
+    def __contains__(self, word: object) -> bool:
+        if not isinstance(word, str):
+            return False
+        labels, starts, targets = self._labels, self._starts, self._targets
+        node = 0
+        for char in word:
+            index = labels.find(char, starts[node], starts[node + 1])
+            if index < 0:
+                return False
+            node = targets[index]
+        return bool(self._final[node])
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[str]:
+        labels, starts, targets, final = self._labels, self._starts, self._targets, self._final
+        stack = [(0, "")]
+        while stack:
+            node, prefix = stack.pop()
+            if final[node]:
+                yield prefix
+            # Push the edges in reverse so that words come out in sorted order
+            for index in range(starts[node + 1] - 1, starts[node] - 1, -1):
+                stack.append((targets[index], prefix + labels[index]))
+
+    def suggest(self, word: str, max_distance: int, deadline: float) -> List[Tuple[int, str]]:
+        """Find the words at most ``max_distance`` edits from ``word``.
+
+        Edits are insertions, deletions, substitutions and transpositions of adjacent
+        characters (the optimal string alignment distance). The graph is walked depth first,
+        computing one row of the edit distance matrix per edge, and only within
+        ``max_distance`` of its diagonal. Branches whose row exceeds ``max_distance``
+        everywhere are pruned. Once ``time.perf_counter()`` passes ``deadline`` the words
+        found so far are returned.
+        """
+        labels, starts, targets, final = self._labels, self._starts, self._targets, self._final
+        size = len(word)
+        # Cells outside the band are never within max_distance
+        outside = max_distance + 1
+        found = []
+        first_row = list(range(size + 1))
+        stack = [(0, "", first_row, first_row)]
+        steps = 0
+        while stack:
+            node, prefix, row, previous_row = stack.pop()
+            if final[node] and row[size] <= max_distance:
+                found.append((row[size], prefix))
+            steps += 1
+            if steps % 256 == 0 and time.perf_counter() > deadline:
+                break
+            depth = len(prefix) + 1
+            first = max(1, depth - max_distance)
+            last = min(size, depth + max_distance)
+            previous_char = prefix[-1:]
+            for index in range(starts[node], starts[node + 1]):
+                char = labels[index]
+                next_row = [outside] * (size + 1)
+                if depth <= max_distance:
+                    next_row[0] = depth
+                best = next_row[0]
+                for column in range(first, last + 1):
+                    cost = row[column - 1] + (word[column - 1] != char)
+                    cost = min(cost, row[column] + 1, next_row[column - 1] + 1)
+                    if (
+                        column > 1
+                        and char == word[column - 2]
+                        and previous_char == word[column - 1]
+                        and previous_row[column - 2] + 1 < cost
+                    ):
+                        cost = previous_row[column - 2] + 1
+                    next_row[column] = cost
+                    if cost < best:
+                        best = cost
+                if best <= max_distance:
+                    stack.append((targets[index], prefix + char, next_row, row))
+        return found
+
+
+class _GraphNode:
+    __slots__ = ("final", "edges")
+
+    def __init__(self) -> None:
+        self.final = False
+        self.edges: Dict[str, "_GraphNode"] = {}
+
+    def key(self) -> Tuple[bool, Tuple[Tuple[str, int], ...]]:
+        # Only called once all children are unique, so their identity stands for their contents
+        return self.final, tuple((label, id(child)) for label, child in self.edges.items())
+
+
+def _build_graph(words: List[str]) -> _GraphNode:
+    """Build a minimal graph from sorted, unique words (Daciuk et al.'s incremental algorithm)."""
+    root = _GraphNode()
+    register: Dict[Tuple[bool, Tuple[Tuple[str, int], ...]], _GraphNode] = {}
+    # The path of the previous word, as (parent, label, child), that may not be minimal yet
+    unchecked: List[Tuple[_GraphNode, str, _GraphNode]] = []
+
+    def minimize(down_to: int) -> None:
+        while len(unchecked) > down_to:
+            parent, label, child = unchecked.pop()
+            existing = register.setdefault(child.key(), child)
+            if existing is not child:
+                parent.edges[label] = existing
+
+    previous = ""
+    for word in words:
+        common = 0
+        for a, b in zip(word, previous):
+            if a != b:
+                break
+            common += 1
+        minimize(common)
+        node = unchecked[-1][2] if unchecked else root
+        for label in word[common:]:
+            child = _GraphNode()
+            node.edges[label] = child
+            unchecked.append((node, label, child))
+            node = child
+        node.final = True
+        previous = word
+    minimize(0)
+    return root
+
+
+def _pack_graph(words: Iterable[str]) -> bytes:
+    ordered = sorted(set(words))
+    root = _build_graph(ordered)
+
+    # Number the nodes breadth first so that the root is node 0
+    nodes = [root]
+    numbers = {id(root): 0}
+    for node in nodes:
+        for child in node.edges.values():
+            if id(child) not in numbers:
+                numbers[id(child)] = len(nodes)
+                nodes.append(child)
+
+    starts = [0]
+    labels: List[str] = []
+    targets = []
+    for node in nodes:
+        for label, child in node.edges.items():
+            labels.append(label)
+            targets.append(numbers[id(child)])
+        starts.append(len(labels))
+    final = bytes(node.final for node in nodes)
+    encoded_labels = _encode("".join(labels))
+    return (
+        GRAPH_SECTION_HEADER.pack(len(ordered), len(nodes), len(targets), len(encoded_labels))
+        + array("I", starts).tobytes()
+        + array("I", targets).tobytes()
+        + final
+        + b"\0" * (_align(len(final)) - len(final))
+        + encoded_labels
+        + b"\0" * (_align(len(encoded_labels)) - len(encoded_labels))
+    )
+
+
+def pack_word_graphs(word_sets: Iterable[Iterable[str]]) -> bytes:
+    """Serialize word sets into graphs in the layout read by ``unpack_word_graphs``.
+
+    Layout (native byte order, every field 4 byte aligned)::
+
+        header | section*
+        section = words | nodes | edges | label size | starts[nodes + 1] | targets[edges]
+                  | final[nodes] | labels
+    """
+    sections = [_pack_graph(word_set) for word_set in word_sets]
+    return HEADER.pack(GRAPH_MAGIC, FORMAT_VERSION, BYTE_ORDER, len(sections)) + b"".join(sections)
+
+
+def unpack_word_graphs(buffer: Buffer) -> List[WordGraph]:
+    """Wrap the sections of a buffer produced by ``pack_word_graphs``.
+
+    Only the edge labels are copied, into a ``str`` so that they can be searched quickly.
+    """
+    view = memoryview(buffer)
+    count = _unpack_header(view, GRAPH_MAGIC)
+
+    graphs = []
+    position = HEADER.size
+    for _ in range(count):
+        words, nodes, edges, size = GRAPH_SECTION_HEADER.unpack_from(view, position)
+        starts_start = position + GRAPH_SECTION_HEADER.size
+        targets_start = starts_start + 4 * (nodes + 1)
+        final_start = targets_start + 4 * edges
+        final_end = final_start + nodes
+        labels_start = final_start + _align(nodes)
+        labels_end = labels_start + size
+        graphs.append(
+            WordGraph(
+                str(view[labels_start:labels_end], "utf-8", "surrogatepass"),
+                view[starts_start:targets_start].cast("I"),
+                view[targets_start:final_start].cast("I"),
+                view[final_start:final_end],
+                words,
+            )
+        )
+        position = labels_start + _align(size)
+    return graphs
+
+
+def write_packed(path: Path, data: bytes) -> None:
+    """Atomically write packed word sets to ``path``."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+def map_packed(path: Path) -> mmap.mmap:
+    """Memory map a file written by ``write_packed``."""
+    with open(path, "rb") as fp:
+        return mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _open_segment(name: str, create: bool = False, size: int = 0) -> "SharedMemory":
+    # Imported here as only the shared backend needs it
+    from multiprocessing.shared_memory import SharedMemory
+
+    class Segment(SharedMemory):
+        def __del__(self) -> None:
+            # The word sets view the buffer until the interpreter exits, when closing it fails.
+            # The operating system unmaps it anyway.
+            pass
+
+    segment = Segment(name, create=create, size=size)
+    _segments[name] = segment
+    return segment
+
+
+def _segment_buffer(name: str) -> memoryview:
+    buffer = _segments[name].buf
+    assert buffer is not None, "segments are never closed"
+    return buffer
+
+
+def share_packed(name: str, data: bytes) -> memoryview:
+    """Copy packed word sets into a shared memory segment that is removed when this process exits."""
+    if name not in _segments:
+        size = len(data)
+        atexit.register(_open_segment(name, create=True, size=size).unlink)
+        _segment_buffer(name)[:size] = data
+    return _segment_buffer(name).toreadonly()
+
+
+def attach_shared(name: str) -> memoryview:
+    """Attach to a segment created by ``share_packed`` in another process, without copying it."""
+    if name not in _segments:
+        _open_segment(name)
+    return _segment_buffer(name).toreadonly()
@@ -0,0 +1,109 @@
+"""Helpers for the on-disk cache of compiled dictionaries."""
+import os
+import pickle
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Iterable, Optional, Union
+
+CACHE_DIRECTORY_NAME = "flake8-spellcheck"
+
+
+def user_cache_dir() -> Path:
+    """Return the per-user cache directory for this plugin.
+
+    ``XDG_CACHE_HOME`` is honored on every platform when it is set.
+    """
+    if os.environ.get("XDG_CACHE_HOME"):
+        base = Path(os.environ["XDG_CACHE_HOME"])
+    elif sys.platform == "win32":
+        base = Path(os.environ.get("LOCALAPPDATA", Path.home() / "AppData" / "Local"))
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Caches"
+    else:
+        base = Path.home() / ".cache"
+    return base / CACHE_DIRECTORY_NAME
+
+
+def file_fingerprint(path: Union[str, Path], content: bool = False) -> str:
+    """Fingerprint a file by its size and modification time, or by its content.
+
+    Missing files produce a stable fingerprint so that creating them invalidates
+    anything keyed on it.
+    """
+    import hashlib  # importing hashlib loads OpenSSL, only pay for it when hashing
+
+    try:
+        if content:
+            return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+        stat = os.stat(path)
+    except OSError:
+        return "missing"
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def fingerprint(parts: Iterable[str]) -> str:
+    import hashlib
+
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8", "surrogatepass"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def read_pickle(path: Path) -> Optional[Any]:
+    """Load a pickled cache entry, returning None if it is missing or unreadable."""
+    try:
+        with open(path, "rb") as fp:
+            return pickle.load(fp)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+        return None
+
+
+def write_pickle(path: Path, value: Any) -> None:
+    """Atomically write a cache entry. Failing to write a cache is never fatal."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                pickle.dump(value, fp, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_name, path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+    except OSError:
+        pass
+
+
+def touch(path: Path) -> None:
+    """Mark a cache entry as recently used so that ``prune`` keeps it."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def prune(directory: Path, pattern: str, keep: int) -> None:
+    """Remove all but the ``keep`` most recently modified files matching ``pattern``.
+
+    Other processes may prune the same directory at the same time, so files that are gone or
+    cannot be removed are skipped rather than ending the pruning.
+    """
+    try:
+        paths = list(directory.glob(pattern))
+    except OSError:
+        return
+    entries = []
+    for path in paths:
+        try:
+            entries.append((os.stat(path).st_mtime, path))
+        except OSError:
+            continue
+    entries.sort(reverse=True)
+    for _, path in entries[keep:]:
+        try:
+            os.unlink(path)
+        except OSError:
+            continue
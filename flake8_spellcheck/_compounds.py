@@ -0,0 +1,73 @@
+"""Compound words like ``filesystem`` split into dictionary words, see ``Decomposer``."""
+import bisect
+import collections
+import functools
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Bisections a compound word may take before it is reported as misspelled
+COMPOUND_MAX_STEPS = 256
+
+
+class Decomposer:
+    """Bounded, process wide memoization of compound words split into dictionary words.
+
+    Names like ``filesystem`` or ``getattr`` are made of dictionary words without a case change
+    or underscore between them. The dictionary words without apostrophes are sorted the first
+    time a word has to be split, so that the words a compound may start with at any position
+    are found by bisecting for ever longer prefixes, which stops as soon as no word has one.
+    Every part is at least ``min_length`` characters long and a word takes at most
+    ``max_steps`` bisections, after which it is left misspelt.
+    """
+
+    def __init__(
+        self, words: Iterable[str], min_length: int, max_steps: int, maxsize: Optional[int]
+    ) -> None:
+        self.words = words
+        self.min_length = min_length
+        self.max_steps = max_steps
+        self.sorted_words: Optional[List[str]] = None
+        self.split = functools.lru_cache(maxsize=maxsize)(self._split)
+
+    def _split(self, word: str) -> Tuple[str, ...]:
+        """Split a word into the fewest dictionary words, or return ``()`` if it can't be."""
+        if self.sorted_words is None:
+            self.sorted_words = sorted(word for word in self.words if "'" not in word)
+        sorted_words = self.sorted_words
+        # The position each reachable position was first reached from, breadth first
+        previous = {0: 0}
+        queue = collections.deque([0])
+        steps = 0
+        while queue:
+            start = queue.popleft()
+            low = 0
+            for end in range(start + 1, len(word) + 1):
+                steps += 1
+                if steps > self.max_steps:
+                    return ()
+                prefix = word[start:end]
+                low = bisect.bisect_left(sorted_words, prefix, low)
+                if low == len(sorted_words) or not sorted_words[low].startswith(prefix):
+                    break
+                if (
+                    sorted_words[low] != prefix
+                    or end - start < self.min_length
+                    or end in previous
+                    # The whole word is not a compound
+                    or (start, end) == (0, len(word))
+                ):
+                    continue
+                previous[end] = start
+                if end == len(word):
+                    return self._parts(word, previous)
+                queue.append(end)
+        return ()
+
+    @staticmethod
+    def _parts(word: str, previous: Dict[int, int]) -> Tuple[str, ...]:
+        parts: List[str] = []
+        end = len(word)
+        while end:
+            start = previous[end]
+            parts.append(word[start:end])
+            end = start
+        return tuple(reversed(parts))
@@ -0,0 +1,113 @@
+"""Changed line ranges of the files in a unified diff, for ``--spellcheck-diff``.
+
+A diff read from stdin can only be read once, by the flake8 process that parses the options.
+It saves the diff to a file for spawned worker processes, which parse the options again.
+"""
+import atexit
+import multiprocessing
+import os
+import re
+import sys
+import tempfile
+from typing import Dict, FrozenSet, List, Optional
+
+# "<pid>:<file>" of the diff read from stdin by a flake8 process, inherited by spawned workers
+STDIN_VARIABLE = "_FLAKE8_SPELLCHECK_DIFF"
+
+HUNK_REGEX = re.compile(r"@@ -\d+(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+# The escapes of a path git quotes for having special or, by default, non-ASCII characters
+QUOTED_ESCAPE_REGEX = re.compile(rb"\\([0-7]{1,3}|.)", re.DOTALL)
+QUOTED_ESCAPES = {
+    b"a": b"\a",
+    b"b": b"\b",
+    b"t": b"\t",
+    b"n": b"\n",
+    b"v": b"\v",
+    b"f": b"\f",
+    b"r": b"\r",
+}
+
+ChangedLines = Dict[str, FrozenSet[int]]
+
+
+def normalize_path(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _unquote(path: str) -> str:
+    """Decode a path git quoted like a C string, where octal escapes are UTF-8 bytes."""
+    return QUOTED_ESCAPE_REGEX.sub(
+        lambda match: (
+            bytes([int(match[1], 8) & 0xFF])
+            if match[1][:1].isdigit()
+            else QUOTED_ESCAPES.get(match[1], match[1])
+        ),
+        path[1:-1].encode("utf-8", "surrogateescape"),
+    ).decode("utf-8", "surrogateescape")
+
+
+def _target_path(header: str) -> Optional[str]:
+    """The path of the new file in a ``+++`` line, or None if the file was deleted."""
+    path = header[4:].rstrip("\n").split("\t")[0]
+    if path.startswith('"') and path.endswith('"'):
+        path = _unquote(path)
+    if path == "/dev/null":
+        return None
+    # The prefix git adds by default, unless --no-prefix was given
+    return path[2:] if path.startswith("b/") else path
+
+
+def parse_unified_diff(diff: str) -> ChangedLines:
+    """Map the normalized path of every file in a unified diff to its added or changed lines."""
+    changed: Dict[str, List[int]] = {}
+    lines: List[int] = []
+    line_number = old_remaining = new_remaining = 0
+    for line in diff.splitlines():
+        if old_remaining > 0 or new_remaining > 0:
+            # Inside a hunk, where added lines may look like headers
+            if line.startswith("\\"):
+                # "\ No newline at end of file"
+                continue
+            elif line.startswith("+"):
+                lines.append(line_number)
+            if not line.startswith("-"):
+                line_number += 1
+                new_remaining -= 1
+            if not line.startswith("+"):
+                old_remaining -= 1
+        elif line.startswith("+++ "):
+            path = _target_path(line)
+            # Lines of deleted files are collected and thrown away
+            lines = [] if path is None else changed.setdefault(normalize_path(path), [])
+        else:
+            match = HUNK_REGEX.match(line)
+            if match is not None:
+                old_count, start, new_count = match.groups()
+                line_number = int(start)
+                old_remaining = int(old_count or 1)
+                new_remaining = int(new_count or 1)
+    return {path: frozenset(lines) for path, lines in changed.items()}
+
+
+def _read_stdin() -> str:
+    owner, _, path = os.environ.get(STDIN_VARIABLE, "").partition(":")
+    parent = multiprocessing.parent_process()
+    if parent is not None and owner == str(parent.pid):
+        with open(path, encoding="utf-8", errors="surrogateescape") as fp:
+            return fp.read()
+
+    diff = sys.stdin.read()
+    fd, path = tempfile.mkstemp(prefix="flake8-spellcheck-diff-", suffix=".diff")
+    with os.fdopen(fd, "w", encoding="utf-8", errors="surrogateescape") as fp:
+        fp.write(diff)
+    atexit.register(os.remove, path)
+    os.environ[STDIN_VARIABLE] = f"{os.getpid()}:{path}"
+    return diff
+
+
+def read_changed_lines(path: str) -> ChangedLines:
+    """Read a unified diff from a file, or from stdin if ``path`` is ``-``."""
+    if path == "-":
+        return parse_unified_diff(_read_stdin())
+    with open(path, encoding="utf-8", errors="surrogateescape") as fp:
+        return parse_unified_diff(fp.read())
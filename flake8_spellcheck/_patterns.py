@@ -0,0 +1,191 @@
+"""Allowlist entries that match many words: globs like ``aws*`` and regexes like ``/v\\d+/``.
+
+All patterns are compiled into a single regular expression, which is only matched against the
+words missing from the dictionaries. Patterns that start with the same literal characters share
+them as in a trie, so that a word only backtracks into the patterns its first characters allow.
+"""
+import re
+from typing import Dict, Iterable, Optional, Pattern, Set, Tuple
+
+GLOB_CHARACTERS = frozenset("*?[")
+
+# The characters a literal prefix of a regex may have, which mean the same when lowercased
+_LITERAL = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-'")
+_QUANTIFIERS = frozenset("*+?{")
+
+
+def is_regex(entry: str) -> bool:
+    return len(entry) > 2 and entry[0] == entry[-1] == "/"
+
+
+def is_pattern(entry: str) -> bool:
+    """Whether an allowlist entry is a ``/regex/`` or a glob rather than a word."""
+    return is_regex(entry) or not GLOB_CHARACTERS.isdisjoint(entry)
+
+
+def split_entries(entries: Iterable[str]) -> Tuple[Set[str], Set[str]]:
+    """Split allowlist entries into lowercase words and patterns.
+
+    An entry that starts with a backslash is always a word, the backslash removed, so that
+    words with glob characters or between slashes can still be allowed as they are.
+    """
+    words: Set[str] = set()
+    patterns: Set[str] = set()
+    for entry in entries:
+        entry = entry.strip()
+        if entry.startswith("\\"):
+            words.add(entry[1:].lower())
+        elif is_pattern(entry):
+            patterns.add(entry)
+        else:
+            words.add(entry.lower())
+    words.discard("")
+    return words, patterns
+
+
+def translate_glob(glob: str) -> str:
+    """Translate a glob where ``*`` is any characters, ``?`` one and ``[...]`` one of a set."""
+    parts = []
+    index = 0
+    while index < len(glob):
+        character = glob[index]
+        index += 1
+        if character == "*":
+            parts.append(".*")
+        elif character == "?":
+            parts.append(".")
+        elif character == "[":
+            # A "]" right after the "[" or "[!" is a member of the set
+            start = index + 1 if glob.startswith("!", index) else index
+            end = glob.find("]", start + 1 if glob.startswith("]", start) else start)
+            if end == -1:
+                parts.append(re.escape(character))
+                continue
+            members = glob[index:end].replace("\\", "\\\\")
+            if members.startswith("!"):
+                members = "^" + members[1:]
+            elif members.startswith("^"):
+                members = "\\" + members
+            parts.append(f"[{members}]")
+            index = end + 1
+        else:
+            parts.append(re.escape(character))
+    return "".join(parts)
+
+
+def _split_glob(glob: str) -> Tuple[str, str]:
+    end = next((i for i, character in enumerate(glob) if character in GLOB_CHARACTERS), len(glob))
+    return glob[:end], translate_glob(glob[end:])
+
+
+def _invalid(pattern: str, error: object) -> ValueError:
+    return ValueError(f"Invalid allowlist pattern {pattern!r}: {error}")
+
+
+def _set_end(regex: str, start: int) -> int:
+    """The index of the "]" that closes the set at ``start``, or past the end of the regex."""
+    # A "]" right after the "[" or "[^" is a member of the set
+    index = start + 2 if regex.startswith("^", start + 1) else start + 1
+    if regex.startswith("]", index):
+        index += 1
+    while index < len(regex) and regex[index] != "]":
+        index += 2 if regex[index] == "\\" else 1
+    return index
+
+
+def _has_top_level_alternation(regex: str) -> bool:
+    """Whether the regex has a ``|`` outside of groups.
+
+    Raises ``ValueError`` for unbalanced groups and sets, and a trailing backslash, which would
+    take other patterns into the regex when all of them are combined.
+    """
+    alternation = False
+    depth = 0
+    index = 0
+    while index < len(regex) and depth >= 0:
+        character = regex[index]
+        if character == "\\":
+            index += 1
+        elif character == "[":
+            index = _set_end(regex, index)
+        elif character == "(":
+            depth += 1
+        elif character == ")":
+            depth -= 1
+        elif character == "|" and depth == 0:
+            alternation = True
+        index += 1
+    if depth != 0 or index > len(regex):
+        try:
+            re.compile(regex)
+        except re.error as error:
+            raise _invalid(f"/{regex}/", error) from None
+        raise _invalid(f"/{regex}/", "unbalanced parentheses")
+    return alternation
+
+
+def _split_regex(regex: str) -> Tuple[str, str]:
+    # The alternatives of a top level alternation do not share the prefix of the first one
+    if _has_top_level_alternation(regex):
+        return "", regex
+    end = 0
+    while end < len(regex) and regex[end] in _LITERAL:
+        end += 1
+    # A quantifier applies to the character before it
+    if end < len(regex) and regex[end] in _QUANTIFIERS:
+        end -= 1
+    return regex[:end].lower(), regex[end:]
+
+
+class PrefixTree:
+    """The patterns that share a literal prefix: those it completes and the longer ones."""
+
+    def __init__(self) -> None:
+        self.rests: Set[str] = set()
+        self.children: Dict[str, PrefixTree] = {}
+
+    def add(self, prefix: str, rest: str) -> None:
+        node = self
+        for character in prefix:
+            node = node.children.setdefault(character, PrefixTree())
+        node.rests.add(rest)
+
+    def regex(self) -> str:
+        alternatives = [f"(?:{rest})" if rest else "" for rest in sorted(self.rests)]
+        # Chains of single characters are emitted without a group at every character
+        alternatives += [
+            re.escape(character) + child.regex()
+            for character, child in sorted(self.children.items())
+        ]
+        if len(alternatives) == 1:
+            return alternatives[0]
+        return f"(?:{'|'.join(alternatives)})"
+
+
+def compile_patterns(patterns: Iterable[str]) -> Optional[Pattern[str]]:
+    """Compile allowlist patterns into one regex that matches lowercase words.
+
+    Raises ``ValueError`` for a regex that does not compile. Regexes are combined, so their
+    backreferences and global flags are not supported.
+    """
+    root = PrefixTree()
+    regexes = []
+    for pattern in patterns:
+        if is_regex(pattern):
+            regexes.append(pattern)
+            root.add(*_split_regex(pattern[1:-1]))
+        else:
+            root.add(*_split_glob(pattern.lower()))
+    if not root.rests and not root.children:
+        return None
+    try:
+        return re.compile(root.regex(), re.IGNORECASE)
+    except re.error as combined_error:
+        error = combined_error
+    # Compiling every regex on its own is slower than all of them at once, find the invalid one
+    for pattern in regexes:
+        try:
+            re.compile(f"(?:{pattern[1:-1]})")
+        except re.error as pattern_error:
+            raise _invalid(pattern, pattern_error) from None
+    raise ValueError(f"Invalid allowlist patterns: {error}")
@@ -0,0 +1,106 @@
+"""The unknown words found across a whole run, for bootstrapping an allowlist.
+
+Every process only keeps one entry per unique word: its number of occurrences by code and its
+first location. Like ``_stats``, the flake8 process that parses the options owns the session,
+see ``_sessions``: it merges the entries of the other processes one file at a time and writes
+the report at exit.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from . import _sessions
+
+# "<pid>:<directory>" of the process that owns the session, inherited by spawned workers
+SESSION_VARIABLE = "_FLAKE8_SPELLCHECK_REPORT_SESSION"
+
+# The number of occurrences of a word by code, and its first location as [path, line, column]
+Entry = Dict[str, Any]
+
+_session: Optional["Report"] = None
+
+
+def add_entry(
+    words: Dict[str, Entry], word: str, codes: Dict[str, int], location: List[Any]
+) -> None:
+    entry = words.get(word)
+    if entry is None:
+        words[word] = {"codes": dict(codes), "location": location}
+        return
+    for code, count in codes.items():
+        entry["codes"][code] = entry["codes"].get(code, 0) + count
+    # The order files are checked in depends on the workers, the first location does not
+    if location < entry["location"]:
+        entry["location"] = location
+
+
+class Report(_sessions.Session):
+    """The unknown words found by a single process."""
+
+    def __init__(self, directory: Path, output: Optional[str], allowlist: Optional[str]) -> None:
+        super().__init__(directory)
+        self.output = output
+        self.allowlist = allowlist
+        self.words: Dict[str, Entry] = {}
+
+    def add(self, word: str, code: str, path: str, line: int, column: int) -> None:
+        entry = self.words.get(word)
+        if entry is None:
+            self.words[word] = {"codes": {code: 1}, "location": [path, line, column]}
+            return
+        codes = entry["codes"]
+        codes[code] = codes.get(code, 0) + 1
+        # Without allocating for the words that were already found, see add_entry
+        location = entry["location"]
+        if (path, line, column) < (location[0], location[1], location[2]):
+            entry["location"] = [path, line, column]
+
+    def clear(self) -> None:
+        self.words.clear()
+
+    def as_json(self) -> Dict[str, Entry]:
+        return self.words
+
+    def write(self) -> None:
+        """Merge the words of every process and write the report and the candidate allowlist."""
+        words = self.words
+        for saved in self.saved():
+            for word, entry in saved.items():
+                add_entry(words, word, entry["codes"], entry["location"])
+            # Let the words of this process go before reading the next
+            del saved
+
+        if self.output:
+            with open(self.output, "w") as fp:
+                json.dump(format_report(words), fp, indent=2)
+        if self.allowlist:
+            with open(self.allowlist, "w") as fp:
+                fp.writelines(f"{word}\n" for word in sorted(words))
+
+
+def format_report(words: Dict[str, Entry]) -> Dict[str, Any]:
+    """The words, most frequent first, with their total count and first location."""
+    ranked = sorted(words.items(), key=lambda item: (-sum(item[1]["codes"].values()), item[0]))
+    return {
+        word: {
+            "count": sum(entry["codes"].values()),
+            "codes": dict(sorted(entry["codes"].items())),
+            "location": "{}:{}:{}".format(*entry["location"]),
+        }
+        for word, entry in ranked
+    }
+
+
+def start(output: Optional[str], allowlist: Optional[str]) -> Report:
+    """Join the session of the parent flake8 process, or start a new one, see ``_stats.start``."""
+    global _session
+    if _session is None or _session.pid != os.getpid():
+        _session = _sessions.start(
+            SESSION_VARIABLE,
+            "flake8-spellcheck-report-",
+            lambda directory: Report(directory, output, allowlist),
+            Report.write,
+        )
+    _session.output, _session.allowlist = output, allowlist
+    return _session
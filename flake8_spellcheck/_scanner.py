@@ -0,0 +1,114 @@
+"""A regex scanner for the NAME, COMMENT and STRING tokens of a module, see ``scan_tokens``."""
+import itertools
+import re
+import tokenize
+from tokenize import TokenInfo
+from typing import FrozenSet, List, Match, Optional, Sequence, Tuple
+
+# Python 3.12+ tokenizes the literal parts of f-strings separately
+FSTRING_MIDDLE: Optional[int] = getattr(tokenize, "FSTRING_MIDDLE", None)
+
+STRING_BODY_PATTERNS = [
+    r"'''[^'\\]*(?:(?:\\.|'(?!''))[^'\\]*)*'''",
+    r'"""[^"\\]*(?:(?:\\.|"(?!""))[^"\\]*)*"""',
+    r"'[^\n'\\]*(?:\\.[^\n'\\]*)*'",
+    r'"[^\n"\\]*(?:\\.[^\n"\\]*)*"',
+]
+# The NAME, COMMENT and STRING tokens of a module. Every match starts with a run of characters
+# that cannot start a token, numbers are matched so that they are not mistaken for names and
+# stray quotes leave the scanner in doubt.
+SOURCE_TOKEN_REGEX = re.compile(
+    r"[^\w#'\".]*(?:"
+    r"(?P<comment>#[^\n]*)"
+    rf"|(?P<string>(?P<prefix>[a-zA-Z]{{0,2}})(?:{'|'.join(STRING_BODY_PATTERNS)}))"
+    rf"|(?P<number>{tokenize.Number})"
+    r"|(?P<name>\w+)(?P<quote>['\"])?"
+    r"|(?P<doubt>['\"])"
+    r")",
+    re.DOTALL,
+)
+STRING_PREFIXES = frozenset(re.findall(r"\w+", tokenize.StringPrefix))
+# Prefixes of the strings that Python 3.12+ splits into several tokens
+SPLIT_STRING_PREFIXES = frozenset("fFtT") if FSTRING_MIDDLE is not None else frozenset()
+
+
+SCANNED_TOKEN_TYPES = {
+    "name": tokenize.NAME,
+    "comment": tokenize.COMMENT,
+    "string": tokenize.STRING,
+}
+
+
+def _scanned_in_doubt(match: Match[str], kind: str) -> bool:
+    """Whether tokenize may not agree with a NAME or STRING token found by the scanner."""
+    if kind == "name":
+        return not match.group(kind).isascii() and not match.group(kind).isidentifier()
+    prefix = match.group("prefix")
+    return bool(prefix) and (
+        prefix not in STRING_PREFIXES or not SPLIT_STRING_PREFIXES.isdisjoint(prefix)
+    )
+
+
+def _changed_spans(line_starts: List[int], changed: FrozenSet[int]) -> List[Tuple[int, int]]:
+    """The offsets of the changed lines in the source, merged into sorted spans."""
+    spans: List[Tuple[int, int]] = []
+    for row in sorted(line for line in changed if line < len(line_starts)):
+        start, end = line_starts[row - 1], line_starts[row]
+        if spans and spans[-1][1] == start:
+            start = spans.pop()[0]
+        spans.append((start, end))
+    return spans
+
+
+def scan_tokens(
+    lines: Sequence[str], changed: Optional[FrozenSet[int]] = None
+) -> Optional[List[TokenInfo]]:
+    """Extract the NAME, COMMENT and STRING tokens of a module straight from its lines.
+
+    This is much faster than ``tokenize``, which creates a token for every operator,
+    newline and indent. Returns None when the scanner may disagree with ``tokenize``,
+    such as for unterminated strings or f-strings on Python 3.12+, so that the caller
+    can fall back to it. Given ``changed`` lines, only the tokens on them are returned,
+    though the whole module is still scanned.
+    """
+    source = "".join(lines)
+    if "\r" in source:
+        return None
+    line_starts = [0, *itertools.accumulate(len(line) for line in lines)]
+    spans = _changed_spans(line_starts, changed) if changed is not None else None
+    span = 0
+    # Only non-ASCII names can be in doubt
+    names_in_doubt = not source.isascii()
+    tokens = []
+    row = 0
+    for match in SOURCE_TOKEN_REGEX.finditer(source):
+        kind = match.lastgroup
+        if kind == "number":
+            continue
+        elif kind not in SCANNED_TOKEN_TYPES or (
+            (names_in_doubt or kind != "name") and _scanned_in_doubt(match, kind)
+        ):
+            # Stray quotes and names directly followed by one (unknown string prefixes) too
+            return None
+
+        start, end = match.span(kind)
+        if spans is not None:
+            while span < len(spans) and spans[span][1] <= start:
+                span += 1
+            if span == len(spans) or spans[span][0] >= end:
+                continue
+        while line_starts[row + 1] <= start:
+            row += 1
+        end_row = row
+        while line_starts[end_row + 1] < end:
+            end_row += 1
+        tokens.append(
+            TokenInfo(
+                SCANNED_TOKEN_TYPES[kind],
+                match.group(kind),
+                (row + 1, start - line_starts[row]),
+                (end_row + 1, end - line_starts[end_row]),
+                lines[row],
+            )
+        )
+    return tokens
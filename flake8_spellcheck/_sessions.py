@@ -0,0 +1,87 @@
+"""Data collected by every flake8 process and combined by the one that parses the options.
+
+That process owns the session: it creates a directory that worker processes save their data to
+when they exit, and combines the data of every process at exit. Spawned workers parse the options
+again and join the session through the environment they inherit, forked workers inherit the
+data of their parent and ``claim`` it.
+"""
+import atexit
+import json
+import multiprocessing
+import multiprocessing.util
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Iterator, TypeVar
+
+SessionType = TypeVar("SessionType", bound="Session")
+
+
+class Session:
+    """The data of a single process, which subclasses keep and ``clear``."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.pid = os.getpid()
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def as_json(self) -> Any:
+        raise NotImplementedError
+
+    def claim(self) -> None:
+        """Take ownership of the data in a forked worker process.
+
+        A forked worker starts with a copy of its parent's data, which the parent combines
+        itself, so it is cleared and the worker's own is saved when it exits.
+        """
+        if self.pid == os.getpid():
+            return
+        self.pid = os.getpid()
+        self.clear()
+        multiprocessing.util.Finalize(None, self.save, exitpriority=0)
+
+    def save(self) -> None:
+        try:
+            with open(self.directory / f"{self.pid}.json", "w") as fp:
+                json.dump(self.as_json(), fp)
+        except OSError:
+            pass
+
+    def saved(self) -> Iterator[Any]:
+        """Read the data saved by the other processes one file at a time, then remove it."""
+        for path in self.directory.glob("*.json"):
+            try:
+                data = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            yield data
+            # Let the data of this process go before reading the next
+            del data
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def start(
+    variable: str,
+    prefix: str,
+    create: Callable[[Path], SessionType],
+    finish: Callable[[SessionType], None],
+) -> SessionType:
+    """Join the session of the parent flake8 process, or start a new one.
+
+    ``variable`` holds ``"<pid>:<directory>"`` of the process that owns the session, which
+    calls ``finish`` at exit.
+    """
+    owner, _, directory = os.environ.get(variable, "").partition(":")
+    if multiprocessing.parent_process() is not None and owner == str(os.getppid()):
+        session = create(Path(directory))
+        multiprocessing.util.Finalize(None, session.save, exitpriority=0)
+        return session
+
+    directory = tempfile.mkdtemp(prefix=prefix)
+    os.environ[variable] = f"{os.getpid()}:{directory}"
+    session = create(Path(directory))
+    atexit.register(finish, session)
+    return session
@@ -0,0 +1,92 @@
+"""Opt-in counters and timers for profiling the plugin, aggregated across worker processes.
+
+The flake8 process that parses the options owns the session, see ``_sessions``, and reports
+the total at exit.
+"""
+import collections
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Counter, DefaultDict, Dict, Optional
+
+from . import _sessions
+
+ENVIRONMENT_VARIABLE = "FLAKE8_SPELLCHECK_STATS"
+# "<pid>:<directory>" of the process that owns the session, inherited by spawned workers
+SESSION_VARIABLE = "_FLAKE8_SPELLCHECK_STATS_SESSION"
+
+_session: Optional["Stats"] = None
+
+
+class Stats(_sessions.Session):
+    """Counters and wall clock timers of a single process."""
+
+    def __init__(self, directory: Path, output: Optional[str]) -> None:
+        super().__init__(directory)
+        self.output = output
+        self.counters: Counter[str] = collections.Counter()
+        self.timers: DefaultDict[str, float] = collections.defaultdict(float)
+
+    def clear(self) -> None:
+        self.counters.clear()
+        self.timers.clear()
+
+    def as_json(self) -> Dict[str, Any]:
+        return {
+            "processes": 1,
+            "timers": dict(self.timers),
+            "counters": dict(self.counters),
+        }
+
+    def report(self) -> None:
+        """Add up the numbers of every process and print or write them."""
+        total = self.as_json()
+        for saved in self.saved():
+            total = merge(total, saved)
+
+        if self.output:
+            with open(self.output, "w") as fp:
+                json.dump(total, fp, indent=2, sort_keys=True)
+        else:
+            print(format_stats(total), file=sys.stderr)
+
+
+def merge(left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
+    timers = collections.Counter(left["timers"])
+    timers.update(right["timers"])
+    counters = collections.Counter(left["counters"])
+    counters.update(right["counters"])
+    return {
+        "processes": left["processes"] + right["processes"],
+        "timers": dict(timers),
+        "counters": dict(counters),
+    }
+
+
+def format_stats(stats: Dict[str, Any]) -> str:
+    processes = stats["processes"]
+    lines = [f"flake8-spellcheck stats ({processes} process{'es' if processes != 1 else ''})"]
+    for name, seconds in sorted(stats["timers"].items()):
+        lines.append(f"  {name:<32} {seconds:12.3f}s")
+    for name, count in sorted(stats["counters"].items()):
+        lines.append(f"  {name:<32} {count:12d}")
+    return "\n".join(lines)
+
+
+def start(output: Optional[str]) -> Stats:
+    """Join the session of the parent flake8 process, or start a new one.
+
+    Any process other than a spawned worker starts its own session, once, and reports it at
+    exit, see ``_sessions.start``.
+    """
+    global _session
+    if _session is None or _session.pid != os.getpid():
+        _session = _sessions.start(
+            SESSION_VARIABLE,
+            "flake8-spellcheck-stats-",
+            lambda directory: Stats(directory, output),
+            Stats.report,
+        )
+    _session.output = output
+    return _session
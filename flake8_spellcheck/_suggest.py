@@ -0,0 +1,95 @@
+"""Corrections for misspelt words, found in the word graphs of the ``dawg`` backend."""
+import functools
+import time
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from . import _backends
+
+
+def is_subsequence(word: str, other: str) -> bool:
+    """Whether ``other`` contains the characters of ``word`` in order."""
+    characters = iter(other)
+    return all(char in characters for char in word)
+
+
+def match_case(suggestion: str, word: str) -> str:
+    """Spell a lowercase dictionary word in the case of a misspelt word."""
+    if len(word) > 1 and word.isupper():
+        return suggestion.upper()
+    elif word[:1].isupper():
+        return suggestion[:1].upper() + suggestion[1:]
+    return suggestion
+
+
+class Suggester:
+    """Bounded, process wide memoization of the corrections suggested for misspelt words.
+
+    Suggestions are found in the word graphs of the ``dawg`` backend, which ``load`` maps
+    from the cache directory. Words one edit away are always all found, so that the closest
+    suggestions do not depend on the load of the machine. Further ones are only searched while
+    fewer than ``limit`` were found and the ``budget`` of the lookup, in seconds, is not spent.
+    ``cut_short`` counts the lookups the budget ran out on.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[], Sequence[_backends.WordGraph]],
+        limit: int,
+        max_distance: int,
+        budget: float,
+        maxsize: Optional[int],
+    ) -> None:
+        self.load = load
+        self.limit = limit
+        self.max_distance = max_distance
+        self.budget = budget
+        self.graphs: Optional[Sequence[_backends.WordGraph]] = None
+        self.cut_short = 0
+        self._search = functools.lru_cache(maxsize=maxsize)(self._find)
+
+    def load_graphs(self) -> Sequence[_backends.WordGraph]:
+        if self.graphs is None:
+            self.graphs = self.load()
+        return self.graphs
+
+    def suggest(self, word: str, use_symbols: bool) -> Tuple[str, ...]:
+        suggestions, complete = self._search(word, use_symbols)
+        if not complete:
+            self.cut_short += 1
+        return suggestions
+
+    def _find(self, word: str, use_symbols: bool) -> Tuple[Tuple[str, ...], bool]:
+        """The suggestions for a word, and whether they were found within the budget."""
+        words, extra = self.load_graphs()
+        # The same as normalize_word, defined in the package that imports this module
+        test_word = word.lower().strip("'").strip('"')
+        deadline = time.perf_counter() + self.budget
+        found: Dict[str, int] = {}
+        complete = True
+        for max_distance in range(1, self.max_distance + 1):
+            if max_distance > 1 and len(found) >= self.limit:
+                break
+            # Words one edit away are always all found
+            walk_deadline = deadline if max_distance > 1 else float("inf")
+            # Names are spelled without apostrophes, like the no symbols dictionary
+            for graph in [words] if use_symbols else [words, extra]:
+                for distance, suggestion in graph.suggest(test_word, max_distance, walk_deadline):
+                    if use_symbols or "'" not in suggestion:
+                        found.setdefault(suggestion, distance)
+            if max_distance > 1 and time.perf_counter() > deadline:
+                # The walk may have stopped early, and further ones are not started
+                complete = False
+                break
+        # Without word frequencies, prefer the fewest edits, the same first letter and then
+        # words with letters left out of the misspelling, the most common typo
+        ranked = sorted(
+            found,
+            key=lambda suggestion: (
+                found[suggestion],
+                suggestion[0] != test_word[:1],
+                not is_subsequence(test_word, suggestion),
+                suggestion,
+            ),
+        )
+        suggestions = tuple(match_case(suggestion, word) for suggestion in ranked[: self.limit])
+        return suggestions, complete
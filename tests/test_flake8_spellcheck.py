@@ -1,8 +1,64 @@
+import asyncio
+import fnmatch
+import importlib.metadata
+import json
+import os
+import pickle
+import random
+import re
+import subprocess
+import sys
+import tokenize
+from pathlib import Path
 from textwrap import dedent
 
 import pytest
 
-from flake8_spellcheck import is_number, parse_camel_case, parse_snake_case
+from flake8_spellcheck import (
+    NO_SYMBOLS_PATH,
+    WORD_SPLITTERS,
+    CharClass,
+    Misspelling,
+    NestedAllowlists,
+    NoSymbolsSet,
+    SpellChecker,
+    SpellCheckPlugin,
+    WordMemo,
+    _affixes,
+    _backends,
+    _cache,
+    _compounds,
+    _diff,
+    _patterns,
+    _report,
+    _scanner,
+    _stats,
+    _suggest,
+    char_classes,
+    comment_text,
+    default_options,
+    dictionary_names,
+    is_number,
+    load_dictionary,
+    missing_words,
+    no_symbols_extra,
+    parse_camel_case,
+    parse_snake_case,
+    regex_parse_camel_case,
+    regex_parse_snake_case,
+    scan_words,
+    string_text,
+)
+from flake8_spellcheck.__main__ import expand_paths, schedule
+
+REPOSITORY = Path(__file__).parent.parent
+
+
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path, monkeypatch):
+    # Keep compiled dictionary caches out of the real user cache directory
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    return tmp_path / "cache" / "flake8-spellcheck"
 
 
 @pytest.mark.parametrize(
@@ -17,10 +73,17 @@ from flake8_spellcheck import is_number, parse_camel_case, parse_snake_case
             [((30, 4), "foo"), ((30, 8), "bar"), ((30, 12), "baz")],
         ),
         ("__init__", (0, 3), [((0, 5), "init")]),
+        # Code points outside the Basic Multilingual Plane (Deseret)
+        (
+            "\U00010428\U00010429_\U00010400",
+            (0, 0),
+            [((0, 0), "\U00010428\U00010429"), ((0, 3), "\U00010400")],
+        ),
     ],
 )
-def test_parse_snake_case(value, col_offset, tokens):
-    assert list(parse_snake_case(value, col_offset)) == tokens
+@pytest.mark.parametrize("splitter", [parse_snake_case, regex_parse_snake_case])
+def test_parse_snake_case(splitter, value, col_offset, tokens):
+    assert list(splitter(value, col_offset)) == tokens
 
 
 @pytest.mark.parametrize(
@@ -34,17 +97,537 @@ def test_parse_snake_case(value, col_offset, tokens):
         ("pair-programming", (5, 0), [((5, 0), "pair"), ((5, 5), "programming")]),
         ("FooBarBaz", (4, 4), [((4, 4), "Foo"), ((4, 7), "Bar"), ((4, 10), "Baz")]),
         ("_ignoredValue", (20, 10), [((20, 11), "ignored"), ((20, 18), "Value")]),
+        # Code points outside the Basic Multilingual Plane (Deseret)
+        (
+            "\U00010400\U00010428\U00010400\U00010429",
+            (0, 0),
+            [((0, 0), "\U00010400\U00010428"), ((0, 2), "\U00010400\U00010429")],
+        ),
     ],
 )
-def test_parse_camel_case(value, col_offset, tokens):
-    assert list(parse_camel_case(value, col_offset)) == tokens
+@pytest.mark.parametrize("splitter", [parse_camel_case, regex_parse_camel_case])
+def test_parse_camel_case(splitter, value, col_offset, tokens):
+    assert list(splitter(value, col_offset)) == tokens
+
 
+@pytest.mark.parametrize(
+    ["splitter", "regex_splitter"],
+    [(parse_snake_case, regex_parse_snake_case), (parse_camel_case, regex_parse_camel_case)],
+)
+def test_regex_splitters_match_loop_splitters(splitter, regex_splitter):
+    # Mix of lower, upper, title case, digits, separators, other letters and astral characters
+    alphabet = "aZz09_'-:`. éÁűŐǅªß中\U00010400\U00010428"
+    rng = random.Random(1234)
+    for _ in range(2000):
+        value = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+        assert list(regex_splitter(value, (3, 7))) == list(splitter(value, (3, 7))), value
 
-@pytest.mark.parametrize(["value", "result"], [("8", True), ("word8", False)])
+
+@pytest.mark.parametrize(
+    ["char", "char_class"],
+    [
+        ("a", CharClass.LOWER),
+        ("ű", CharClass.LOWER),
+        ("\U00010428", CharClass.LOWER),
+        ("Á", CharClass.UPPER),
+        ("\U00010400", CharClass.UPPER),
+        ("7", CharClass.DIGIT),
+        ("٣", CharClass.OTHER),
+        ("_", CharClass.OTHER),
+        ("'", CharClass.OTHER),
+    ],
+)
+def test_char_classes(char, char_class):
+    assert char_classes[char] is char_class
+
+
+@pytest.mark.parametrize(
+    ["value", "result"],
+    [
+        ("8", True),
+        ("word8", False),
+        ("1e5", True),
+        ("1E5", True),
+        ("1e", False),
+        ("e5", False),
+        ("1_000", True),
+        ("1__000", False),
+        ("_1", False),
+        ("1_", False),
+        ("1_000.000_1e1_0", True),
+        ("1_.5", False),
+        (".5", True),
+        ("5.", True),
+        (".", False),
+        ("-inf", True),
+        ("Infinity", True),
+        ("infinit", False),
+        ("NaN", True),
+        ("nan1", False),
+        (" 42\t", True),
+        ("", False),
+        ("١٢٣", True),
+        ("\u2003 7", True),
+    ],
+)
 def test_is_number(value, result):
     assert is_number(value) is result
 
 
+def float_succeeds(value):
+    try:
+        float(value)
+    except ValueError:
+        return False
+    return True
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_is_number_matches_float(seed):
+    rng = random.Random(seed)
+    alphabet = "0123456789_.eE+- \tinfatyINFATYx'"
+    samples = ["", "inf", "nan", "infinity", "1e5", "1_0", "١٢٣", "٣a"]
+    samples += [
+        "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 8))) for _ in range(5000)
+    ]
+    samples += [
+        "".join(rng.choice("0123456789_.eE") for _ in range(rng.randint(1, 6)))
+        for _ in range(5000)
+    ]
+    for value in samples:
+        assert is_number(value) is float_succeeds(value), repr(value)
+
+
+def test_sorted_word_set():
+    words, empty = _backends.unpack_word_sets(
+        _backends.pack_word_sets([["zebra", "", "apple", "árvíztűrő", "don't", "apple"], []])
+    )
+    assert len(words) == 5
+    assert list(words) == ["", "apple", "don't", "zebra", "árvíztűrő"]
+    for word in ["", "apple", "don't", "zebra", "árvíztűrő"]:
+        assert word in words
+    for word in ["appl", "apples", "dont", "zebras", "árvíztűr", "\U00010400", None]:
+        assert word not in words
+    assert len(empty) == 0
+    assert "apple" not in empty
+
+
+def test_sorted_word_set_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        _backends.unpack_word_sets(b"NOPE" + bytes(12))
+
+
+def legacy_no_symbols(words):
+    no_symbols = set()
+    for w in words:
+        if w.endswith("'s"):
+            no_symbols.add(w.replace("'s", ""))
+        else:
+            no_symbols.add(w.replace("'", ""))
+    return no_symbols
+
+
+def test_no_symbols_set():
+    words = {"", "get", "don't", "user's", "rock'n'roll's", "rock'n'roll", "baha'i", "it's"}
+    no_symbols = NoSymbolsSet(frozenset(words), frozenset(no_symbols_extra(words)))
+    legacy = legacy_no_symbols(words)
+    for word in words | legacy | {"user", "users", "rocknroll", "bahai", "its", "it", None}:
+        assert (word in no_symbols) == (word in legacy), word
+
+
+@pytest.mark.parametrize("dictionary", dictionary_names())
+def test_shipped_no_symbols(dictionary):
+    words = set(load_dictionary(dictionary))
+    # Run update-no-symbols.py if this fails
+    shipped = frozenset((NO_SYMBOLS_PATH / f"{dictionary}.txt").read_text().splitlines())
+    no_symbols = NoSymbolsSet(frozenset(words), shipped)
+    legacy = legacy_no_symbols(words)
+    assert [w for w in words | legacy | shipped if (w in no_symbols) != (w in legacy)] == []
+
+
+AFF = """\
+SET UTF-8
+
+SFX M Y 1
+SFX M 0 's .
+
+SFX S Y 3
+SFX S y ies [^aeiou]y
+SFX S 0 es [sxz]
+SFX S 0 s [^sxyz]
+
+SFX D Y 2
+SFX D 0 d e
+SFX D 0 ed [^e]
+"""
+
+
+def test_affix_word_set():
+    suffixes = _affixes.parse_aff(AFF)
+    flags = _affixes.parse_dic("4\nBox/S\nfly/S\nlove/DM\nUser/MS\nzebra\n")
+    assert flags == {"box": "S", "fly": "S", "love": "DM", "user": "MS", "zebra": ""}
+    words = _affixes.AffixWordSet(
+        frozenset(flags), {word: flags for word, flags in flags.items() if flags}, suffixes
+    )
+    derived = {"boxes", "flies", "loved", "love's", "user's", "users"}
+    assert set(words) == set(flags) | derived
+    for word in derived | set(flags):
+        assert word in words, word
+    for word in ["boxs", "flys", "loveed", "zebras", "zebra's", "userss", "s", "'s", "", None]:
+        assert word not in words, word
+    assert missing_words(words, {"users", "zebra", "zebras"}) == {"zebras"}
+
+
+def test_affix_compress():
+    suffixes = _affixes.parse_aff(AFF)
+    words = {"box", "boxes", "fly", "flies", "love", "loved", "love's", "zebra", "user", "users"}
+    # "user" has no "user's", which the M flag would derive too
+    assert _affixes.compress(words, suffixes) == {
+        "box": "S",
+        "fly": "S",
+        "love": "DM",
+        "user": "S",
+        "zebra": "",
+    }
+    rendered = _affixes.render_dic(_affixes.compress(words, suffixes))
+    assert rendered == "5\nbox/S\nfly/S\nlove/DM\nuser/S\nzebra\n"
+    flags = _affixes.parse_dic(rendered)
+    assert set(_affixes.AffixWordSet(frozenset(flags), flags, suffixes)) == words
+
+    with pytest.raises(ValueError):
+        _affixes.parse_aff("PFX A Y 1\nPFX A 0 re .\n")
+
+
+def test_shipped_affixes():
+    words = load_dictionary("en_US")
+    assert isinstance(words, _affixes.AffixWordSet)
+    expanded = frozenset(words)
+    assert len(expanded) > 2 * len(words.words)
+    # Lookups agree with the expanded words, also for forms that are not in the dictionary
+    rng = random.Random(0)
+    for word in rng.sample(sorted(expanded), 2000):
+        for form in [word, f"{word}s", f"{word}es", f"{word}ed", f"{word}'s", word[:-1]]:
+            assert (form in words) == (form in expanded), form
+
+
+def test_word_graph():
+    words, empty = _backends.unpack_word_graphs(
+        _backends.pack_word_graphs(
+            [["zebra", "", "apple", "applet", "árvíztűrő", "don't", "apple", "\U00010400"], []]
+        )
+    )
+    assert len(words) == 7
+    assert list(words) == ["", "apple", "applet", "don't", "zebra", "árvíztűrő", "\U00010400"]
+    for word in ["appl", "apples", "dont", "zebras", "árvíztűr", "\U00010401", None]:
+        assert word not in words
+    assert len(empty) == 0
+    assert list(empty) == []
+    assert "apple" not in empty
+
+
+def test_word_graph_matches_set():
+    rng = random.Random(0)
+    words = {"".join(rng.choices("abcde'", k=rng.randint(1, 8))) for _ in range(2000)}
+    (graph,) = _backends.unpack_word_graphs(_backends.pack_word_graphs([words]))
+    assert list(graph) == sorted(words)
+    for _ in range(2000):
+        word = "".join(rng.choices("abcdef'", k=rng.randint(0, 9)))
+        assert (word in graph) == (word in words), word
+
+
+def edit_distance(word, other):
+    rows = [list(range(len(other) + 1))]
+    for i, char in enumerate(word, 1):
+        row = [i]
+        for j, other_char in enumerate(other, 1):
+            cost = min(rows[-1][j] + 1, row[j - 1] + 1, rows[-1][j - 1] + (char != other_char))
+            if i > 1 and j > 1 and char == other[j - 2] and word[i - 2] == other_char:
+                cost = min(cost, rows[-2][j - 2] + 1)
+            row.append(cost)
+        rows.append(row)
+    return rows[-1][-1]
+
+
+def test_word_graph_suggest():
+    rng = random.Random(0)
+    words = {"".join(rng.choices("abcde", k=rng.randint(0, 6))) for _ in range(1000)}
+    (graph,) = _backends.unpack_word_graphs(_backends.pack_word_graphs([words]))
+    for _ in range(200):
+        word = "".join(rng.choices("abcdef", k=rng.randint(0, 7)))
+        for max_distance in range(3):
+            expected = {(edit_distance(word, other), other) for other in words}
+            found = graph.suggest(word, max_distance, deadline=float("inf"))
+            assert sorted(found) == sorted(
+                (distance, other) for distance, other in expected if distance <= max_distance
+            )
+    # The deadline is checked every few hundred nodes
+    partial = graph.suggest("abcde", 2, deadline=0)
+    assert set(partial) < set(graph.suggest("abcde", 2, deadline=float("inf")))
+
+
+def test_suggester():
+    graphs = _backends.unpack_word_graphs(
+        _backends.pack_word_graphs([["comet", "comment", "cement", "moment", "don't"], ["dont"]])
+    )
+    suggester = _suggest.Suggester(lambda: graphs, 3, 2, budget=60, maxsize=None)
+    assert suggester.suggest("coment", True) == ("comment", "cement", "comet")
+    assert suggester.suggest("Coment", True) == ("Comment", "Cement", "Comet")
+    assert suggester.suggest("COMENT", True) == ("COMMENT", "CEMENT", "COMET")
+    assert suggester.suggest("dnot", True) == ("don't",)
+    assert suggester.suggest("dnot", False) == ("dont",)
+    assert suggester.cut_short == 0
+
+    # Words one edit away are found whatever the budget, further ones only within it
+    suggester = _suggest.Suggester(lambda: graphs, 3, 2, budget=0, maxsize=None)
+    assert suggester.suggest("coment", True) == ("comment", "cement", "comet")
+    assert suggester.cut_short == 0
+    suggester.suggest("comnet", True)
+    assert suggester.cut_short == 1
+    assert Misspelling(1, 0, "SC100", "coment", ("comment",)).message == (
+        "SC100 Possibly misspelt word: 'coment' (did you mean 'comment'?)"
+    )
+    assert Misspelling(1, 0, "SC100", "coment", ("comment", "cement", "comet")).message == (
+        "SC100 Possibly misspelt word: 'coment' (did you mean 'comment', 'cement' or 'comet'?)"
+    )
+
+
+@pytest.mark.parametrize(
+    "word, min_length, expected",
+    [
+        ("filesystem", 3, ("file", "system")),
+        ("getattr", 3, ("get", "attr")),
+        ("dataframes", 3, ("data", "frames")),
+        ("setdefaultvalue", 3, ("set", "default", "value")),
+        ("userid", 3, ()),
+        ("userid", 2, ("user", "id")),
+        ("file", 3, ()),
+        ("filesysten", 3, ()),
+        ("don'tfile", 3, ()),
+    ],
+)
+def test_decomposer(word, min_length, expected):
+    words = ["attr", "data", "default", "don't", "file", "files", "frames"]
+    words += ["get", "id", "set", "system", "user", "value"]
+    decomposer = _compounds.Decomposer(words, min_length, max_steps=256, maxsize=None)
+    assert decomposer.split(word) == expected
+
+
+def test_decomposer_max_steps():
+    decomposer = _compounds.Decomposer(["ab", "abab"], 2, max_steps=50, maxsize=None)
+    assert decomposer.split("ab" * 10) == ("abab",) * 5
+    # Every position can be reached, but the search is cut off long before the end
+    assert decomposer.split("ab" * 100) == ()
+
+
+def test_word_memo():
+    memo = WordMemo(
+        frozenset({"get", "user", "don't"}),
+        frozenset({"get", "user", "dont"}),
+        WORD_SPLITTERS["loop"],
+        maxsize=16,
+    )
+    assert memo.split("get_usr_id") == ((0, "get"), (4, "usr"), (8, "id"))
+    assert memo.split("get_usr_id") == ((0, "get"), (4, "usr"), (8, "id"))
+    assert memo.split("http://example.com") == ()
+    assert memo.verdict("Don't", True) is True
+    assert memo.verdict("dont", True) is False
+    assert memo.verdict("dont", False) is True
+    assert memo.verdict("1e5", False) is True
+    assert memo.verdict("''", True) is True
+    assert memo.stats() == {
+        "split_hits": 1,
+        "split_misses": 2,
+        "verdict_hits": 0,
+        "verdict_misses": 5,
+    }
+
+
+@pytest.mark.parametrize("backend", ["frozenset", "mmap"])
+def test_word_memo_misspellings(backend):
+    words, extra = frozenset({"get", "user", "don't", "it's"}), frozenset({"dont", "it"})
+    if backend == "mmap":
+        words, extra = _backends.unpack_word_sets(_backends.pack_word_sets([words, extra]))
+    memo = WordMemo(words, NoSymbolsSet(words, extra), WORD_SPLITTERS["loop"], maxsize=16)
+
+    candidates = {"Get", "usr", "'user'", "Don't", "dont", "its", "1e5", "ü", "'", "''"}
+    assert memo.misspellings(candidates, True) == {"usr", "dont", "its", "ü"}
+    assert memo.misspellings(candidates, False) == {"usr", "Don't", "its", "ü"}
+    assert memo.misspellings(set(), False) == set()
+
+
+def test_missing_words():
+    words = {"get", "user", "dont", "don't", "it"}
+    for dictionary in [
+        frozenset({"get", "user"}),
+        NoSymbolsSet(frozenset({"get", "don't"}), frozenset({"dont"})),
+        _backends.unpack_word_sets(_backends.pack_word_sets([{"get", "user"}]))[0],
+    ]:
+        assert missing_words(dictionary, words) == {w for w in words if w not in dictionary}
+
+
+def test_scan_words():
+    text = "first line\n  second   line\n\nlast"
+    assert list(scan_words(text, (3, 8))) == [
+        ((3, 8), "first"),
+        ((3, 14), "line"),
+        ((4, 2), "second"),
+        ((4, 11), "line"),
+        ((6, 0), "last"),
+    ]
+
+
+SCANNER_SOURCES = [
+    "x = 1if y else 2  # numbers: 0x_ff 1e5 1_000j .5\nvalue = 1.real + 0o17 + 0b1\n",
+    "s = rb\"\\x00\" + Rb'''multi\nline''' + u\"ü\"\n",
+    's = "a \\\n  continued"  # comment with "quotes"\n',
+    '"""Module docstring with \'quotes\', \\"escapes\\" and # hash."""\n',
+    "def f():\n    return '#not a comment'  # a comment\n",
+    "ünïcödé = 'x'\nx = 1 \\\n    + y\n",
+    'x = \'\'\'\'\'\' + """a""\\"""" + \'\'\n',
+    "no_trailing_newline = 'a' # end",
+]
+
+
+@pytest.mark.parametrize(
+    "source",
+    SCANNER_SOURCES + [path.read_text() for path in sorted(REPOSITORY.glob("*/*.py"))],
+    ids=[f"source{i}" for i in range(len(SCANNER_SOURCES))]
+    + [str(path.relative_to(REPOSITORY)) for path in sorted(REPOSITORY.glob("*/*.py"))],
+)
+def test_scan_tokens(source):
+    lines = source.splitlines(keepends=True)
+    generated = list(tokenize.generate_tokens(iter(lines).__next__))
+    tokens = _scanner.scan_tokens(lines)
+    fstring_start = getattr(tokenize, "FSTRING_START", None)
+    if fstring_start is not None and any(token.type == fstring_start for token in generated):
+        # Python 3.12+ tokenizes the parts of f-strings, which the scanner leaves to tokenize
+        assert tokens is None
+        return
+    assert tokens is not None
+    expected = [
+        (token.type, token.string, token.start, token.end, token.line.splitlines()[0])
+        for token in generated
+        if token.type in (tokenize.NAME, tokenize.COMMENT, tokenize.STRING)
+    ]
+    scanned = [
+        (token.type, token.string, token.start, token.end, token.line.splitlines()[0])
+        for token in tokens
+    ]
+    assert scanned == expected
+
+
+@pytest.mark.parametrize("source", SCANNER_SOURCES)
+@pytest.mark.parametrize("changed", [frozenset(), frozenset({2}), frozenset({1, 3, 100})])
+def test_scan_tokens_changed_lines(source, changed):
+    lines = source.splitlines(keepends=True)
+    expected = [
+        token
+        for token in _scanner.scan_tokens(lines)
+        if not changed.isdisjoint(range(token.start[0], token.end[0] + 1))
+    ]
+    assert _scanner.scan_tokens(lines, changed) == expected
+    # Tokens outside the changed lines can still put the scanner in doubt
+    assert _scanner.scan_tokens(["'stray\n", *lines], changed) is None
+
+
+def test_parse_unified_diff():
+    diff = dedent(
+        """\
+        diff --git a/example.py b/example.py
+        --- a/example.py
+        +++ b/example.py
+        @@ -1,3 +1,4 @@
+         unchanged
+        -removed
+        +added
+        ++++ added, not a header
+         unchanged
+        @@ -10 +11,0 @@
+        -removed
+        @@ -20,0 +20 @@ def context():
+        +added
+        \\ No newline at end of file
+        --- a/removed.py
+        +++ /dev/null
+        @@ -1 +0,0 @@
+        -removed
+        --- other.py
+        +++ other.py\t2024-01-01 00:00:00
+        @@ -1 +1 @@
+        -removed
+        +added
+        """
+    )
+    assert _diff.parse_unified_diff(diff) == {
+        _diff.normalize_path("example.py"): frozenset({2, 3, 20}),
+        _diff.normalize_path("other.py"): frozenset({1}),
+    }
+
+
+@pytest.mark.parametrize(
+    ["header", "path"],
+    [
+        ('+++ "b/caf\\303\\251.py"', "café.py"),
+        ('+++ "b/tab\\there.py"', "tab\there.py"),
+        ('+++ "b/quote\\"back\\\\slash.py"', 'quote"back\\slash.py'),
+        ('+++ "b/new\\nline.py"\t2024-01-01 00:00:00', "new\nline.py"),
+    ],
+)
+def test_parse_unified_diff_quoted_paths(header, path):
+    diff = f"{header}\n@@ -0,0 +1 @@\n+added\n"
+    assert _diff.parse_unified_diff(diff) == {_diff.normalize_path(path): frozenset({1})}
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "x = 'unterminated\n",
+        "x = '''unterminated\n",
+        "x = ur'invalid prefix'\n",
+        "x = 1\r\ny = 2\r\n",
+        "² = 1\n",
+    ],
+)
+def test_scan_tokens_in_doubt(source):
+    assert _scanner.scan_tokens(source.splitlines(keepends=True)) is None
+
+
+def test_scan_tokens_f_strings():
+    tokens = _scanner.scan_tokens(['x = f"{value} text"\n'])
+    if sys.version_info >= (3, 12):
+        # The names in the replacement fields are tokens of their own
+        assert tokens is None
+    else:
+        assert tokens is not None
+        assert [token.string for token in tokens] == ["x", 'f"{value} text"']
+
+
+@pytest.mark.parametrize(
+    ["comment", "text"],
+    [
+        ("# hello", "  hello"),
+        ("### hello", "    hello"),
+        ("# type: ignore  # noqa: W503", "  type: ignore              "),
+    ],
+)
+def test_comment_text(comment, text):
+    assert comment_text(comment) == text
+
+
+@pytest.mark.parametrize(
+    ["literal", "text"],
+    [
+        ('"hello"', " hello"),
+        ("rb'a\\nb'", "   a\\nb"),
+        ('f"a\\nb"', "  a  b"),
+        ('"""doc\nstring"""', "   doc\nstring"),
+        ("'\\x41\\N{DASH}b'", "             b"),
+    ],
+)
+def test_string_text(literal, text):
+    assert string_text(literal) == text
+
+
 def test_python_words(flake8_path):
     (flake8_path / "example.py").write_text(
         dedent(
@@ -67,17 +650,17 @@ class TestComments:
             (
                 """dont "make" b4d c8omm3nts""",
                 [
-                    "./example.py:2:1: SC100 Possibly misspelt word: 'dont'",
-                    "./example.py:2:1: SC100 Possibly misspelt word: 'b4d'",
-                    "./example.py:2:1: SC100 Possibly misspelt word: 'c8omm3nts'",
+                    "./example.py:2:3: SC100 Possibly misspelt word: 'dont'",
+                    "./example.py:2:15: SC100 Possibly misspelt word: 'b4d'",
+                    "./example.py:2:19: SC100 Possibly misspelt word: 'c8omm3nts'",
                 ],
             ),
             # For unicode character test
             (
                 """árvíz1űrő 1ükörfúrógép""",
                 [
-                    "./example.py:2:1: SC100 Possibly misspelt word: 'árvíz1űrő'",
-                    "./example.py:2:1: SC100 Possibly misspelt word: '1ükörfúrógép'",
+                    "./example.py:2:3: SC100 Possibly misspelt word: 'árvíz1űrő'",
+                    "./example.py:2:13: SC100 Possibly misspelt word: '1ükörfúrógép'",
                 ],
             ),
         ],
@@ -379,9 +962,13 @@ class TestName:
             ),
         ],
     )
-    def test_fail(self, flake8_path, source_code, expected_out_lines):
+    @pytest.mark.parametrize("word_splitter", ["loop", "regex"])
+    @pytest.mark.parametrize("memo_size", [0, 65536])
+    def test_fail(self, flake8_path, source_code, expected_out_lines, word_splitter, memo_size):
         (flake8_path / "example.py").write_text(dedent(source_code))
-        result = flake8_path.run_flake8()
+        result = flake8_path.run_flake8(
+            [f"--spellcheck-word-splitter={word_splitter}", f"--spellcheck-memo-size={memo_size}"]
+        )
         assert result.exit_code == 1
         assert result.out_lines == expected_out_lines
 
@@ -691,3 +1278,768 @@ class TestOptionalDictionaries:
         result = flake8_path.run_flake8(["--dictionaries=python,technical,django,en_US"])
         assert result.exit_code == 0
         assert result.out_lines == []
+
+    @pytest.mark.parametrize("backend", ["frozenset", "dawg"])
+    def test_quotes_only(self, flake8_path, backend):
+        # en_US has no empty word that a comment of quotes would normalize to
+        (flake8_path / "example.py").write_text("x = 1  # '\ny = 2  # ''\n")
+        result = flake8_path.run_flake8(
+            ["--dictionaries=en_US", f"--spellcheck-backend={backend}", "--spellcheck-no-cache"]
+        )
+        assert result.out_lines == []
+
+
+class TestDictionaryCache:
+    def test_cache_written(self, flake8_path, cache_home):
+        (flake8_path / "example.py").write_text("misspeled = 1\n")
+        result = flake8_path.run_flake8()
+        assert result.out_lines == ["./example.py:1:1: SC200 Possibly misspelt word: 'misspeled'"]
+        assert len(list(cache_home.glob("dictionaries-*.pickle"))) == 1
+
+        result = flake8_path.run_flake8()
+        assert result.out_lines == ["./example.py:1:1: SC200 Possibly misspelt word: 'misspeled'"]
+        assert len(list(cache_home.glob("dictionaries-*.pickle"))) == 1
+
+    def test_allowlist_change_invalidates(self, flake8_path, cache_home):
+        (flake8_path / "example.py").write_text("misspeled = 1\n")
+        result = flake8_path.run_flake8()
+        assert result.out_lines == ["./example.py:1:1: SC200 Possibly misspelt word: 'misspeled'"]
+
+        (flake8_path / ".spellcheck-allowlist").write_text("misspeled\n")
+        result = flake8_path.run_flake8()
+        assert result.out_lines == []
+        assert len(list(cache_home.glob("dictionaries-*.pickle"))) == 2
+
+        (flake8_path / ".spellcheck-allowlist").write_text("")
+        result = flake8_path.run_flake8()
+        assert result.out_lines == ["./example.py:1:1: SC200 Possibly misspelt word: 'misspeled'"]
+
+    def test_custom_cache_dir(self, flake8_path, cache_home):
+        (flake8_path / "example.py").write_text("foo = 1\n")
+        result = flake8_path.run_flake8(["--spellcheck-cache-dir=compiled"])
+        assert result.out_lines == []
+        assert len(list((flake8_path / "compiled").glob("dictionaries-*.pickle"))) == 1
+        assert not cache_home.exists()
+
+    def test_no_cache(self, flake8_path, cache_home):
+        (flake8_path / "example.py").write_text("foo = 1\n")
+        result = flake8_path.run_flake8(["--spellcheck-no-cache"])
+        assert result.out_lines == []
+        assert not cache_home.exists()
+
+
+@pytest.mark.parametrize("backend", ["mmap", "dawg"])
+class TestMappedBackend:
+    def test_fail(self, flake8_path, cache_home, backend):
+        (flake8_path / "example.py").write_text(
+            dedent(
+                """
+                # don't write mispelled comments
+                def dont_fail(árvíz1űrő):
+                    return "ok"
+                """
+            )
+        )
+        for _ in range(2):
+            result = flake8_path.run_flake8([f"--spellcheck-backend={backend}"])
+            assert result.out_lines == [
+                "./example.py:2:15: SC100 Possibly misspelt word: 'mispelled'",
+                "./example.py:3:15: SC200 Possibly misspelt word: 'árvíz1űrő'",
+            ]
+        assert len(list(cache_home.glob(f"dictionaries-*.{backend}"))) == 1
+
+    def test_allowlist(self, flake8_path, cache_home, backend):
+        (flake8_path / "example.py").write_text("árvíztűrő_tükörfúrógép = 1\n")
+        (flake8_path / ".spellcheck-allowlist").write_text("árvíztűrő\ntükörfúrógép")
+        result = flake8_path.run_flake8([f"--spellcheck-backend={backend}"])
+        assert result.out_lines == []
+
+    def test_no_cache(self, flake8_path, cache_home, backend):
+        (flake8_path / "example.py").write_text("misspeled = 1\n")
+        result = flake8_path.run_flake8(
+            [f"--spellcheck-backend={backend}", "--spellcheck-no-cache"]
+        )
+        assert result.out_lines == ["./example.py:1:1: SC200 Possibly misspelt word: 'misspeled'"]
+        assert not cache_home.exists()
+
+
+class TestSharedBackend:
+    @pytest.mark.parametrize("jobs", ["1", "2"])
+    def test_fail(self, flake8_path, jobs):
+        for number in range(3):
+            (flake8_path / f"example{number}.py").write_text("# a coment\nmisspeled = 1\n")
+        result = flake8_path.run_flake8(["--jobs", jobs, "--spellcheck-backend=shared"])
+        assert sorted(result.out_lines) == [
+            f"./example{number}.py:{line}: SC{code}00 Possibly misspelt word: '{word}'"
+            for number in range(3)
+            for line, code, word in [("1:5", 1, "coment"), ("2:1", 2, "misspeled")]
+        ]
+        assert result.err_lines == []
+
+    def test_share_packed(self):
+        packed = _backends.pack_word_sets([["apple", "zebra"], []])
+        name = f"sc{os.getpid()}_test"
+        shared = _backends.share_packed(name, packed)
+        assert bytes(shared) == packed
+        assert _backends.share_packed(name, packed) == shared
+        words, empty = _backends.unpack_word_sets(_backends.attach_shared(name))
+        assert "apple" in words and "zebra" in words and "pear" not in words
+        with pytest.raises(TypeError):
+            shared[0] = 0
+
+
+class TestDiff:
+    DIFF = dedent(
+        """\
+        --- a/example.py
+        +++ b/example.py
+        @@ -1,5 +1,5 @@
+         # a coment
+        -misspeled = 1
+        +misspeled = 2
+         x = '''
+        -first lne
+        +secnd lne
+         '''
+        """
+    )
+
+    @pytest.fixture
+    def example(self, flake8_path):
+        (flake8_path / "example.py").write_text(
+            "# a coment\nmisspeled = 2\nx = '''\nsecnd lne\n'''\n"
+        )
+        (flake8_path / "untouched.py").write_text("# a coment\n")
+        (flake8_path / "changes.diff").write_text(self.DIFF)
+        return flake8_path
+
+    EXPECTED = [
+        "./example.py:2:1: SC200 Possibly misspelt word: 'misspeled'",
+        "./example.py:4:1: SC300 Possibly misspelt word: 'secnd'",
+        "./example.py:4:7: SC300 Possibly misspelt word: 'lne'",
+    ]
+
+    def test_diff_file(self, example):
+        result = example.run_flake8(
+            ["--spellcheck-diff=changes.diff", "--spellcheck-targets=names,comments,strings"]
+        )
+        assert result.out_lines == self.EXPECTED
+
+    @pytest.mark.parametrize("jobs", ["1", "2"])
+    def test_stdin(self, example, jobs):
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "flake8",
+                "--jobs",
+                jobs,
+                "--spellcheck-diff=-",
+                "--spellcheck-targets=names,comments,strings",
+                ".",
+            ],
+            cwd=example,
+            input=self.DIFF,
+            capture_output=True,
+            text=True,
+        )
+        assert sorted(result.stdout.splitlines()) == self.EXPECTED
+        assert result.stderr == ""
+
+    def test_result_cache(self, example):
+        args = ["--spellcheck-targets=names,comments,strings", "--spellcheck-result-cache"]
+        assert len(example.run_flake8(args).out_lines) == 5
+        result = example.run_flake8([*args, "--spellcheck-diff=changes.diff"])
+        assert result.out_lines == self.EXPECTED
+
+
+class TestSuggestions:
+    def test_suggestions(self, flake8_path, cache_home):
+        (flake8_path / "example.py").write_text("# a coment\nMisspeled = 1\n")
+        # Without a time budget, so that "Misspell", two edits away, is always found
+        result = flake8_path.run_flake8(
+            ["--spellcheck-suggestions=2", "--spellcheck-suggestion-budget=inf"]
+        )
+        assert result.out_lines == [
+            "./example.py:1:5: SC100 Possibly misspelt word: 'coment' "
+            "(did you mean 'comment' or 'cement'?)",
+            "./example.py:2:1: SC200 Possibly misspelt word: 'Misspeled' "
+            "(did you mean 'Misspelled' or 'Misspell'?)",
+        ]
+        assert len(list(cache_home.glob("dictionaries-*.dawg"))) == 1
+
+    def test_cut_short_not_cached(self, flake8_path, cache_home):
+        (flake8_path / "example.py").write_text("# a comnet\n")
+        args = ["--spellcheck-suggestions=3", "--spellcheck-suggestion-budget=0"]
+        result = flake8_path.run_flake8([*args, "--spellcheck-result-cache"])
+        assert result.out_lines[0].startswith("./example.py:1:5: SC100")
+        assert not list((cache_home / "results").glob("*.pickle"))
+
+
+class TestCompounds:
+    def test_compounds(self, flake8_path):
+        (flake8_path / "example.py").write_text(
+            "# checks the filesystem\nget_dataframe = misspeled = 1\n"
+        )
+        result = flake8_path.run_flake8(["--spellcheck-compounds"])
+        assert result.out_lines == ["./example.py:2:17: SC200 Possibly misspelt word: 'misspeled'"]
+
+        result = flake8_path.run_flake8([])
+        assert len(result.out_lines) == 3
+
+
+class TestNestedAllowlists:
+    @pytest.fixture
+    def example(self, flake8_path):
+        (flake8_path / ".spellcheck-allowlist").write_text("rootword\n")
+        for directory in ["team_a/service", "team_b"]:
+            (flake8_path / directory).mkdir(parents=True)
+        (flake8_path / "team_a" / ".spellcheck-allowlist").write_text("Alphaword\n")
+        (flake8_path / "team_a" / "service" / ".spellcheck-allowlist").write_text("servword\n")
+        for path in ["example.py", "team_a/service/example.py", "team_b/example.py"]:
+            (flake8_path / path).write_text("rootword = alphaword = servword = 1\n")
+        return flake8_path
+
+    def test_nested_allowlists(self, example, cache_home):
+        args = ["--spellcheck-nested-allowlists", "--spellcheck-result-cache"]
+        expected = [
+            "./example.py:1:12: SC200 Possibly misspelt word: 'alphaword'",
+            "./example.py:1:24: SC200 Possibly misspelt word: 'servword'",
+            "./team_b/example.py:1:12: SC200 Possibly misspelt word: 'alphaword'",
+            "./team_b/example.py:1:24: SC200 Possibly misspelt word: 'servword'",
+        ]
+        assert example.run_flake8(args).out_lines == expected
+
+        # Editing an allowlist in a subdirectory invalidates the results cached for its files
+        (example / "team_a" / "service" / ".spellcheck-allowlist").write_text("\n")
+        assert example.run_flake8(args).out_lines == [
+            *expected[:2],
+            "./team_a/service/example.py:1:24: SC200 Possibly misspelt word: 'servword'",
+            *expected[2:],
+        ]
+
+    def test_disabled(self, example):
+        assert len(example.run_flake8([]).out_lines) == 6
+
+    def test_layers(self, tmp_path):
+        (tmp_path / "a" / "b" / "c").mkdir(parents=True)
+        (tmp_path / "a" / "words").write_text("don't\n")
+        allowlists = NestedAllowlists(str(tmp_path), "words")
+
+        layer = allowlists.for_file(str(tmp_path / "a" / "b" / "c" / "example.py"))
+        assert layer is not None
+        assert layer.allows("Don't", use_symbols=True)
+        assert layer.allows("dont", use_symbols=False)
+        assert not layer.allows("dont", use_symbols=True)
+        assert list(layer.paths()) == [str(tmp_path / "a" / "words")]
+
+        # Directories without an allowlist share the layer of their parent
+        assert allowlists.for_file(str(tmp_path / "a" / "example.py")) is layer
+        assert allowlists.for_file(str(tmp_path / "a" / "b" / "example.py")) is layer
+        assert allowlists.for_file(str(tmp_path / "example.py")) is None
+        assert allowlists.for_file(str(tmp_path.parent / "example.py")) is None
+
+
+class TestAllowlistPatterns:
+    def test_allowlist_file(self, flake8_path):
+        (flake8_path / ".spellcheck-allowlist").write_text("aws*\n/v\\d+(alpha|beta)\\d*/\n")
+        (flake8_path / "example.py").write_text("# awslambda v1beta2 v2gamma\n")
+        assert flake8_path.run_flake8().out_lines == [
+            "./example.py:1:21: SC100 Possibly misspelt word: 'v2gamma'"
+        ]
+
+    def test_allowlist_parameter(self, flake8_path):
+        (flake8_path / "example.py").write_text("# k8sx k8sxx Jira123\n")
+        result = flake8_path.run_flake8(["--spellcheck-allowlist=k8s?,/jira\\d+/"])
+        assert result.out_lines == ["./example.py:1:8: SC100 Possibly misspelt word: 'k8sxx'"]
+
+    def test_nested_allowlists(self, flake8_path):
+        (flake8_path / "team").mkdir()
+        (flake8_path / "team" / ".spellcheck-allowlist").write_text("teamword*\n")
+        for path in ["example.py", "team/example.py"]:
+            (flake8_path / path).write_text("teamwordx = 1\n")
+        result = flake8_path.run_flake8(["--spellcheck-nested-allowlists"])
+        assert result.out_lines == ["./example.py:1:1: SC200 Possibly misspelt word: 'teamwordx'"]
+
+    @pytest.mark.parametrize(
+        "glob", ["aws*", "k8s?", "ab[cd]", "ab[!cd]", "a[]b]", "a[!]]", "a[b", "x.y+", "[a-c]*z"]
+    )
+    def test_translate_glob(self, glob):
+        regex = re.compile(_patterns.translate_glob(glob))
+        for word in ["aws", "awsx", "k8s", "k8sx", "abc", "abe", "a]", "ab", "a[b", "x.y+", "bz"]:
+            assert bool(regex.fullmatch(word)) == fnmatch.fnmatchcase(word, glob), word
+
+    def test_compile_patterns(self):
+        patterns = ["aws*", "azure*", "/v\\d+(alpha|beta)\\d*/", "/Jira-\\d+/", "/ab+c/", "/a|z/"]
+        regex = _patterns.compile_patterns(patterns)
+        assert regex is not None
+        for word in ["aws", "azureblob", "v1beta1", "jira-12", "abbc", "a", "z"]:
+            assert regex.fullmatch(word), word
+        for word in ["azur", "v1gamma", "jira-", "ac", "az"]:
+            assert not regex.fullmatch(word), word
+        assert _patterns.compile_patterns([]) is None
+
+    @pytest.mark.parametrize("pattern", ["/a)|(b/", "/ab\\/", "/[ab/", "/a(b/", "/a{2,1}/"])
+    def test_invalid_patterns(self, pattern):
+        with pytest.raises(ValueError, match=re.escape(repr(pattern))):
+            _patterns.compile_patterns(["aws*", pattern, "/x+/"])
+
+    def test_invalid_pattern_in_allowlist_file(self, flake8_path):
+        (flake8_path / ".spellcheck-allowlist").write_text("aws*\n/v(\\d+/\n")
+        (flake8_path / "example.py").write_text("x = 1\n")
+        result = flake8_path.run_flake8()
+        assert result.exit_code == 1
+        assert result.out_lines == [
+            "There was a critical error during execution of Flake8:",
+            ".spellcheck-allowlist: Invalid allowlist pattern '/v(\\\\d+/': missing ), "
+            "unterminated subpattern at position 1",
+        ]
+
+    def test_invalid_pattern_in_parameter(self, flake8_path):
+        (flake8_path / "example.py").write_text("x = 1\n")
+        result = flake8_path.run_flake8(["--spellcheck-allowlist=aws*,/a)|(b/"])
+        assert result.exit_code == 1
+        assert result.out_lines[1].startswith(
+            "--spellcheck-allowlist: Invalid allowlist pattern '/a)|(b/'"
+        )
+
+    def test_split_entries(self):
+        words, patterns = _patterns.split_entries(
+            ["Word", "aws*", "/v\\d/", "/", "", " k8s? ", "\\Why?", "\\/usr/", "\\\\x"]
+        )
+        assert words == {"word", "/", "why?", "/usr/", "\\x"}
+        assert patterns == {"aws*", "/v\\d/", "k8s?"}
+
+
+class TestResultCache:
+    def test_replay(self, flake8_path, cache_home):
+        (flake8_path / "example.py").write_text("misspeled = 1\n")
+        for _ in range(2):
+            result = flake8_path.run_flake8(["--spellcheck-result-cache"])
+            assert result.out_lines == [
+                "./example.py:1:1: SC200 Possibly misspelt word: 'misspeled'"
+            ]
+        (entry,) = (cache_home / "results").glob("*.pickle")
+
+        # Unchanged files are served straight from the cache
+        entry.write_bytes(pickle.dumps([(1, 0, "SC200 Possibly misspelt word: 'cached'")]))
+        result = flake8_path.run_flake8(["--spellcheck-result-cache"])
+        assert result.out_lines == ["./example.py:1:1: SC200 Possibly misspelt word: 'cached'"]
+
+        (flake8_path / "example.py").write_text("misspeled = 2\n")
+        result = flake8_path.run_flake8(["--spellcheck-result-cache"])
+        assert result.out_lines == ["./example.py:1:1: SC200 Possibly misspelt word: 'misspeled'"]
+
+    def test_allowlist_change_invalidates(self, flake8_path, cache_home):
+        (flake8_path / "example.py").write_text("misspeled = 1\n")
+        result = flake8_path.run_flake8(["--spellcheck-result-cache"])
+        assert result.out_lines == ["./example.py:1:1: SC200 Possibly misspelt word: 'misspeled'"]
+
+        (flake8_path / ".spellcheck-allowlist").write_text("misspeled\n")
+        result = flake8_path.run_flake8(["--spellcheck-result-cache"])
+        assert result.out_lines == []
+
+        result = flake8_path.run_flake8(
+            ["--spellcheck-result-cache", "--spellcheck-targets=comments"]
+        )
+        assert result.out_lines == []
+        assert len(list((cache_home / "results").glob("*.pickle"))) == 3
+
+    def test_eviction(self, flake8_path, cache_home):
+        for number in range(5):
+            (flake8_path / f"example{number}.py").write_text(f"value = {number}\n")
+        flake8_path.run_flake8(["--spellcheck-result-cache"])
+        assert len(list((cache_home / "results").glob("*.pickle"))) == 5
+
+        args = ["--spellcheck-result-cache", "--spellcheck-result-cache-size=2", "--jobs=1"]
+        # Replaying every file leaves the cache alone
+        flake8_path.run_flake8(args)
+        assert len(list((cache_home / "results").glob("*.pickle"))) == 5
+
+        result = flake8_path.run_flake8([*args, "--spellcheck-targets=comments"])
+        assert result.out_lines == []
+        # Entries are pruned before the first new one is written, then again once the run has
+        # added as many as the cache holds
+        assert len(list((cache_home / "results").glob("*.pickle"))) == 3
+
+    def test_concurrent_prune(self, tmp_path):
+        # Enough entries that both processes are likely to list them before either removes any
+        for number in range(2000):
+            (tmp_path / f"{number}.pickle").write_bytes(b"")
+            os.utime(tmp_path / f"{number}.pickle", (number, number))
+        prune = (
+            "import sys; from pathlib import Path; from flake8_spellcheck import _cache; "
+            "_cache.prune(Path(sys.argv[1]), '*.pickle', keep=10)"
+        )
+        processes = [
+            subprocess.Popen([sys.executable, "-c", prune, str(tmp_path)], stderr=subprocess.PIPE)
+            for _ in range(2)
+        ]
+        for process in processes:
+            assert process.communicate()[1] == b""
+            assert process.returncode == 0
+        assert sorted(path.name for path in tmp_path.glob("*.pickle")) == sorted(
+            f"{number}.pickle" for number in range(1990, 2000)
+        )
+
+    def test_prune_skips_failures(self, tmp_path, monkeypatch):
+        for number in range(5):
+            (tmp_path / f"{number}.pickle").write_bytes(b"")
+            os.utime(tmp_path / f"{number}.pickle", (number, number))
+        unlink = os.unlink
+
+        def flaky_unlink(path):
+            if Path(path).name == "0.pickle":
+                raise PermissionError(path)
+            unlink(path)
+
+        monkeypatch.setattr(os, "unlink", flaky_unlink)
+        _cache.prune(tmp_path, "*.pickle", keep=2)
+        assert sorted(path.name for path in tmp_path.glob("*.pickle")) == [
+            "0.pickle",
+            "3.pickle",
+            "4.pickle",
+        ]
+
+
+class TestStrings:
+    SOURCE = dedent(
+        '''
+        """Modul docstring."""
+
+
+        def function():
+            """Function docstring.
+
+            Spaning lines.
+            """
+            return u"a misspeled\\nstring", rb"raw\\nstrng"
+        '''
+    )
+
+    def test_default_targets(self, flake8_path):
+        (flake8_path / "example.py").write_text(self.SOURCE)
+        result = flake8_path.run_flake8()
+        assert result.out_lines == []
+
+    def test_docstrings(self, flake8_path):
+        (flake8_path / "example.py").write_text(self.SOURCE)
+        result = flake8_path.run_flake8(["--spellcheck-targets=docstrings"])
+        assert result.out_lines == [
+            "./example.py:2:4: SC300 Possibly misspelt word: 'Modul'",
+            "./example.py:8:5: SC300 Possibly misspelt word: 'Spaning'",
+        ]
+
+    def test_strings(self, flake8_path):
+        (flake8_path / "example.py").write_text(self.SOURCE)
+        result = flake8_path.run_flake8(["--spellcheck-targets=strings"])
+        assert result.out_lines == [
+            "./example.py:2:4: SC300 Possibly misspelt word: 'Modul'",
+            "./example.py:8:5: SC300 Possibly misspelt word: 'Spaning'",
+            "./example.py:10:16: SC300 Possibly misspelt word: 'misspeled'",
+            "./example.py:10:43: SC300 Possibly misspelt word: 'nstrng'",
+        ]
+
+
+class TestScanner:
+    @pytest.mark.parametrize("scanner", ["regex", "tokenize"])
+    def test_scanner(self, flake8_path, scanner):
+        (flake8_path / "example.py").write_text(
+            TestStrings.SOURCE + "\n\nmisspeled = 1  # a coment\n"
+        )
+        result = flake8_path.run_flake8(
+            [f"--spellcheck-scanner={scanner}", "--spellcheck-targets=names,comments,strings"]
+        )
+        assert result.out_lines == [
+            "./example.py:2:4: SC300 Possibly misspelt word: 'Modul'",
+            "./example.py:8:5: SC300 Possibly misspelt word: 'Spaning'",
+            "./example.py:10:16: SC300 Possibly misspelt word: 'misspeled'",
+            "./example.py:10:43: SC300 Possibly misspelt word: 'nstrng'",
+            "./example.py:13:1: SC200 Possibly misspelt word: 'misspeled'",
+            "./example.py:13:20: SC100 Possibly misspelt word: 'coment'",
+        ]
+
+
+class TestStats:
+    @pytest.mark.parametrize("jobs", ["1", "2"])
+    def test_stats_file(self, flake8_path, jobs):
+        for number in range(3):
+            (flake8_path / f"example{number}.py").write_text("# a coment\nmisspeled = 1\n")
+        result = flake8_path.run_flake8(
+            ["--jobs", jobs, "--spellcheck-stats-file", str(flake8_path / "stats.json")]
+        )
+        assert len(result.out_lines) == 6
+        assert result.err_lines == []
+
+        stats = json.loads((flake8_path / "stats.json").read_text())
+        assert stats["processes"] >= 1
+        assert set(stats["timers"]) == {
+            "load_dictionaries",
+            "run",
+            "_parse_token",
+            "_detect_errors",
+        }
+        counters = stats["counters"]
+        assert counters["files"] == 3
+        assert counters["misspellings"] == 6
+        assert counters["tokens.COMMENT"] == 3
+        assert counters["tokens.NAME"] == 3
+        assert counters["words"] == 9
+        assert counters["memo.split_hits"] + counters["memo.split_misses"] == 9
+        assert counters["lookups"] == 9
+
+    def test_environment_variable(self, flake8_path, monkeypatch):
+        (flake8_path / "example.py").write_text("misspeled = 1\n")
+        monkeypatch.setenv("FLAKE8_SPELLCHECK_STATS", "1")
+        result = flake8_path.run_flake8()
+        assert result.out_lines == ["./example.py:1:1: SC200 Possibly misspelt word: 'misspeled'"]
+        assert result.err_lines[0] == "flake8-spellcheck stats (1 process)"
+        assert any(line.split() == ["misspellings", "1"] for line in result.err_lines)
+
+
+class TestReport:
+    @pytest.mark.parametrize("jobs", ["1", "2"])
+    def test_report(self, flake8_path, cache_home, jobs):
+        for number in range(3):
+            (flake8_path / f"example{number}.py").write_text(
+                f"# a coment\nMisspeled = misspeled_{number} = 1  # coment\n"
+            )
+        result = flake8_path.run_flake8(
+            [
+                "--jobs",
+                jobs,
+                "--spellcheck-report",
+                "report.json",
+                "--spellcheck-report-allowlist",
+                "allowlist.txt",
+                # Every file is checked, not replayed from the cache
+                "--spellcheck-result-cache",
+            ]
+        )
+        assert len(result.out_lines) == 12
+        assert result.err_lines == []
+
+        report = json.loads((flake8_path / "report.json").read_text())
+        assert report == {
+            "coment": {"count": 6, "codes": {"SC100": 6}, "location": "./example0.py:1:5"},
+            "misspeled": {"count": 6, "codes": {"SC200": 6}, "location": "./example0.py:2:1"},
+        }
+        assert (flake8_path / "allowlist.txt").read_text() == "coment\nmisspeled\n"
+        assert not list((cache_home / "results").glob("*"))
+
+    def test_ranking(self):
+        words = {}
+        _report.add_entry(words, "rare", {"SC100": 1}, ["b.py", 1, 1])
+        _report.add_entry(words, "common", {"SC200": 2}, ["b.py", 2, 1])
+        _report.add_entry(words, "common", {"SC100": 1}, ["a.py", 9, 1])
+        report = _report.format_report(words)
+        assert report == {
+            "common": {"count": 3, "codes": {"SC100": 1, "SC200": 2}, "location": "a.py:9:1"},
+            "rare": {"count": 1, "codes": {"SC100": 1}, "location": "b.py:1:1"},
+        }
+        assert list(report) == ["common", "rare"]
+
+
+def test_merge_stats():
+    left = {"processes": 1, "timers": {"run": 1.0}, "counters": {"words": 2}}
+    right = {"processes": 2, "timers": {"run": 0.5, "_parse_token": 0.25}, "counters": {}}
+    assert _stats.merge(left, right) == {
+        "processes": 3,
+        "timers": {"run": 1.5, "_parse_token": 0.25},
+        "counters": {"words": 2},
+    }
+
+
+class TestLazyLoading:
+    @pytest.mark.parametrize(
+        "args", [["--extend-ignore=SC"], ["--select=E,W"], ["--extend-ignore=SC1,SC2"]]
+    )
+    def test_deselected_codes_skip_loading(self, flake8_path, args):
+        (flake8_path / "example.py").write_text("# a coment\nmisspeled = 1\n")
+        result = flake8_path.run_flake8(["--dictionaries=missing", *args])
+        assert result.exit_code == 0
+        assert result.out_lines == []
+
+    def test_partially_deselected(self, flake8_path):
+        (flake8_path / "example.py").write_text("# a coment\nmisspeled = 1\n")
+        result = flake8_path.run_flake8(["--extend-ignore=SC100"])
+        assert result.out_lines == ["./example.py:2:1: SC200 Possibly misspelt word: 'misspeled'"]
+
+    def test_no_files(self, flake8_path):
+        result = flake8_path.run_flake8(["--dictionaries=missing"])
+        assert result.exit_code == 0
+        assert result.out_lines == []
+
+
+@pytest.fixture(scope="module")
+def checker():
+    # Created before cache_home, so it must not touch the real user cache directory
+    options = default_options(
+        spellcheck_targets=["names", "comments", "docstrings"], spellcheck_no_cache=True
+    )
+    return SpellChecker(options, batch_size=1)
+
+
+class TestSpellChecker:
+    SOURCE = dedent(
+        '''
+        """A modle docstrng."""
+        # a coment
+        misspeled = "a strng"
+        '''
+    )
+
+    def test_check_source(self, checker):
+        misspellings = checker.check_source(self.SOURCE)
+        assert misspellings == [
+            Misspelling(2, 5, "SC300", "modle"),
+            Misspelling(2, 11, "SC300", "docstrng"),
+            Misspelling(3, 4, "SC100", "coment"),
+            Misspelling(4, 0, "SC200", "misspeled"),
+        ]
+        assert misspellings[0].message == "SC300 Possibly misspelt word: 'modle'"
+        assert SpellCheckPlugin.spellcheck_targets != checker.plugin.spellcheck_targets
+
+    @pytest.mark.parametrize(
+        "source",
+        [
+            "x = 1\n\x0c\nzzyzx = 2\n",
+            "# a \u2028 coment\nmisspeled = 1\n",
+            "x = '\x0b\x1c\x1d\x1e\x85\u2029'\n# a coment\n",
+            "x = 1\r\n# a coment\rmisspeled = 1\n",
+        ],
+    )
+    def test_check_source_line_breaks(self, checker, flake8_path, source):
+        # Only the line breaks tokenize knows end lines, so line numbers agree with flake8
+        (flake8_path / "example.py").write_bytes(source.encode())
+        result = flake8_path.run_flake8(["--spellcheck-targets=names,comments,docstrings"])
+        assert [
+            f"./example.py:{misspelling.line}:{misspelling.column + 1}: {misspelling.message}"
+            for misspelling in checker.check_source(source)
+        ] == result.out_lines
+
+    @pytest.mark.parametrize("source", ["x = '''unterminated\n", "# a coment\nx = (1,\n"])
+    def test_check_source_invalid(self, source):
+        options = default_options(spellcheck_scanner="tokenize", spellcheck_no_cache=True)
+        with pytest.raises((tokenize.TokenError, SyntaxError)):
+            SpellChecker(options).check_source(source)
+
+    def test_check_tokens(self, checker):
+        tokens = tokenize.generate_tokens(iter(self.SOURCE.splitlines(keepends=True)).__next__)
+        consumed = []
+        stream = checker.check_tokens(token for token in tokens if not consumed.append(token))
+        assert next(stream) == Misspelling(3, 4, "SC100", "coment")
+        assert consumed[-1].string == "# a coment"
+        assert list(stream) == [Misspelling(4, 0, "SC200", "misspeled")]
+
+    def test_check_tokens_async(self, checker):
+        async def tokens(source):
+            for token in tokenize.generate_tokens(iter(source.splitlines(True)).__next__):
+                yield token
+
+        async def endless_tokens():
+            while True:
+                yield tokenize.TokenInfo(tokenize.NAME, "misspeled", (1, 0), (1, 9), "")
+
+        async def check(tokens):
+            return [misspelling async for misspelling in checker.check_tokens_async(tokens)]
+
+        async def main():
+            words = checker.plugin.words
+            results = await asyncio.gather(*(check(tokens(f"# a coment{i}\n")) for i in range(10)))
+            assert results == [[Misspelling(1, 4, "SC100", f"coment{i}")] for i in range(10)]
+            assert checker.plugin.words is words
+
+            # The endless stream never awaits, cancelling only works between batches
+            endless = asyncio.ensure_future(check(endless_tokens()))
+            await asyncio.sleep(0.01)
+            endless.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await endless
+
+        asyncio.run(main())
+
+
+class TestCli:
+    def run(self, path, args):
+        return subprocess.run(
+            [sys.executable, "-m", "flake8_spellcheck", *args],
+            cwd=path,
+            capture_output=True,
+            text=True,
+        )
+
+    @pytest.mark.parametrize("jobs", ["1", "2"])
+    def test_matches_flake8(self, flake8_path, jobs):
+        for number in range(3):
+            (flake8_path / f"example{number}.py").write_text(
+                "# a coment\nmisspeled = 1\nfoo_barr = 1  # noqa: SC200\n"
+            )
+        (flake8_path / ".tox").mkdir()
+        (flake8_path / ".tox" / "skipped.py").write_text("misspeled = 1\n")
+        result = self.run(flake8_path, ["--jobs", jobs])
+        assert result.returncode == 1
+        assert sorted(result.stdout.splitlines()) == sorted(flake8_path.run_flake8().out_lines)
+        assert len(result.stdout.splitlines()) == 6
+        assert result.stderr == ""
+
+    def test_config(self, flake8_path):
+        (flake8_path / "example.py").write_text('# a coment\n"""A docstrng."""\n')
+        (flake8_path / "setup.cfg").write_text(
+            "[flake8]\nspellcheck-targets = docstrings\nspellcheck-allowlist = docstrng\n"
+        )
+        assert self.run(flake8_path, []).stdout == ""
+        result = self.run(flake8_path, ["--isolated", "--exit-zero", "--benchmark"])
+        assert result.returncode == 0
+        assert result.stdout.splitlines() == [
+            "./example.py:1:5: SC100 Possibly misspelt word: 'coment'"
+        ]
+        assert "1 files in" in result.stderr
+
+    def test_invalid_allowlist_pattern(self, flake8_path):
+        (flake8_path / "example.py").write_text("x = 1\n")
+        result = self.run(flake8_path, ["--spellcheck-allowlist=/a(b/"])
+        assert result.returncode == 2
+        assert result.stdout == ""
+        assert "--spellcheck-allowlist: Invalid allowlist pattern '/a(b/'" in result.stderr
+
+    @pytest.mark.parametrize(
+        "config",
+        [
+            "extend-ignore = SC100\n",
+            "select = SC1\n",
+            "ignore = SC2\nextend-select = SC200\n",
+            "per-file-ignores =\n    tests/*: SC200\n    example.py: SC\n",
+        ],
+    )
+    @pytest.mark.parametrize("args", [[], ["--extend-ignore=SC2"]])
+    def test_select_and_ignore_match_flake8(self, flake8_path, config, args):
+        (flake8_path / "tests").mkdir()
+        for path in ["example.py", "other.py", "tests/example.py"]:
+            (flake8_path / path).write_text("# a coment\nmisspeled = 1\n")
+        (flake8_path / "setup.cfg").write_text(f"[flake8]\n{config}")
+        result = self.run(flake8_path, ["--jobs=1", "--config=setup.cfg", *args])
+        expected = flake8_path.run_flake8(
+            ["--select=SC", *args] if "select" not in config else args
+        )
+        assert sorted(result.stdout.splitlines()) == sorted(expected.out_lines)
+        assert result.stderr == ""
+
+    def test_schedule(self, tmp_path):
+        for name, size in [("small.py", 1), ("large.py", 100), ("medium.py", 10), ("a.txt", 9)]:
+            (tmp_path / name).write_text("#" * size)
+        paths = expand_paths([str(tmp_path / "missing.py"), str(tmp_path)], exclude=["med*"])
+        assert [Path(path).name for path in schedule(list(paths))] == [
+            "large.py",
+            "small.py",
+            "missing.py",
+        ]
+
+
+def test_version():
+    import flake8_spellcheck
+
+    version = importlib.metadata.version("flake8_spellcheck")
+    assert flake8_spellcheck.__version__ == version
+    assert flake8_spellcheck.SpellCheckPlugin.version == version
+    assert set(flake8_spellcheck.__all__) <= set(dir(flake8_spellcheck)) | {"__version__"}
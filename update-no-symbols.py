@@ -0,0 +1,22 @@
+#!/usr/bin/env python
+"""Regenerate the symbol stripped word lists shipped in flake8_spellcheck/no_symbols.
+
+Run this after changing a dictionary, tests fail while the lists are out of date.
+"""
+from typing import Iterable
+
+from flake8_spellcheck import NO_SYMBOLS_PATH, dictionary_names, load_dictionary, no_symbols_extra
+
+
+def render(words: Iterable[str]) -> str:
+    return "".join(f"{word}\n" for word in sorted(no_symbols_extra(set(words))))
+
+
+def main() -> None:
+    NO_SYMBOLS_PATH.mkdir(exist_ok=True)
+    for name in dictionary_names():
+        (NO_SYMBOLS_PATH / f"{name}.txt").write_text(render(load_dictionary(name)))
+
+
+if __name__ == "__main__":
+    main()